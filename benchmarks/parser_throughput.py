@@ -0,0 +1,124 @@
+"""Measure parser throughput (MB/s) per source and JSON decoder.
+
+Parses every session file found under the source roots (as `recall index`
+would discover them) with each available decoder and reports the best of
+--repeat runs. The read column is the throughput of splitting the same
+files into lines alone. Point HOME at a copy of real sessions to benchmark them:
+
+    HOME=/path/to/home python benchmarks/parser_throughput.py --repeat 3
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+from recall.parsers import SessionParser, all_parsers
+from recall.parsers.decoder import DECODER_NAMES, default_decoder, load_decoder
+from recall.parsers.reader import LineReader
+
+
+@dataclass(frozen=True)
+class Result:
+    source: str
+    decoder: str
+    files: int
+    bytes: int
+    seconds: float
+    decode_seconds: float
+
+    @property
+    def megabytes_per_second(self) -> float:
+        return self.bytes / 1_000_000 / self.seconds if self.seconds else 0.0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--decoder",
+        action="append",
+        choices=[name for name in DECODER_NAMES if name != "auto"],
+        help="Decoder to measure (repeatable); default: every installed one",
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per decoder (best is kept)")
+    args = parser.parse_args()
+
+    decoders = args.decoder or _installed_decoders()
+    baselines: dict[str, float] = {}
+    print(
+        f"{'source':<12} {'decoder':<8} {'files':>6} {'MB':>8} {'MB/s':>8} {'decode':>7} "
+        f"{'read MB/s':>9} speedup"
+    )
+    for session_parser in all_parsers():
+        paths = [item.path for item in session_parser.scan()]
+        if not paths:
+            continue
+        read = max(_measure_reads(paths) for _ in range(args.repeat))
+        for decoder in decoders:
+            result = min(
+                (_measure(session_parser, paths, decoder) for _ in range(args.repeat)),
+                key=lambda result: result.seconds,
+            )
+            baseline = baselines.setdefault(result.source, result.megabytes_per_second)
+            speedup = result.megabytes_per_second / baseline if baseline else 0.0
+            decode_share = result.decode_seconds / result.seconds if result.seconds else 0.0
+            print(
+                f"{result.source:<12} {result.decoder:<8} {result.files:>6} "
+                f"{result.bytes / 1_000_000:>8.1f} {result.megabytes_per_second:>8.1f} "
+                f"{decode_share:>6.0%} {read:>9.1f} {speedup:>6.2f}x"
+            )
+
+
+def _installed_decoders() -> list[str]:
+    names = ["json"]
+    for name in DECODER_NAMES:
+        if name in ("auto", "json"):
+            continue
+        try:
+            load_decoder(name)
+        except ValueError:
+            continue
+        names.append(name)
+    return names
+
+
+def _measure_reads(paths: list[Path]) -> float:
+    """MB/s of LineReader splitting the files into lines, without decoding them."""
+    total_bytes = 0
+    started = time.perf_counter()
+    for path in paths:
+        reader = LineReader(path)
+        for _ in reader:
+            pass
+        total_bytes += reader.bytes_read
+    seconds = time.perf_counter() - started
+    return total_bytes / 1_000_000 / seconds if seconds else 0.0
+
+
+def _measure(session_parser: SessionParser, paths: list[Path], decoder: str) -> Result:
+    # Selected the way users select it; readers pick it up when created.
+    os.environ["RECALL_JSON_DECODER"] = decoder
+    default_decoder.cache_clear()
+    total_bytes = 0
+    decode_seconds = 0.0
+    started = time.perf_counter()
+    for path in paths:
+        stream = session_parser.stream(path, None)
+        stream.collect()
+        total_bytes += stream.reader.bytes_read
+        decode_seconds += stream.reader.decode_seconds
+    return Result(
+        source=session_parser.source.value,
+        decoder=decoder,
+        files=len(paths),
+        bytes=total_bytes,
+        seconds=time.perf_counter() - started,
+        decode_seconds=decode_seconds,
+    )
+
+
+if __name__ == "__main__":
+    main()
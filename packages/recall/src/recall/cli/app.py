@@ -6,11 +6,13 @@ from recall.cli import index as index_cmd
 from recall.cli import list as list_cmd
 from recall.cli import search as search_cmd
 from recall.cli import show as show_cmd
+from recall.cli import watch as watch_cmd
 from recall.cli.stats import app as stats_app
 
 app = typer.Typer(add_completion=False)
 
 app.command("index")(index_cmd.command)
+app.command("watch")(watch_cmd.command)
 app.command("search")(search_cmd.command)
 app.command("list")(list_cmd.command)
 app.command("show")(show_cmd.command)
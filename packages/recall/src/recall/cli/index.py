@@ -3,6 +3,7 @@ from __future__ import annotations
 import typer
 
 from recall.cli.utils import print_json
+from recall.core.time import parse_duration
 from recall.core.types import parse_source
 from recall.db import RecallLockError
 from recall.services import index_sessions
@@ -13,11 +14,34 @@ def command(
     source: str | None = typer.Option(None, "--source", help="claude-code, codex, or pi-agent"),
     recreate: bool = typer.Option(False, "--recreate", help="Backup and rebuild database"),
     verbose: bool = typer.Option(False, "--verbose", "-v", help="Verbose logging"),
+    workers: int = typer.Option(1, "--workers", min=1, help="Parallel parser processes"),
     json_output: bool = typer.Option(False, "--json", help="JSON output"),
+    profile: bool = typer.Option(
+        False, "--profile", help="Report time per phase, throughput and slowest files"
+    ),
+    retry_failed: bool = typer.Option(
+        False, "--retry-failed", help="Retry files that failed before, even if unchanged"
+    ),
+    budget: str | None = typer.Option(
+        None, "--budget", help="Stop after this long (30s, 10m, 1h); the next run continues"
+    ),
 ) -> None:
     src = parse_source(source) if source else None
     try:
-        summary = index_sessions(source=src, full=full, recreate=recreate, verbose=verbose)
+        budget_delta = parse_duration(budget) if budget else None
+    except ValueError as err:
+        typer.echo(f"error: {err}")
+        raise typer.Exit(code=1) from None
+    try:
+        summary = index_sessions(
+            source=src,
+            full=full,
+            recreate=recreate,
+            verbose=verbose,
+            workers=workers,
+            retry_failed=retry_failed,
+            budget=budget_delta,
+        )
     except RecallLockError as err:
         typer.echo(f"error: {err}")
         raise typer.Exit(code=1) from None
@@ -26,7 +50,19 @@ def command(
         print_json(summary)
         return
 
+    if summary.resumed:
+        typer.echo(f"Resumed an interrupted reindex; {summary.resumed} sessions were already done.")
     typer.echo(
         f"Indexed {summary.indexed} sessions, skipped {summary.skipped}, "
         f"failed {summary.failed} (total {summary.total})."
     )
+    if summary.quarantined:
+        typer.echo(
+            f"Skipped {summary.quarantined} previously failed files that have not changed "
+            "(use --retry-failed to retry them)."
+        )
+    if summary.budget_exhausted:
+        typer.echo("Time budget reached; run again to index the remaining files.")
+    if profile:
+        for line in summary.profile.report():
+            typer.echo(line)
@@ -2,10 +2,11 @@ from __future__ import annotations
 
 import typer
 
-from recall.cli.utils import print_json
+from recall.cli.utils import format_datetime, print_json
 from recall.services import (
     bash_breakdown,
     bash_suggestions,
+    index_history,
     overview,
     token_usage,
     tool_usage,
@@ -13,6 +14,8 @@ from recall.services import (
 
 app = typer.Typer(help="Analytics commands")
 
+TREND_LABELS = {"parse_mb_per_second": "parse MB/s", "write_rows_per_second": "write rows/s"}
+
 
 @app.callback(invoke_without_command=True)
 def root(
@@ -71,7 +74,7 @@ def bash(
     for stat in stats:
         base = stat.bash_base or "unknown"
         sub = stat.bash_sub or "*"
-        suffix = " (compound)" if stat.is_compound else ""
+        suffix = f" ({stat.compound_count} in compound)" if stat.is_compound else ""
         typer.echo(f"{base} {sub}: {stat.count}{suffix}")
 
 
@@ -86,3 +89,41 @@ def tokens(
     for repo, input_tokens, output_tokens in stats:
         label = repo or "unknown"
         typer.echo(f"{label}: {input_tokens} in / {output_tokens} out")
+
+
+@app.command("index")
+def index(
+    limit: int = typer.Option(20, "--limit", min=1, help="Number of recent runs"),
+    json_output: bool = typer.Option(False, "--json", help="JSON output"),
+) -> None:
+    history = index_history(limit=limit)
+    if json_output:
+        print_json(history)
+        return
+    if not history.runs:
+        typer.echo("No index runs recorded yet.")
+        return
+    typer.echo("Recent index runs")
+    for run in history.runs:
+        parse = (
+            f"{run.parse_mb_per_second:.1f} MB/s" if run.parse_mb_per_second is not None else "-"
+        )
+        write = (
+            f"{run.write_rows_per_second:.0f} rows/s"
+            if run.write_rows_per_second is not None
+            else "-"
+        )
+        typer.echo(
+            f"  {format_datetime(run.started_at)} {run.mode:<11} {run.duration_seconds:7.1f}s "
+            f"indexed {run.indexed}, failed {run.failed}, "
+            f"{run.bytes_read / 1_000_000:.1f} MB, parse {parse}, write {write}"
+            + (f" (v{run.recall_version})" if run.recall_version else "")
+        )
+    if history.trends:
+        typer.echo("Throughput vs median of earlier runs")
+        for trend in history.trends:
+            typer.echo(
+                f"  {trend.mode} {TREND_LABELS[trend.metric]}: "
+                f"{trend.latest:.1f} vs {trend.baseline:.1f} "
+                f"({trend.change:+.0%}, {trend.runs} runs)"
+            )
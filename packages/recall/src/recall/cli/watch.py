@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import signal
+
+import typer
+
+from recall.core.types import parse_source
+from recall.db import RecallLockError
+from recall.services import IndexSummary, watch_sessions
+
+
+def command(
+    source: str | None = typer.Option(None, "--source", help="claude-code, codex, or pi-agent"),
+    debounce: float = typer.Option(
+        1.0, "--debounce", min=0.0, help="Seconds of quiet before indexing changed files"
+    ),
+    interval: float = typer.Option(
+        5.0, "--interval", min=0.1, help="Rescan interval in seconds when polling"
+    ),
+    poll: bool = typer.Option(False, "--poll", help="Poll instead of using inotify"),
+    verbose: bool = typer.Option(False, "--verbose", "-v", help="Verbose logging"),
+) -> None:
+    src = parse_source(source) if source else None
+    # Stop cleanly on SIGTERM (service managers) as on Ctrl-C.
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    try:
+        watch_sessions(
+            source=src,
+            verbose=verbose,
+            debounce=debounce,
+            poll_interval=interval,
+            polling=poll,
+            on_index=_report,
+        )
+    except RecallLockError as err:
+        typer.echo(f"error: {err}")
+        raise typer.Exit(code=1) from None
+    except KeyboardInterrupt:
+        return
+
+
+def _report(summary: IndexSummary) -> None:
+    if summary.indexed or summary.failed:
+        typer.echo(f"Indexed {summary.indexed} sessions, failed {summary.failed}.")
@@ -1,23 +1,38 @@
-from recall.core.bash import BashCommand, parse_bash_command
+from recall.core.bash import (
+    BASH_COMMAND_CACHE,
+    BashCommand,
+    BashCommandCache,
+    BashSegment,
+    parse_bash_command,
+    split_segments,
+)
 from recall.core.config import AppConfig, FtsConfig
 from recall.core.ids import message_id, session_id, tool_call_id
 from recall.core.models import Message, Session, ToolCall
+from recall.core.records import MessageRecord, SessionRecord, ToolCallRecord
 from recall.core.time import parse_since
 from recall.core.types import Role, Source, parse_source
 
 __all__ = [
+    "BASH_COMMAND_CACHE",
     "AppConfig",
     "BashCommand",
+    "BashCommandCache",
+    "BashSegment",
     "FtsConfig",
     "Message",
+    "MessageRecord",
     "Role",
     "Session",
+    "SessionRecord",
     "Source",
     "ToolCall",
+    "ToolCallRecord",
     "message_id",
     "parse_bash_command",
     "parse_since",
     "parse_source",
     "session_id",
+    "split_segments",
     "tool_call_id",
 ]
@@ -1,6 +1,9 @@
 from __future__ import annotations
 
+import re
 import shlex
+import threading
+from collections import OrderedDict
 from dataclasses import dataclass
 
 BASH_SUBCOMMAND_TOOLS = {
@@ -21,6 +24,50 @@ BASH_SUBCOMMAND_TOOLS = {
 
 COMPOUND_TOKENS = ("&&", "||", "|", ";", "\n")
 
+# Histories repeat the same few thousand commands, so analyses are memoized
+# per process, bounded by the total length of the cached commands. Longer
+# commands (scripts, heredocs) rarely repeat and are analyzed every time.
+BASH_CACHE_MAX_CHARS = 4_000_000
+BASH_CACHE_MAX_COMMAND_CHARS = 4096
+
+
+# Operator characters that end a simple command, and those that start a
+# redirection. shlex keeps them apart from words unless they are quoted.
+_SEPARATOR_CHARS = frozenset("&|;\n")
+_REDIRECT_CHARS = frozenset("&|<>")
+_PUNCTUATION_CHARS = "&|;()<>\n"
+_ASSIGNMENT = re.compile(r"[A-Za-z_][A-Za-z0-9_]*=")
+# shlex returns runs of punctuation as one token, such as "))" or ")\n".
+_PARENS = re.compile(r"[()]|[^()]+")
+_FALLBACK_SEPARATOR = re.compile(r"&&|\|\||[|;&\n]")
+# Start of an fd number written against its redirection, as in 2>&1; marked
+# before lexing since shlex does not report whether words were adjacent.
+_FD_REDIRECT = re.compile(r"(?<!\S)(?=\d+[<>])")
+_FD_MARK = "\0"
+# Backslash-escaped operator characters, as in `find -exec rm {} \;`, are part
+# of a word; they are swapped for private-use characters while lexing.
+_ESCAPED_OPERATOR = re.compile(r"\\([&|;()<>])")
+_ESCAPE_MARKS = {char: chr(0xE000 + i) for i, char in enumerate("&|;()<>")}
+_UNESCAPE = str.maketrans({mark: char for char, mark in _ESCAPE_MARKS.items()})
+# Reserved words and grouping tokens that may precede a command, as in
+# `then rm -rf x` or `do make; done`; they are not commands themselves.
+_RESERVED_WORDS = frozenset(
+    ("if", "then", "elif", "else", "fi", "while", "until", "do", "done", "esac", "!", "{", "}")
+)
+# Headers such as `for f in *.py` or `case $x in a` list words, not a command.
+_HEADER_WORDS = frozenset(("for", "select", "case"))
+
+
+@dataclass(frozen=True)
+class BashSegment:
+    """One simple command of a possibly compound command line."""
+
+    # First word after any leading VAR=value assignments.
+    base: str | None
+    sub: str | None
+    # Words of the command, redirections excluded.
+    argv: tuple[str, ...]
+
 
 @dataclass(frozen=True)
 class BashCommand:
@@ -28,6 +75,75 @@ class BashCommand:
     base: str | None
     sub: str | None
     is_compound: bool
+    # Every simple command, in order; a single one unless is_compound.
+    segments: tuple[BashSegment, ...] = ()
+
+
+@dataclass(frozen=True)
+class BashCacheStats:
+    hits: int
+    misses: int
+    entries: int
+    chars: int
+
+
+class BashCommandCache:
+    """LRU cache of analyzed commands keyed by the stripped command string.
+
+    Evicts least recently used commands once the cached commands exceed
+    max_chars characters in total; commands longer than max_command_chars
+    are not cached. Safe to share between threads.
+    """
+
+    def __init__(
+        self,
+        max_chars: int = BASH_CACHE_MAX_CHARS,
+        max_command_chars: int = BASH_CACHE_MAX_COMMAND_CHARS,
+    ) -> None:
+        self.max_chars = max_chars
+        self.max_command_chars = max_command_chars
+        self._entries: OrderedDict[str, BashCommand] = OrderedDict()
+        self._chars = 0
+        self._hits = 0
+        self._misses = 0
+        self._lock = threading.Lock()
+
+    def get(self, stripped: str) -> BashCommand:
+        with self._lock:
+            cached = self._entries.get(stripped)
+            if cached is not None:
+                self._entries.move_to_end(stripped)
+                self._hits += 1
+                return cached
+            self._misses += 1
+        parsed = _analyze(stripped)
+        if len(stripped) > self.max_command_chars:
+            return parsed
+        with self._lock:
+            if stripped not in self._entries:
+                self._entries[stripped] = parsed
+                self._chars += len(stripped)
+                while self._chars > self.max_chars:
+                    evicted, _ = self._entries.popitem(last=False)
+                    self._chars -= len(evicted)
+        return parsed
+
+    def stats(self) -> BashCacheStats:
+        with self._lock:
+            return BashCacheStats(
+                hits=self._hits, misses=self._misses, entries=len(self._entries), chars=self._chars
+            )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._chars = 0
+            self._hits = 0
+            self._misses = 0
+
+
+# Shared by all parsers.
+BASH_COMMAND_CACHE = BashCommandCache()
 
 
 def parse_bash_command(command: str | None) -> BashCommand | None:
@@ -36,6 +152,10 @@ def parse_bash_command(command: str | None) -> BashCommand | None:
     stripped = command.strip()
     if not stripped:
         return None
+    return BASH_COMMAND_CACHE.get(stripped)
+
+
+def _analyze(stripped: str) -> BashCommand:
     is_compound = any(token in stripped for token in COMPOUND_TOKENS)
     first_segment = stripped
     for token in ("&&", "||", "|", ";"):
@@ -49,4 +169,108 @@ def parse_bash_command(command: str | None) -> BashCommand | None:
     sub = None
     if base in BASH_SUBCOMMAND_TOOLS and len(parts) > 1:
         sub = parts[1]
-    return BashCommand(command=stripped, base=base, sub=sub, is_compound=is_compound)
+    return BashCommand(
+        command=stripped,
+        base=base,
+        sub=sub,
+        is_compound=is_compound,
+        segments=split_segments(stripped),
+    )
+
+
+def split_segments(command: str) -> tuple[BashSegment, ...]:
+    """Split a command line into its simple commands.
+
+    Commands are separated by &&, ||, |, |&, ;, & and newlines, and subshell
+    parentheses. Redirections and heredoc bodies are dropped and $(...)
+    substitutions stay part of the word they appear in. Reserved words such as
+    then and do are skipped, so the commands inside if, for and while bodies
+    are kept, and loop or case headers are dropped. Unbalanced quotes fall
+    back to splitting on operators and whitespace.
+    """
+    try:
+        words_list = _segment_words(command)
+    except ValueError:
+        words_list = [part.split() for part in _FALLBACK_SEPARATOR.split(command)]
+    segments = (_segment(_command_words(words)) for words in words_list)
+    return tuple(segment for segment in segments if segment is not None)
+
+
+def _segment_words(command: str) -> list[list[str]]:
+    escaped = _ESCAPED_OPERATOR.sub(lambda match: _ESCAPE_MARKS[match.group(1)], command)
+    marked = _FD_REDIRECT.sub(_FD_MARK, escaped)
+    lexer = shlex.shlex(marked, posix=True, punctuation_chars=_PUNCTUATION_CHARS)
+    lexer.whitespace = " \t\r"
+    lexer.whitespace_split = True
+    tokens: list[str] = []
+    for token in lexer:
+        if ("(" in token or ")" in token) and set(token) <= set(_PUNCTUATION_CHARS):
+            tokens.extend(_PARENS.findall(token))
+        else:
+            tokens.append(token)
+
+    segments: list[list[str]] = [[]]
+    heredocs: list[str] = []
+    i = 0
+    while i < len(tokens):
+        token = tokens[i]
+        i += 1
+        if token == "(" and segments[-1] and segments[-1][-1].endswith("$"):
+            # $(...) substitution: fold it into the word it belongs to.
+            depth = 1
+            parts = ["("]
+            while i < len(tokens) and depth:
+                depth += {"(": 1, ")": -1}.get(tokens[i], 0)
+                parts.append(tokens[i])
+                i += 1
+            segments[-1][-1] += " ".join(parts).replace("( ", "(").replace(" )", ")")
+        elif token in ("(", ")") or set(token) <= _SEPARATOR_CHARS:
+            if token == "\n" and heredocs:
+                # Skip heredoc bodies up to their delimiter lines.
+                for delimiter in heredocs:
+                    while i < len(tokens) and tokens[i] != delimiter:
+                        i += 1
+                    i += 1
+                heredocs.clear()
+            segments.append([])
+        elif set(token) <= _REDIRECT_CHARS:
+            # A redirection: drop the fd number before it and the target after it.
+            if segments[-1] and segments[-1][-1].startswith(_FD_MARK):
+                segments[-1].pop()
+            if i < len(tokens) and not set(tokens[i]) <= set(_PUNCTUATION_CHARS):
+                if token.startswith("<<") and token != "<<<":
+                    heredocs.append(tokens[i].removeprefix("-"))
+                i += 1
+        else:
+            segments[-1].append(token)
+    return [
+        [word.replace(_FD_MARK, "").translate(_UNESCAPE) for word in words] for words in segments
+    ]
+
+
+def _command_words(words: list[str]) -> list[str]:
+    """Drop the reserved words before a command; empty if there is no command."""
+    while words:
+        if words[0] in _HEADER_WORDS:
+            return []
+        if words[0] == "function":
+            # function name { ...: the body follows as its own segment words.
+            words = words[2:]
+        elif words[0] in _RESERVED_WORDS:
+            words = words[1:]
+        else:
+            break
+    return words
+
+
+def _segment(words: list[str]) -> BashSegment | None:
+    if not words:
+        return None
+    command = words
+    while command and _ASSIGNMENT.match(command[0]):
+        command = command[1:]
+    base = command[0] if command else None
+    sub = None
+    if base in BASH_SUBCOMMAND_TOOLS and len(command) > 1:
+        sub = command[1]
+    return BashSegment(base=base, sub=sub, argv=tuple(words))
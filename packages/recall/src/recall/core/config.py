@@ -34,6 +34,10 @@ class AppConfig:
     lock_path: Path
     config_path: Path
     fts: FtsConfig
+    # Directory listings reused by discovery while directory mtimes are unchanged.
+    discovery_cache_path: Path
+    # auto, orjson, msgspec or json (see recall.parsers.decoder).
+    json_decoder: str = "auto"
 
     @classmethod
     def load(cls) -> AppConfig:
@@ -46,12 +50,16 @@ class AppConfig:
         lock_path = Path(os.environ.get("RECALL_LOCK_PATH", default_data_dir / "recall.lock"))
 
         file_fields = None
+        file_decoder = None
         if default_config_path.exists():
             raw = default_config_path.read_text(encoding="utf-8")
             data = tomllib.loads(raw) if raw.strip() else {}
             fts_section = data.get("fts", {}) if isinstance(data, dict) else {}
             if isinstance(fts_section, dict):
                 file_fields = fts_section.get("fields")
+            parsers_section = data.get("parsers", {}) if isinstance(data, dict) else {}
+            if isinstance(parsers_section, dict):
+                file_decoder = parsers_section.get("json_decoder")
 
         env_fields = os.environ.get("RECALL_FTS_FIELDS")
         fts_values = None
@@ -61,10 +69,15 @@ class AppConfig:
             fts_values = [str(field) for field in file_fields]
 
         fts = FtsConfig.from_values(fts_values)
+        json_decoder = os.environ.get("RECALL_JSON_DECODER") or (
+            str(file_decoder) if file_decoder is not None else "auto"
+        )
         return cls(
             data_dir=default_data_dir,
             db_path=db_path,
             lock_path=lock_path,
             config_path=default_config_path,
             fts=fts,
+            discovery_cache_path=default_data_dir / "discovery-cache.json",
+            json_decoder=json_decoder.strip().lower(),
         )
@@ -23,3 +23,30 @@ def tool_call_id(
     if session_id_value is None:
         raise ValueError("session_id is required for orphan tool calls")
     return _sha256_hex(f"{session_id_value}:orphan:{idx}")[:32]
+
+
+class SessionIds:
+    """Derives the message and orphan tool call ids of one session.
+
+    Returns the same ids as message_id() and tool_call_id(): only the hash of
+    the "<session_id>:" key prefix they share is computed once and copied per
+    id. Tool calls of a message use tool_call_id() directly; most messages
+    have one or two, too few for a shared prefix to pay off.
+    """
+
+    __slots__ = ("_message", "_orphan", "session_id")
+
+    def __init__(self, session_id_value: str) -> None:
+        self.session_id = session_id_value
+        self._message = hashlib.sha256(f"{session_id_value}:".encode())
+        self._orphan = hashlib.sha256(f"{session_id_value}:orphan:".encode())
+
+    def message(self, idx: int) -> str:
+        digest = self._message.copy()
+        digest.update(b"%d" % idx)
+        return digest.hexdigest()[:32]
+
+    def orphan_tool_call(self, idx: int) -> str:
+        digest = self._orphan.copy()
+        digest.update(b"%d" % idx)
+        return digest.hexdigest()[:32]
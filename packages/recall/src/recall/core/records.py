@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any
+
+from recall.core.bash import BashSegment
+from recall.core.types import Role, Source
+
+# Parsers build one record per message and tool call on the indexing hot path,
+# so these are plain slotted dataclasses: no validation on construction or
+# assignment and no per-instance __dict__. Fields mirror the pydantic models
+# in recall.core.models, which services build from database rows; the resume
+# state on SessionRecord is only stored, never returned.
+
+
+@dataclass(slots=True)
+class ToolCallRecord:
+    id: str
+    session_id: str
+    message_id: str | None
+    idx: int
+    tool_name: str
+    tool_input: dict[str, Any] | None = None
+
+    bash_command: str | None = None
+    bash_base: str | None = None
+    bash_sub: str | None = None
+    is_compound: bool = False
+    # Stored in the bash_segments table, not on the tool call row.
+    bash_segments: tuple[BashSegment, ...] = ()
+
+    bash_embedding: list[float] | None = None
+
+
+@dataclass(slots=True)
+class MessageRecord:
+    id: str
+    session_id: str
+    idx: int
+    role: Role
+    content: str | None = None
+    thinking: str | None = None
+    timestamp: datetime | None = None
+    has_thinking: bool = False
+    tool_calls: list[ToolCallRecord] = field(default_factory=list)
+
+    content_embedding: list[float] | None = None
+    thinking_embedding: list[float] | None = None
+
+
+@dataclass(slots=True)
+class SessionRecord:
+    id: str
+    source: Source
+    source_path: str
+    file_mtime: float
+    file_size: int
+    source_session_id: str | None = None
+
+    started_at: datetime | None = None
+    ended_at: datetime | None = None
+    duration_seconds: int | None = None
+
+    model: str | None = None
+    cwd: str | None = None
+    git_repo: str | None = None
+    git_branch: str | None = None
+
+    message_count: int = 0
+    tool_count: int = 0
+    input_tokens: int | None = None
+    output_tokens: int | None = None
+
+    is_complete: bool = True
+    indexed_at: datetime | None = None
+
+    # Resume point for append-only files; None when the file must be reparsed.
+    byte_offset: int | None = None
+    prefix_digest: str | None = None
+    parser_state: dict[str, Any] | None = None
+    # Fingerprint of the whole file; a match means only the mtime changed.
+    content_digest: str | None = None
+
+    messages: list[MessageRecord] = field(default_factory=list)
+    orphan_tool_calls: list[ToolCallRecord] = field(default_factory=list)
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import re
 from datetime import UTC, datetime, timedelta
+from typing import overload
 
 _DURATION_RE = re.compile(r"^(\d+)([smhdw])$")
 
@@ -27,6 +28,34 @@ def parse_since(value: str, now: datetime | None = None) -> datetime:
     return parsed.astimezone(UTC)
 
 
+@overload
+def naive_utc(value: datetime) -> datetime: ...
+
+
+@overload
+def naive_utc(value: None) -> None: ...
+
+
+def naive_utc(value: datetime | None) -> datetime | None:
+    """Return value as the naive UTC time stored in TIMESTAMP columns.
+
+    DuckDB converts aware values to the session's local time zone when they
+    are written to a TIMESTAMP column, so aware values are converted here.
+    Naive values are taken to be UTC already.
+    """
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(UTC).replace(tzinfo=None)
+
+
+def parse_duration(value: str) -> timedelta:
+    """Parse a duration such as 90s, 10m or 2h."""
+    match = _DURATION_RE.match(value)
+    if not match:
+        raise ValueError(f"invalid duration: {value}")
+    return _duration_delta(int(match.group(1)), match.group(2))
+
+
 def _duration_delta(amount: int, unit: str) -> timedelta:
     match unit:
         case "s":
@@ -1,26 +1,108 @@
+from recall.db.bulk import (
+    BASH_SEGMENT_SCHEMA,
+    MESSAGE_SCHEMA,
+    SESSION_SCHEMA,
+    TOOL_CALL_SCHEMA,
+    ColumnBatch,
+    SessionColumns,
+    insert_arrow_table,
+    insert_column_batch,
+    registered_ids,
+)
+from recall.db.checkpoints import (
+    IndexCheckpoint,
+    clear_index_checkpoint,
+    fetch_index_checkpoint,
+    read_index_checkpoint,
+    sessions_indexed_since,
+    start_index_checkpoint,
+    update_index_checkpoint,
+)
 from recall.db.connection import RecallLockError, advisory_lock, connect
+from recall.db.failures import (
+    FailedFile,
+    delete_failed_files,
+    fetch_failed_files,
+    record_failed_files,
+)
+from recall.db.fts import (
+    bm25_scores_sql,
+    indexed_fts_fields,
+    load_fts_extension,
+    rebuild_fts_index,
+    update_fts_index,
+)
 from recall.db.queries import (
-    create_fts_indexes,
+    SessionState,
     delete_session,
+    delete_sessions,
+    fetch_parser_state,
     fetch_session_state,
+    fetch_session_states,
     insert_messages,
     insert_session,
     insert_tool_calls,
-    load_fts_extension,
+    update_appended_session,
+    update_session_mtimes,
 )
+from recall.db.runs import IndexRun, fetch_index_runs, insert_index_run
 from recall.db.schema import SCHEMA_VERSION, ensure_schema
+from recall.db.staging import (
+    StagedRows,
+    insert_staged_rows,
+    stage_rows,
+    stage_session_rows,
+    staged_rows,
+)
 
 __all__ = [
+    "BASH_SEGMENT_SCHEMA",
+    "MESSAGE_SCHEMA",
     "SCHEMA_VERSION",
+    "SESSION_SCHEMA",
+    "TOOL_CALL_SCHEMA",
+    "ColumnBatch",
+    "FailedFile",
+    "IndexCheckpoint",
+    "IndexRun",
     "RecallLockError",
+    "SessionColumns",
+    "SessionState",
+    "StagedRows",
     "advisory_lock",
+    "bm25_scores_sql",
+    "clear_index_checkpoint",
     "connect",
-    "create_fts_indexes",
+    "delete_failed_files",
     "delete_session",
+    "delete_sessions",
     "ensure_schema",
+    "fetch_failed_files",
+    "fetch_index_checkpoint",
+    "fetch_index_runs",
+    "fetch_parser_state",
     "fetch_session_state",
+    "fetch_session_states",
+    "indexed_fts_fields",
+    "insert_arrow_table",
+    "insert_column_batch",
+    "insert_index_run",
     "insert_messages",
     "insert_session",
+    "insert_staged_rows",
     "insert_tool_calls",
     "load_fts_extension",
+    "read_index_checkpoint",
+    "rebuild_fts_index",
+    "record_failed_files",
+    "registered_ids",
+    "sessions_indexed_since",
+    "stage_rows",
+    "stage_session_rows",
+    "staged_rows",
+    "start_index_checkpoint",
+    "update_appended_session",
+    "update_fts_index",
+    "update_index_checkpoint",
+    "update_session_mtimes",
 ]
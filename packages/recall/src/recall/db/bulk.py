@@ -0,0 +1,304 @@
+from __future__ import annotations
+
+import json
+from collections.abc import Generator, Iterable, Sequence
+from contextlib import contextmanager
+from datetime import UTC, datetime
+from typing import Any
+
+import duckdb
+import pyarrow as pa
+
+from recall.core.records import MessageRecord, SessionRecord, ToolCallRecord
+from recall.core.time import naive_utc
+
+_EMBEDDING = pa.list_(pa.float32())
+# Naive UTC, as stored in the TIMESTAMP columns.
+_TIMESTAMP = pa.timestamp("us")
+
+SESSION_SCHEMA = pa.schema(
+    [
+        ("id", pa.string()),
+        ("source", pa.string()),
+        ("source_path", pa.string()),
+        ("source_session_id", pa.string()),
+        ("started_at", _TIMESTAMP),
+        ("ended_at", _TIMESTAMP),
+        ("duration_seconds", pa.int32()),
+        ("model", pa.string()),
+        ("cwd", pa.string()),
+        ("git_repo", pa.string()),
+        ("git_branch", pa.string()),
+        ("message_count", pa.int32()),
+        ("tool_count", pa.int32()),
+        ("input_tokens", pa.int64()),
+        ("output_tokens", pa.int64()),
+        ("is_complete", pa.bool_()),
+        ("file_mtime", pa.float64()),
+        ("file_size", pa.int64()),
+        ("indexed_at", _TIMESTAMP),
+        ("byte_offset", pa.int64()),
+        ("prefix_digest", pa.string()),
+        ("parser_state", pa.string()),
+        ("content_digest", pa.string()),
+    ]
+)
+
+MESSAGE_SCHEMA = pa.schema(
+    [
+        ("id", pa.string()),
+        ("session_id", pa.string()),
+        ("idx", pa.int32()),
+        ("role", pa.string()),
+        ("content", pa.string()),
+        ("thinking", pa.string()),
+        ("timestamp", _TIMESTAMP),
+        ("has_thinking", pa.bool_()),
+        ("content_embedding", _EMBEDDING),
+        ("thinking_embedding", _EMBEDDING),
+    ]
+)
+
+TOOL_CALL_SCHEMA = pa.schema(
+    [
+        ("id", pa.string()),
+        ("session_id", pa.string()),
+        ("message_id", pa.string()),
+        ("idx", pa.int32()),
+        ("tool_name", pa.string()),
+        ("tool_input", pa.string()),
+        ("bash_command", pa.string()),
+        ("bash_base", pa.string()),
+        ("bash_sub", pa.string()),
+        ("is_compound", pa.bool_()),
+        ("bash_embedding", _EMBEDDING),
+    ]
+)
+
+BASH_SEGMENT_SCHEMA = pa.schema(
+    [
+        ("tool_call_id", pa.string()),
+        ("session_id", pa.string()),
+        ("idx", pa.int32()),
+        ("base", pa.string()),
+        ("sub", pa.string()),
+        ("argv", pa.list_(pa.string())),
+    ]
+)
+
+
+def _empty_columns(schema: pa.Schema) -> dict[str, list[Any]]:
+    return {name: [] for name in schema.names}
+
+
+class SessionColumns:
+    """The message, tool call and bash segment rows of one session as column buffers.
+
+    Passed to SessionStream.collect_rows() so a parse job flattens rows into
+    columns while it reads the file: no per-message objects are retained or
+    pickled back from parse workers, and the writer only extends its batch.
+    """
+
+    def __init__(self) -> None:
+        self.message_columns = _empty_columns(MESSAGE_SCHEMA)
+        self.tool_call_columns = _empty_columns(TOOL_CALL_SCHEMA)
+        self.bash_segment_columns = _empty_columns(BASH_SEGMENT_SCHEMA)
+        self.row_count = 0
+
+    def add_message(self, message: MessageRecord) -> None:
+        append_message_row(self.message_columns, message)
+        self.row_count += 1
+        for tool_call in message.tool_calls:
+            self.add_tool_call(tool_call)
+
+    def add_tool_call(self, tool_call: ToolCallRecord) -> None:
+        append_tool_call_row(self.tool_call_columns, tool_call)
+        append_bash_segment_rows(self.bash_segment_columns, tool_call)
+        self.row_count += 1
+
+
+class ColumnBatch:
+    """Column buffers for the sessions, messages and tool calls of many sessions.
+
+    Rows are appended per session and loaded with one INSERT ... SELECT per
+    table over an Arrow table, instead of one prepared insert per row.
+    """
+
+    def __init__(self) -> None:
+        # Session rows; messages are only set for sessions added with add().
+        self.sessions: list[SessionRecord] = []
+        # Sessions that already have rows which the batch replaces.
+        self.replaced_ids: list[str] = []
+        self.session_columns = _empty_columns(SESSION_SCHEMA)
+        self.message_columns = _empty_columns(MESSAGE_SCHEMA)
+        self.tool_call_columns = _empty_columns(TOOL_CALL_SCHEMA)
+        self.bash_segment_columns = _empty_columns(BASH_SEGMENT_SCHEMA)
+        # Session, message and tool call rows; segments are derived from tool calls.
+        self.row_count = 0
+
+    def __len__(self) -> int:
+        return len(self.sessions)
+
+    def add(self, session: SessionRecord, *, replaces: bool = False) -> None:
+        self._add_session(session, replaces)
+        for message in session.messages:
+            append_message_row(self.message_columns, message)
+            self.row_count += 1
+            for tool_call in message.tool_calls:
+                self._add_tool_call(tool_call)
+        for tool_call in session.orphan_tool_calls:
+            self._add_tool_call(tool_call)
+
+    def add_columns(
+        self, session: SessionRecord, columns: SessionColumns, *, replaces: bool = False
+    ) -> None:
+        """Add a session parsed in columnar mode; its rows are copied column by column."""
+        self._add_session(session, replaces)
+        for name, values in columns.message_columns.items():
+            self.message_columns[name].extend(values)
+        for name, values in columns.tool_call_columns.items():
+            self.tool_call_columns[name].extend(values)
+        for name, values in columns.bash_segment_columns.items():
+            self.bash_segment_columns[name].extend(values)
+        self.row_count += columns.row_count
+
+    def _add_tool_call(self, tool_call: ToolCallRecord) -> None:
+        append_tool_call_row(self.tool_call_columns, tool_call)
+        append_bash_segment_rows(self.bash_segment_columns, tool_call)
+        self.row_count += 1
+
+    def _add_session(self, session: SessionRecord, replaces: bool) -> None:
+        self.sessions.append(session)
+        if replaces:
+            self.replaced_ids.append(session.id)
+        append_session_row(self.session_columns, session)
+        self.row_count += 1
+
+
+def append_session_row(columns: dict[str, list[Any]], session: SessionRecord) -> None:
+    columns["id"].append(session.id)
+    columns["source"].append(session.source.value)
+    columns["source_path"].append(session.source_path)
+    columns["source_session_id"].append(session.source_session_id)
+    columns["started_at"].append(naive_utc(session.started_at))
+    columns["ended_at"].append(naive_utc(session.ended_at))
+    columns["duration_seconds"].append(session.duration_seconds)
+    columns["model"].append(session.model)
+    columns["cwd"].append(session.cwd)
+    columns["git_repo"].append(session.git_repo)
+    columns["git_branch"].append(session.git_branch)
+    columns["message_count"].append(session.message_count)
+    columns["tool_count"].append(session.tool_count)
+    columns["input_tokens"].append(session.input_tokens)
+    columns["output_tokens"].append(session.output_tokens)
+    columns["is_complete"].append(session.is_complete)
+    columns["file_mtime"].append(session.file_mtime)
+    columns["file_size"].append(session.file_size)
+    columns["indexed_at"].append(naive_utc(session.indexed_at or datetime.now(UTC)))
+    columns["byte_offset"].append(session.byte_offset)
+    columns["prefix_digest"].append(session.prefix_digest)
+    columns["parser_state"].append(
+        json.dumps(session.parser_state) if session.parser_state is not None else None
+    )
+    columns["content_digest"].append(session.content_digest)
+
+
+def append_message_row(columns: dict[str, list[Any]], message: MessageRecord) -> None:
+    columns["id"].append(message.id)
+    columns["session_id"].append(message.session_id)
+    columns["idx"].append(message.idx)
+    columns["role"].append(message.role.value)
+    columns["content"].append(message.content)
+    columns["thinking"].append(message.thinking)
+    columns["timestamp"].append(naive_utc(message.timestamp))
+    columns["has_thinking"].append(message.has_thinking)
+    columns["content_embedding"].append(message.content_embedding)
+    columns["thinking_embedding"].append(message.thinking_embedding)
+
+
+def append_tool_call_row(columns: dict[str, list[Any]], tool_call: ToolCallRecord) -> None:
+    columns["id"].append(tool_call.id)
+    columns["session_id"].append(tool_call.session_id)
+    columns["message_id"].append(tool_call.message_id)
+    columns["idx"].append(tool_call.idx)
+    columns["tool_name"].append(tool_call.tool_name)
+    columns["tool_input"].append(
+        json.dumps(tool_call.tool_input) if tool_call.tool_input is not None else None
+    )
+    columns["bash_command"].append(tool_call.bash_command)
+    columns["bash_base"].append(tool_call.bash_base)
+    columns["bash_sub"].append(tool_call.bash_sub)
+    columns["is_compound"].append(tool_call.is_compound)
+    columns["bash_embedding"].append(tool_call.bash_embedding)
+
+
+def append_bash_segment_rows(columns: dict[str, list[Any]], tool_call: ToolCallRecord) -> None:
+    for idx, segment in enumerate(tool_call.bash_segments):
+        columns["tool_call_id"].append(tool_call.id)
+        columns["session_id"].append(tool_call.session_id)
+        columns["idx"].append(idx)
+        columns["base"].append(segment.base)
+        columns["sub"].append(segment.sub)
+        columns["argv"].append(list(segment.argv))
+
+
+def message_columns(messages: Iterable[MessageRecord]) -> dict[str, list[Any]]:
+    columns = _empty_columns(MESSAGE_SCHEMA)
+    for message in messages:
+        append_message_row(columns, message)
+    return columns
+
+
+def tool_call_columns(tool_calls: Iterable[ToolCallRecord]) -> dict[str, list[Any]]:
+    columns = _empty_columns(TOOL_CALL_SCHEMA)
+    for tool_call in tool_calls:
+        append_tool_call_row(columns, tool_call)
+    return columns
+
+
+def bash_segment_columns(tool_calls: Iterable[ToolCallRecord]) -> dict[str, list[Any]]:
+    columns = _empty_columns(BASH_SEGMENT_SCHEMA)
+    for tool_call in tool_calls:
+        append_bash_segment_rows(columns, tool_call)
+    return columns
+
+
+def load_columns(
+    conn: duckdb.DuckDBPyConnection,
+    table: str,
+    schema: pa.Schema,
+    columns: dict[str, list[Any]],
+) -> None:
+    if not columns[schema.names[0]]:
+        return
+    insert_arrow_table(conn, table, pa.Table.from_pydict(columns, schema=schema))
+
+
+def insert_arrow_table(conn: duckdb.DuckDBPyConnection, table: str, rows: pa.Table) -> None:
+    if rows.num_rows == 0:
+        return
+    names = ", ".join(rows.column_names)
+    view_name = f"_recall_{table}_batch"
+    conn.register(view_name, rows)
+    try:
+        conn.execute(f"INSERT INTO {table} ({names}) SELECT {names} FROM {view_name}")
+    finally:
+        conn.unregister(view_name)
+
+
+@contextmanager
+def registered_ids(conn: duckdb.DuckDBPyConnection, ids: Sequence[str]) -> Generator[str]:
+    """Expose ids as a one-column view so set-based statements can join on it."""
+    view_name = "_recall_batch_ids"
+    conn.register(view_name, pa.table({"id": pa.array(list(ids), pa.string())}))
+    try:
+        yield view_name
+    finally:
+        conn.unregister(view_name)
+
+
+def insert_column_batch(conn: duckdb.DuckDBPyConnection, batch: ColumnBatch) -> None:
+    load_columns(conn, "sessions", SESSION_SCHEMA, batch.session_columns)
+    load_columns(conn, "messages", MESSAGE_SCHEMA, batch.message_columns)
+    load_columns(conn, "tool_calls", TOOL_CALL_SCHEMA, batch.tool_call_columns)
+    load_columns(conn, "bash_segments", BASH_SEGMENT_SCHEMA, batch.bash_segment_columns)
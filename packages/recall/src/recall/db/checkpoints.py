@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+
+import duckdb
+
+from recall.core.time import naive_utc
+
+logger = logging.getLogger("recall.db")
+
+_COLUMNS = "started_at, mode, source, checkpointed_at, sessions_done"
+
+
+@dataclass(frozen=True)
+class IndexCheckpoint:
+    """Progress of a full reindex that has not finished yet.
+
+    Sessions indexed at or after started_at are the ones the run completed;
+    the row is removed when the run finishes.
+    """
+
+    started_at: datetime
+    # full or recreate.
+    mode: str
+    source: str | None
+    checkpointed_at: datetime
+    sessions_done: int
+
+
+def read_index_checkpoint(db_path: Path) -> IndexCheckpoint | None:
+    """Return the unfinished reindex recorded in the database at db_path, if any.
+
+    Read before connecting so `--recreate` can resume an interrupted rebuild
+    instead of backing up the partial database and starting over.
+    """
+    if not db_path.exists():
+        return None
+    try:
+        conn = duckdb.connect(str(db_path), read_only=True)
+    except duckdb.Error as err:
+        logger.warning("could not read index checkpoint from %s: %s", db_path, err)
+        return None
+    try:
+        row = conn.execute(
+            "SELECT COUNT(*) FROM information_schema.tables WHERE table_name = 'index_checkpoints'"
+        ).fetchone()
+        if not row or not row[0]:
+            return None
+        return fetch_index_checkpoint(conn)
+    finally:
+        conn.close()
+
+
+def fetch_index_checkpoint(conn: duckdb.DuckDBPyConnection) -> IndexCheckpoint | None:
+    row = conn.execute(
+        f"SELECT {_COLUMNS} FROM index_checkpoints ORDER BY started_at DESC LIMIT 1"
+    ).fetchone()
+    if row is None:
+        return None
+    return IndexCheckpoint(
+        started_at=row[0],
+        mode=row[1],
+        source=row[2],
+        checkpointed_at=row[3],
+        sessions_done=int(row[4]),
+    )
+
+
+def start_index_checkpoint(conn: duckdb.DuckDBPyConnection, checkpoint: IndexCheckpoint) -> None:
+    conn.execute("DELETE FROM index_checkpoints")
+    conn.execute(
+        f"INSERT INTO index_checkpoints ({_COLUMNS}) VALUES (?, ?, ?, ?, ?)",
+        [
+            naive_utc(checkpoint.started_at),
+            checkpoint.mode,
+            checkpoint.source,
+            naive_utc(checkpoint.checkpointed_at),
+            checkpoint.sessions_done,
+        ],
+    )
+
+
+def update_index_checkpoint(
+    conn: duckdb.DuckDBPyConnection, checkpointed_at: datetime, sessions_done: int
+) -> None:
+    conn.execute(
+        "UPDATE index_checkpoints SET checkpointed_at = ?, sessions_done = ?",
+        [naive_utc(checkpointed_at), sessions_done],
+    )
+
+
+def clear_index_checkpoint(conn: duckdb.DuckDBPyConnection) -> None:
+    conn.execute("DELETE FROM index_checkpoints")
+
+
+def sessions_indexed_since(conn: duckdb.DuckDBPyConnection, started_at: datetime) -> list[str]:
+    """Return ids of sessions written at or after started_at."""
+    rows = conn.execute(
+        "SELECT id FROM sessions WHERE indexed_at >= ?", [naive_utc(started_at)]
+    ).fetchall()
+    return [str(row[0]) for row in rows]
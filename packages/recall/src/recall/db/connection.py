@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import logging
 import os
 from contextlib import contextmanager
 from datetime import UTC, datetime
@@ -10,6 +11,8 @@ import duckdb
 from recall.core.config import AppConfig
 from recall.db.schema import ensure_schema
 
+logger = logging.getLogger("recall.db")
+
 
 class RecallLockError(RuntimeError):
     pass
@@ -38,19 +41,60 @@ def advisory_lock(lock_path: Path):
 
 def connect(config: AppConfig, *, recreate: bool = False) -> duckdb.DuckDBPyConnection:
     config.data_dir.mkdir(parents=True, exist_ok=True)
-    if recreate:
-        _backup_database(config.db_path)
+    backup_path = _backup_database(config.db_path) if recreate else None
     conn = duckdb.connect(str(config.db_path))
     ensure_schema(conn)
+    if backup_path is not None:
+        _copy_index_runs(conn, backup_path)
     return conn
 
 
-def _backup_database(db_path: Path) -> None:
-    if not db_path.exists():
+def _copy_index_runs(conn: duckdb.DuckDBPyConnection, backup_path: Path) -> None:
+    # Run history is kept across rebuilds so throughput can be compared before
+    # and after an upgrade.
+    try:
+        # ATTACH takes no parameters; quote the path as a string literal.
+        quoted = str(backup_path).replace("'", "''")
+        conn.execute(f"ATTACH '{quoted}' AS previous (READ_ONLY)")
+    except duckdb.Error as err:
+        logger.warning("could not read index history from %s: %s", backup_path, err)
         return
+    try:
+        row = conn.execute(
+            "SELECT COUNT(*) FROM information_schema.tables "
+            "WHERE table_catalog = 'previous' AND table_name = 'index_runs'"
+        ).fetchone()
+        if row and row[0]:
+            conn.execute("INSERT INTO index_runs BY NAME SELECT * FROM previous.index_runs")
+    finally:
+        conn.execute("DETACH previous")
+
+
+def _backup_database(db_path: Path) -> Path | None:
+    if not db_path.exists():
+        return None
+    wal_path = db_path.with_suffix(db_path.suffix + ".wal")
+    if wal_path.exists():
+        _checkpoint(db_path)
     timestamp = datetime.now(UTC).strftime("%Y%m%d%H%M%S")
     backup_path = db_path.with_suffix(f".bak-{timestamp}")
     os.replace(db_path, backup_path)
-    wal_path = db_path.with_suffix(db_path.suffix + ".wal")
     if wal_path.exists():
-        os.replace(wal_path, wal_path.with_suffix(wal_path.suffix + f".{timestamp}.bak"))
+        # Left over when the checkpoint failed; DuckDB replays a WAL named after
+        # its database file, so the backup still opens with every commit.
+        os.replace(wal_path, backup_path.with_name(backup_path.name + ".wal"))
+    return backup_path
+
+
+def _checkpoint(db_path: Path) -> None:
+    # Commits since the last checkpoint (such as the latest index_runs rows)
+    # are only in the WAL; fold them into the file before it is moved aside.
+    try:
+        conn = duckdb.connect(str(db_path))
+    except duckdb.Error as err:
+        logger.warning("could not checkpoint %s before backing it up: %s", db_path, err)
+        return
+    try:
+        conn.execute("CHECKPOINT")
+    finally:
+        conn.close()
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime
+
+import duckdb
+
+from recall.db.bulk import registered_ids
+
+_COLUMNS = "source_path, source, file_mtime, file_size, error, attempts, failed_at, retry_after"
+
+
+@dataclass(frozen=True)
+class FailedFile:
+    """A session file that failed to index, skipped until it changes or retry_after passes."""
+
+    source_path: str
+    source: str
+    # mtime and size of the file when it failed.
+    file_mtime: float
+    file_size: int
+    error: str
+    # Consecutive failed attempts, including this one.
+    attempts: int
+    # Naive UTC timestamps.
+    failed_at: datetime
+    retry_after: datetime
+
+
+def fetch_failed_files(conn: duckdb.DuckDBPyConnection) -> dict[str, FailedFile]:
+    """Return all recorded failures keyed by source path."""
+    rows = conn.execute(f"SELECT {_COLUMNS} FROM failed_files").fetchall()
+    return {
+        row[0]: FailedFile(
+            source_path=row[0],
+            source=row[1],
+            file_mtime=float(row[2]),
+            file_size=int(row[3]),
+            error=row[4],
+            attempts=int(row[5]),
+            failed_at=row[6],
+            retry_after=row[7],
+        )
+        for row in rows
+    }
+
+
+def record_failed_files(conn: duckdb.DuckDBPyConnection, failures: list[FailedFile]) -> None:
+    """Insert failures, replacing earlier records of the same paths."""
+    if not failures:
+        return
+    delete_failed_files(conn, [failure.source_path for failure in failures])
+    conn.executemany(
+        f"INSERT INTO failed_files ({_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        [
+            [
+                failure.source_path,
+                failure.source,
+                failure.file_mtime,
+                failure.file_size,
+                failure.error,
+                failure.attempts,
+                failure.failed_at,
+                failure.retry_after,
+            ]
+            for failure in failures
+        ],
+    )
+
+
+def delete_failed_files(conn: duckdb.DuckDBPyConnection, paths: list[str]) -> None:
+    if not paths:
+        return
+    with registered_ids(conn, paths) as ids:
+        conn.execute(f"DELETE FROM failed_files WHERE source_path IN (SELECT id FROM {ids})")
@@ -0,0 +1,213 @@
+from __future__ import annotations
+
+from collections.abc import Sequence
+from functools import cache
+from pathlib import Path
+
+import duckdb
+import pyarrow as pa
+
+from recall.core.config import FtsConfig
+from recall.db.bulk import registered_ids
+
+# Searchable field -> (table, column). Postings are keyed by the row id of that table.
+FTS_FIELDS: dict[str, tuple[str, str]] = {
+    "content": ("messages", "content"),
+    "thinking": ("messages", "thinking"),
+    "bash": ("tool_calls", "bash_command"),
+}
+
+# Tokenizer and ranking constants of DuckDB's fts extension, so scores match match_bm25.
+TOKEN_SEPARATORS = "[0-9!@#$%^&*()_+={}\\[\\]:;<>,.?~\\\\/\\|'\"`-]+"
+BM25_K = 1.2
+BM25_B = 0.75
+
+_STOPWORDS_VIEW = "_recall_fts_stopwords"
+
+
+def load_fts_extension(conn: duckdb.DuckDBPyConnection) -> None:
+    conn.execute("INSTALL fts")
+    conn.execute("LOAD fts")
+
+
+def indexed_fts_fields(conn: duckdb.DuckDBPyConnection) -> tuple[str, ...]:
+    rows = conn.execute("SELECT field FROM fts_fields ORDER BY field").fetchall()
+    return tuple(str(row[0]) for row in rows)
+
+
+def update_fts_index(
+    conn: duckdb.DuckDBPyConnection, fts: FtsConfig, session_ids: Sequence[str]
+) -> None:
+    """Re-tokenize the given sessions into the inverted index.
+
+    Postings of other sessions are left alone, so the cost scales with the
+    change. Deleted sessions simply lose their postings. A change of the
+    configured fields rebuilds the whole index.
+    """
+    if indexed_fts_fields(conn) != tuple(sorted(fts.fields)):
+        rebuild_fts_index(conn, fts)
+        return
+    if not session_ids or not fts.fields:
+        return
+    load_fts_extension(conn)
+    with registered_ids(conn, session_ids) as ids_view:
+        scope = f"session_id IN (SELECT id FROM {ids_view})"
+        conn.execute("BEGIN")
+        try:
+            _add_lengths(conn, scope, -1)
+            conn.execute(f"DELETE FROM fts_postings WHERE {scope}")
+            conn.execute(f"DELETE FROM fts_documents WHERE {scope}")
+            _index_rows(conn, fts.fields, scope)
+            _add_lengths(conn, scope, 1)
+            _count_documents(conn)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+
+def rebuild_fts_index(conn: duckdb.DuckDBPyConnection, fts: FtsConfig) -> None:
+    if fts.fields:
+        load_fts_extension(conn)
+    conn.execute("BEGIN")
+    try:
+        conn.execute("DELETE FROM fts_postings")
+        conn.execute("DELETE FROM fts_documents")
+        conn.execute("DELETE FROM fts_fields")
+        _index_rows(conn, fts.fields, "TRUE")
+        for field in sorted(fts.fields):
+            conn.execute(
+                "INSERT INTO fts_fields (field, documents, length) VALUES (?, 0, 0)", [field]
+            )
+        _add_lengths(conn, "TRUE", 1)
+        _count_documents(conn)
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+
+def bm25_scores_sql(fields: Sequence[str]) -> str:
+    """Query returning (doc_id, score) for rows matching the `?` search string.
+
+    All fields must belong to one table. As with match_bm25, every row of that
+    table counts as a document, and a document's length is its number of
+    indexed terms across the fields. Corpus totals come from fts_fields.
+    """
+    tables = {FTS_FIELDS[field][0] for field in fields}
+    if len(tables) != 1:
+        raise ValueError(f"FTS fields must share one table: {', '.join(fields)}")
+    field_list = ", ".join(_sql_literal(field) for field in fields)
+    return f"""
+        WITH query_terms AS (
+            SELECT DISTINCT stem(unnest({_tokens_sql("?")}), 'porter') AS term
+        ),
+        term_tf AS (
+            SELECT p.term, p.doc_id, SUM(p.tf) AS tf
+            FROM fts_postings p
+            JOIN query_terms q ON q.term = p.term
+            WHERE p.field IN ({field_list})
+            GROUP BY p.term, p.doc_id
+        ),
+        term_df AS (
+            SELECT term, COUNT(*) AS df FROM term_tf GROUP BY term
+        ),
+        documents AS (
+            SELECT doc_id, SUM(length) AS length
+            FROM fts_documents
+            WHERE field IN ({field_list}) AND doc_id IN (SELECT doc_id FROM term_tf)
+            GROUP BY doc_id
+        ),
+        stats AS (
+            SELECT MAX(documents) AS num_docs, SUM(length) / MAX(documents) AS avgdl
+            FROM fts_fields
+            WHERE field IN ({field_list})
+        )
+        SELECT
+            t.doc_id,
+            SUM(
+                log(((stats.num_docs - df.df + 0.5) / (df.df + 0.5)) + 1)
+                * (t.tf * ({BM25_K} + 1))
+                / (t.tf + {BM25_K} * (1 - {BM25_B} + {BM25_B} * d.length / stats.avgdl))
+            ) AS score
+        FROM term_tf t
+        JOIN term_df df ON df.term = t.term
+        JOIN documents d ON d.doc_id = t.doc_id
+        CROSS JOIN stats
+        GROUP BY t.doc_id
+    """
+
+
+def _index_rows(conn: duckdb.DuckDBPyConnection, fields: Sequence[str], scope: str) -> None:
+    if not fields:
+        return
+    conn.register(_STOPWORDS_VIEW, pa.table({"word": pa.array(_stopwords(), pa.string())}))
+    try:
+        for field in fields:
+            table, column = FTS_FIELDS[field]
+            conn.execute(
+                f"""
+                INSERT INTO fts_postings (term, doc_id, session_id, field, tf)
+                SELECT stem(token, 'porter'), doc_id, session_id, ?, COUNT(*)
+                FROM (
+                    SELECT id AS doc_id, session_id, unnest({_tokens_sql(column)}) AS token
+                    FROM {table}
+                    WHERE {column} IS NOT NULL AND {scope}
+                )
+                WHERE token <> '' AND token NOT IN (SELECT word FROM {_STOPWORDS_VIEW})
+                GROUP BY ALL
+                """,
+                [field],
+            )
+            conn.execute(
+                f"""
+                INSERT INTO fts_documents (doc_id, session_id, field, length)
+                SELECT doc_id, session_id, field, SUM(tf)
+                FROM fts_postings
+                WHERE field = ? AND {scope}
+                GROUP BY ALL
+                """,
+                [field],
+            )
+    finally:
+        conn.unregister(_STOPWORDS_VIEW)
+
+
+def _add_lengths(conn: duckdb.DuckDBPyConnection, scope: str, sign: int) -> None:
+    # Totals are adjusted by the documents in scope before and after they are
+    # re-tokenized, so searches never sum fts_documents.
+    conn.execute(
+        f"""
+        UPDATE fts_fields SET length = length + ? * (
+            SELECT COALESCE(SUM(d.length), 0)
+            FROM fts_documents d
+            WHERE d.field = fts_fields.field AND {scope}
+        )
+        """,
+        [sign],
+    )
+
+
+def _count_documents(conn: duckdb.DuckDBPyConnection) -> None:
+    for field, (table, _) in FTS_FIELDS.items():
+        conn.execute(
+            f"UPDATE fts_fields SET documents = (SELECT COUNT(*) FROM {table}) WHERE field = ?",
+            [field],
+        )
+
+
+def _tokens_sql(expression: str) -> str:
+    return (
+        f"string_split_regex(regexp_replace(lower(strip_accents(CAST({expression} AS VARCHAR))), "
+        f"{_sql_literal(TOKEN_SEPARATORS)}, ' ', 'g'), '\\s+')"
+    )
+
+
+def _sql_literal(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+
+@cache
+def _stopwords() -> list[str]:
+    path = Path(__file__).with_name("stopwords.txt")
+    return path.read_text(encoding="utf-8").split()
@@ -1,54 +1,106 @@
 from __future__ import annotations
 
 import json
-from collections.abc import Iterable
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass
 from datetime import UTC, datetime
+from typing import Any
 
 import duckdb
-
-from recall.core.config import FtsConfig
-from recall.core.models import Message, Session, ToolCall
-
-
-def load_fts_extension(conn: duckdb.DuckDBPyConnection) -> None:
-    conn.execute("INSTALL fts")
-    conn.execute("LOAD fts")
+import pyarrow as pa
+
+from recall.core.records import MessageRecord, SessionRecord, ToolCallRecord
+from recall.core.time import naive_utc
+from recall.core.types import Source
+from recall.db.bulk import (
+    BASH_SEGMENT_SCHEMA,
+    MESSAGE_SCHEMA,
+    TOOL_CALL_SCHEMA,
+    bash_segment_columns,
+    load_columns,
+    message_columns,
+    registered_ids,
+    tool_call_columns,
+)
+
+
+@dataclass(frozen=True)
+class SessionState:
+    id: str
+    file_mtime: float
+    file_size: int
+    byte_offset: int | None
+    prefix_digest: str | None
+    parser_state: dict[str, Any] | None
+    content_digest: str | None = None
+
+
+def fetch_session_state(conn: duckdb.DuckDBPyConnection, source_path: str) -> SessionState | None:
+    row = conn.execute(
+        """
+        SELECT id, file_mtime, file_size, byte_offset, prefix_digest, parser_state, content_digest
+        FROM sessions
+        WHERE source_path = ?
+        """,
+        [source_path],
+    ).fetchone()
+    if row is None:
+        return None
+    session_id, file_mtime, file_size, byte_offset, prefix_digest, parser_state, digest = row
+    return SessionState(
+        id=str(session_id),
+        file_mtime=float(file_mtime),
+        file_size=int(file_size),
+        byte_offset=int(byte_offset) if byte_offset is not None else None,
+        prefix_digest=prefix_digest,
+        parser_state=json.loads(parser_state) if parser_state is not None else None,
+        content_digest=digest,
+    )
 
 
-def create_fts_indexes(conn: duckdb.DuckDBPyConnection, fts: FtsConfig) -> None:
-    if not fts.fields:
-        return
-    load_fts_extension(conn)
-    message_fields = [field for field in ("content", "thinking") if field in fts.fields]
-    if message_fields:
-        columns = ", ".join(message_fields)
-        conn.execute(
-            "PRAGMA create_fts_index(messages, id, "
-            f"{columns}, stemmer='porter', stopwords='english', overwrite=1)"
-        )
-    if "bash" in fts.fields:
-        conn.execute(
-            "PRAGMA create_fts_index(tool_calls, id, bash_command, "
-            "stemmer='porter', stopwords='english', overwrite=1)"
+def fetch_session_states(
+    conn: duckdb.DuckDBPyConnection, sources: Sequence[Source]
+) -> dict[str, SessionState]:
+    """Load change-detection state for every session of the given sources, keyed by path.
+
+    parser_state is left unset; fetch it per session with fetch_parser_state.
+    """
+    if not sources:
+        return {}
+    placeholders = ", ".join("?" for _ in sources)
+    rows = conn.execute(
+        f"""
+        SELECT source_path, id, file_mtime, file_size, byte_offset, prefix_digest, content_digest
+        FROM sessions
+        WHERE source IN ({placeholders})
+        """,
+        [source.value for source in sources],
+    ).fetchall()
+    return {
+        str(source_path): SessionState(
+            id=str(session_id),
+            file_mtime=float(mtime),
+            file_size=int(size),
+            byte_offset=int(byte_offset) if byte_offset is not None else None,
+            prefix_digest=prefix_digest,
+            parser_state=None,
+            content_digest=digest,
         )
+        for source_path, session_id, mtime, size, byte_offset, prefix_digest, digest in rows
+    }
 
 
-def fetch_session_state(
-    conn: duckdb.DuckDBPyConnection, source_path: str
-) -> tuple[str, float, int] | None:
-    row = conn.execute(
-        "SELECT id, file_mtime, file_size FROM sessions WHERE source_path = ?",
-        [source_path],
-    ).fetchone()
-    if row is None:
+def fetch_parser_state(conn: duckdb.DuckDBPyConnection, session_id: str) -> dict[str, Any] | None:
+    row = conn.execute("SELECT parser_state FROM sessions WHERE id = ?", [session_id]).fetchone()
+    if row is None or row[0] is None:
         return None
-    session_id, file_mtime, file_size = row
-    return str(session_id), float(file_mtime), int(file_size)
+    return json.loads(row[0])
 
 
 def delete_session(conn: duckdb.DuckDBPyConnection, session_id: str) -> None:
-    # Delete in order: tool_calls -> messages -> sessions (no CASCADE in DuckDB)
+    # Delete in order: bash_segments -> tool_calls -> messages -> sessions (no CASCADE in DuckDB)
     # Delete tool_calls by session_id AND by message_id to handle FK constraints
+    conn.execute("DELETE FROM bash_segments WHERE session_id = ?", [session_id])
     conn.execute("DELETE FROM tool_calls WHERE session_id = ?", [session_id])
     conn.execute(
         "DELETE FROM tool_calls WHERE message_id IN (SELECT id FROM messages WHERE session_id = ?)",
@@ -58,7 +110,22 @@ def delete_session(conn: duckdb.DuckDBPyConnection, session_id: str) -> None:
     conn.execute("DELETE FROM sessions WHERE id = ?", [session_id])
 
 
-def insert_session(conn: duckdb.DuckDBPyConnection, session: Session) -> None:
+def delete_sessions(conn: duckdb.DuckDBPyConnection, session_ids: Sequence[str]) -> None:
+    # Same dependency order as delete_session, one statement per table for all ids.
+    if not session_ids:
+        return
+    with registered_ids(conn, session_ids) as ids:
+        conn.execute(f"DELETE FROM bash_segments WHERE session_id IN (SELECT id FROM {ids})")
+        conn.execute(f"DELETE FROM tool_calls WHERE session_id IN (SELECT id FROM {ids})")
+        conn.execute(
+            "DELETE FROM tool_calls WHERE message_id IN "
+            f"(SELECT id FROM messages WHERE session_id IN (SELECT id FROM {ids}))"
+        )
+        conn.execute(f"DELETE FROM messages WHERE session_id IN (SELECT id FROM {ids})")
+        conn.execute(f"DELETE FROM sessions WHERE id IN (SELECT id FROM {ids})")
+
+
+def insert_session(conn: duckdb.DuckDBPyConnection, session: SessionRecord) -> None:
     conn.execute(
         """
         INSERT INTO sessions (
@@ -66,12 +133,14 @@ def insert_session(conn: duckdb.DuckDBPyConnection, session: Session) -> None:
             started_at, ended_at, duration_seconds,
             model, cwd, git_repo, git_branch,
             message_count, tool_count, input_tokens, output_tokens,
-            is_complete, file_mtime, file_size, indexed_at
+            is_complete, file_mtime, file_size, indexed_at,
+            byte_offset, prefix_digest, parser_state, content_digest
         ) VALUES (
             ?, ?, ?, ?,
             ?, ?, ?,
             ?, ?, ?, ?,
             ?, ?, ?, ?,
+            ?, ?, ?, ?,
             ?, ?, ?, ?
         )
         """,
@@ -80,8 +149,8 @@ def insert_session(conn: duckdb.DuckDBPyConnection, session: Session) -> None:
             session.source.value,
             session.source_path,
             session.source_session_id,
-            session.started_at,
-            session.ended_at,
+            naive_utc(session.started_at),
+            naive_utc(session.ended_at),
             session.duration_seconds,
             session.model,
             session.cwd,
@@ -94,65 +163,81 @@ def insert_session(conn: duckdb.DuckDBPyConnection, session: Session) -> None:
             session.is_complete,
             session.file_mtime,
             session.file_size,
-            session.indexed_at or datetime.now(UTC),
+            naive_utc(session.indexed_at or datetime.now(UTC)),
+            session.byte_offset,
+            session.prefix_digest,
+            json.dumps(session.parser_state) if session.parser_state is not None else None,
+            session.content_digest,
         ],
     )
 
 
-def insert_messages(conn: duckdb.DuckDBPyConnection, messages: Iterable[Message]) -> None:
-    rows = [
-        (
-            message.id,
-            message.session_id,
-            message.idx,
-            message.role.value,
-            message.content,
-            message.thinking,
-            message.timestamp,
-            message.has_thinking,
-            message.content_embedding,
-            message.thinking_embedding,
-        )
-        for message in messages
-    ]
-    if not rows:
-        return
-    conn.executemany(
+def update_appended_session(conn: duckdb.DuckDBPyConnection, session: SessionRecord) -> None:
+    # Only columns without an index may be updated while messages/tool_calls
+    # reference the row; DuckDB rewrites indexed updates as delete + insert.
+    conn.execute(
         """
-        INSERT INTO messages (
-            id, session_id, idx, role, content, thinking, timestamp, has_thinking,
-            content_embedding, thinking_embedding
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        UPDATE sessions SET
+            source_session_id = ?, ended_at = ?, duration_seconds = ?,
+            model = ?, git_branch = ?,
+            message_count = ?, tool_count = ?, input_tokens = ?, output_tokens = ?,
+            is_complete = ?, file_mtime = ?, file_size = ?, indexed_at = ?,
+            byte_offset = ?, prefix_digest = ?, parser_state = ?, content_digest = ?
+        WHERE id = ?
         """,
-        rows,
+        [
+            session.source_session_id,
+            naive_utc(session.ended_at),
+            session.duration_seconds,
+            session.model,
+            session.git_branch,
+            session.message_count,
+            session.tool_count,
+            session.input_tokens,
+            session.output_tokens,
+            session.is_complete,
+            session.file_mtime,
+            session.file_size,
+            naive_utc(session.indexed_at or datetime.now(UTC)),
+            session.byte_offset,
+            session.prefix_digest,
+            json.dumps(session.parser_state) if session.parser_state is not None else None,
+            session.content_digest,
+            session.id,
+        ],
     )
 
 
-def insert_tool_calls(conn: duckdb.DuckDBPyConnection, tool_calls: Iterable[ToolCall]) -> None:
-    rows = [
-        (
-            tool_call.id,
-            tool_call.session_id,
-            tool_call.message_id,
-            tool_call.idx,
-            tool_call.tool_name,
-            json.dumps(tool_call.tool_input) if tool_call.tool_input is not None else None,
-            tool_call.bash_command,
-            tool_call.bash_base,
-            tool_call.bash_sub,
-            tool_call.is_compound,
-            tool_call.bash_embedding,
-        )
-        for tool_call in tool_calls
-    ]
-    if not rows:
+def update_session_mtimes(conn: duckdb.DuckDBPyConnection, mtimes: dict[str, float]) -> None:
+    """Store new file mtimes, keyed by session id, for files whose content is unchanged."""
+    if not mtimes:
         return
-    conn.executemany(
-        """
-        INSERT INTO tool_calls (
-            id, session_id, message_id, idx,
-            tool_name, tool_input, bash_command, bash_base, bash_sub, is_compound, bash_embedding
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """,
-        rows,
+    view_name = "_recall_session_mtimes"
+    conn.register(
+        view_name,
+        pa.table(
+            {
+                "id": pa.array(list(mtimes), pa.string()),
+                "file_mtime": pa.array(list(mtimes.values()), pa.float64()),
+            }
+        ),
     )
+    try:
+        conn.execute(
+            f"UPDATE sessions SET file_mtime = m.file_mtime FROM {view_name} m "
+            "WHERE sessions.id = m.id"
+        )
+    finally:
+        conn.unregister(view_name)
+
+
+def insert_messages(conn: duckdb.DuckDBPyConnection, messages: Iterable[MessageRecord]) -> None:
+    load_columns(conn, "messages", MESSAGE_SCHEMA, message_columns(messages))
+
+
+def insert_tool_calls(
+    conn: duckdb.DuckDBPyConnection, tool_calls: Iterable[ToolCallRecord]
+) -> None:
+    tool_calls = list(tool_calls)
+    load_columns(conn, "tool_calls", TOOL_CALL_SCHEMA, tool_call_columns(tool_calls))
+    load_columns(conn, "bash_segments", BASH_SEGMENT_SCHEMA, bash_segment_columns(tool_calls))
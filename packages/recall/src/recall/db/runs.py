@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any
+
+import duckdb
+
+from recall.core.time import naive_utc
+
+_COLUMNS = (
+    "started_at, ended_at, mode, source, recall_version, workers, total, indexed, skipped, "
+    "failed, missing, bytes_read, rows_inserted, phases, sources"
+)
+
+
+@dataclass(frozen=True)
+class IndexRun:
+    """One `recall index` run as recorded in index_runs."""
+
+    started_at: datetime
+    ended_at: datetime
+    # incremental, full or recreate.
+    mode: str
+    # The --source filter; None when all sources were indexed.
+    source: str | None
+    recall_version: str | None
+    workers: int
+    total: int
+    indexed: int
+    skipped: int
+    failed: int
+    missing: int
+    bytes_read: int
+    rows_inserted: int
+    # Cumulative seconds per phase (see recall.services.profile.PHASES).
+    phases: dict[str, float]
+    # Per source: parsed sessions, bytes and parse seconds.
+    sources: dict[str, dict[str, Any]]
+
+
+def insert_index_run(conn: duckdb.DuckDBPyConnection, run: IndexRun) -> None:
+    conn.execute(
+        f"INSERT INTO index_runs ({_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        [
+            naive_utc(run.started_at),
+            naive_utc(run.ended_at),
+            run.mode,
+            run.source,
+            run.recall_version,
+            run.workers,
+            run.total,
+            run.indexed,
+            run.skipped,
+            run.failed,
+            run.missing,
+            run.bytes_read,
+            run.rows_inserted,
+            json.dumps(run.phases),
+            json.dumps(run.sources),
+        ],
+    )
+
+
+def fetch_index_runs(conn: duckdb.DuckDBPyConnection, limit: int) -> list[IndexRun]:
+    """Return the most recent runs, newest first."""
+    rows = conn.execute(
+        f"SELECT {_COLUMNS} FROM index_runs ORDER BY started_at DESC LIMIT ?", [limit]
+    ).fetchall()
+    return [
+        IndexRun(
+            started_at=row[0],
+            ended_at=row[1],
+            mode=row[2],
+            source=row[3],
+            recall_version=row[4],
+            workers=int(row[5]),
+            total=int(row[6]),
+            indexed=int(row[7]),
+            skipped=int(row[8]),
+            failed=int(row[9]),
+            missing=int(row[10]),
+            bytes_read=int(row[11]),
+            rows_inserted=int(row[12]),
+            phases=json.loads(row[13]),
+            sources=json.loads(row[14]),
+        )
+        for row in rows
+    ]
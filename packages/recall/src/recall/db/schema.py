@@ -4,21 +4,94 @@ from pathlib import Path
 
 import duckdb
 
-SCHEMA_VERSION = 2
+SCHEMA_VERSION = 10
+
+# Statements that upgrade a database from the previous version to the keyed one.
+MIGRATIONS: dict[int, tuple[str, ...]] = {
+    3: (
+        "ALTER TABLE sessions ADD COLUMN byte_offset BIGINT",
+        "ALTER TABLE sessions ADD COLUMN prefix_digest TEXT",
+        "ALTER TABLE sessions ADD COLUMN parser_state JSON",
+    ),
+    # The inverted index replaces the fts extension's indexes; the next
+    # `recall index` run builds it because fts_fields starts empty.
+    4: (
+        "DROP SCHEMA IF EXISTS fts_main_messages CASCADE",
+        "DROP SCHEMA IF EXISTS fts_main_tool_calls CASCADE",
+        "CREATE TABLE IF NOT EXISTS fts_postings (term TEXT NOT NULL, doc_id TEXT NOT NULL, "
+        "session_id TEXT NOT NULL, field TEXT NOT NULL, tf INTEGER NOT NULL)",
+        "CREATE TABLE IF NOT EXISTS fts_documents (doc_id TEXT NOT NULL, "
+        "session_id TEXT NOT NULL, field TEXT NOT NULL, length INTEGER NOT NULL)",
+        "CREATE TABLE IF NOT EXISTS fts_fields (field TEXT NOT NULL)",
+    ),
+    # Sessions indexed before this version have no fingerprint and are
+    # reparsed once when their mtime changes.
+    5: ("ALTER TABLE sessions ADD COLUMN content_digest TEXT",),
+    6: (
+        "CREATE TABLE IF NOT EXISTS index_runs (started_at TIMESTAMP NOT NULL, "
+        "ended_at TIMESTAMP NOT NULL, "
+        "mode TEXT NOT NULL CHECK (mode IN ('incremental', 'full', 'recreate')), "
+        "source TEXT, recall_version TEXT, workers INTEGER NOT NULL, total INTEGER NOT NULL, "
+        "indexed INTEGER NOT NULL, skipped INTEGER NOT NULL, failed INTEGER NOT NULL, "
+        "missing INTEGER NOT NULL, bytes_read BIGINT NOT NULL, rows_inserted BIGINT NOT NULL, "
+        "phases JSON NOT NULL, sources JSON NOT NULL)",
+    ),
+    7: (
+        "CREATE TABLE IF NOT EXISTS failed_files (source_path TEXT NOT NULL, "
+        "source TEXT NOT NULL, file_mtime DOUBLE NOT NULL, file_size BIGINT NOT NULL, "
+        "error TEXT NOT NULL, attempts INTEGER NOT NULL, failed_at TIMESTAMP NOT NULL, "
+        "retry_after TIMESTAMP NOT NULL)",
+    ),
+    8: (
+        "CREATE TABLE IF NOT EXISTS index_checkpoints (started_at TIMESTAMP NOT NULL, "
+        "mode TEXT NOT NULL CHECK (mode IN ('full', 'recreate')), source TEXT, "
+        "checkpointed_at TIMESTAMP NOT NULL, sessions_done INTEGER NOT NULL)",
+    ),
+    # Clearing the fingerprints makes the next `recall index` run reparse
+    # every file, which fills bash_segments for existing sessions.
+    9: (
+        "CREATE TABLE IF NOT EXISTS bash_segments (tool_call_id TEXT NOT NULL, "
+        "session_id TEXT NOT NULL, idx INTEGER NOT NULL, base TEXT, sub TEXT, "
+        "argv TEXT[] NOT NULL)",
+        "CREATE INDEX IF NOT EXISTS idx_bash_segments_session ON bash_segments(session_id)",
+        "CREATE INDEX IF NOT EXISTS idx_bash_segments_base ON bash_segments(base, sub)",
+        "UPDATE sessions SET file_mtime = 0, byte_offset = NULL, content_digest = NULL",
+    ),
+    # fts_fields gains the corpus totals, computed once from the existing index.
+    10: (
+        "CREATE INDEX IF NOT EXISTS idx_fts_postings_term ON fts_postings(term)",
+        "CREATE INDEX IF NOT EXISTS idx_fts_postings_session ON fts_postings(session_id)",
+        "CREATE INDEX IF NOT EXISTS idx_fts_documents_session ON fts_documents(session_id)",
+        "ALTER TABLE fts_fields RENAME TO fts_fields_v9",
+        "CREATE TABLE fts_fields (field TEXT NOT NULL, documents BIGINT NOT NULL, "
+        "length BIGINT NOT NULL)",
+        "INSERT INTO fts_fields SELECT f.field, "
+        "CASE f.field WHEN 'bash' THEN (SELECT COUNT(*) FROM tool_calls) "
+        "ELSE (SELECT COUNT(*) FROM messages) END, "
+        "(SELECT COALESCE(SUM(d.length), 0) FROM fts_documents d WHERE d.field = f.field) "
+        "FROM fts_fields_v9 f",
+        "DROP TABLE fts_fields_v9",
+    ),
+}
 
 
 def ensure_schema(conn: duckdb.DuckDBPyConnection) -> None:
     if not _schema_version_table_exists(conn):
         _apply_schema(conn)
-        _set_schema_version(conn)
+        _set_schema_version(conn, SCHEMA_VERSION)
         return
 
     current = _get_schema_version(conn)
-    if current != SCHEMA_VERSION:
+    if current == SCHEMA_VERSION:
+        return
+    pending = range(current + 1, SCHEMA_VERSION + 1)
+    if current > SCHEMA_VERSION or any(version not in MIGRATIONS for version in pending):
         raise RuntimeError(
             f"schema version mismatch (expected {SCHEMA_VERSION}, found {current}). "
             "Run with --recreate to rebuild."
         )
+    for version in pending:
+        _migrate(conn, version)
 
 
 def _schema_version_table_exists(conn: duckdb.DuckDBPyConnection) -> bool:
@@ -34,8 +107,20 @@ def _apply_schema(conn: duckdb.DuckDBPyConnection) -> None:
     conn.execute(sql)
 
 
-def _set_schema_version(conn: duckdb.DuckDBPyConnection) -> None:
-    conn.execute("INSERT INTO schema_version (version) VALUES (?)", [SCHEMA_VERSION])
+def _migrate(conn: duckdb.DuckDBPyConnection, version: int) -> None:
+    conn.execute("BEGIN")
+    try:
+        for statement in MIGRATIONS[version]:
+            conn.execute(statement)
+        _set_schema_version(conn, version)
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+
+def _set_schema_version(conn: duckdb.DuckDBPyConnection, version: int) -> None:
+    conn.execute("INSERT INTO schema_version (version) VALUES (?)", [version])
 
 
 def _get_schema_version(conn: duckdb.DuckDBPyConnection) -> int:
@@ -26,7 +26,12 @@ CREATE TABLE IF NOT EXISTS sessions (
     is_complete BOOLEAN DEFAULT TRUE,
     file_mtime DOUBLE NOT NULL,
     file_size BIGINT NOT NULL,
-    indexed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    indexed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+
+    byte_offset BIGINT,
+    prefix_digest TEXT,
+    parser_state JSON,
+    content_digest TEXT
 );
 
 CREATE TABLE IF NOT EXISTS messages (
@@ -62,6 +67,77 @@ CREATE TABLE IF NOT EXISTS tool_calls (
     bash_embedding FLOAT[384]
 );
 
+-- One row per simple command of a bash command, in order; derived from
+-- tool_calls.bash_command, so no foreign key.
+CREATE TABLE IF NOT EXISTS bash_segments (
+    tool_call_id TEXT NOT NULL,
+    session_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    base TEXT,
+    sub TEXT,
+    argv TEXT[] NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS fts_postings (
+    term TEXT NOT NULL,
+    doc_id TEXT NOT NULL,
+    session_id TEXT NOT NULL,
+    field TEXT NOT NULL,
+    tf INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS fts_documents (
+    doc_id TEXT NOT NULL,
+    session_id TEXT NOT NULL,
+    field TEXT NOT NULL,
+    length INTEGER NOT NULL
+);
+
+-- Indexed fields with their corpus totals for BM25: rows of the field's table
+-- and indexed terms across them.
+CREATE TABLE IF NOT EXISTS fts_fields (
+    field TEXT NOT NULL,
+    documents BIGINT NOT NULL,
+    length BIGINT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS index_runs (
+    started_at TIMESTAMP NOT NULL,
+    ended_at TIMESTAMP NOT NULL,
+    mode TEXT NOT NULL CHECK (mode IN ('incremental', 'full', 'recreate')),
+    source TEXT,
+    recall_version TEXT,
+    workers INTEGER NOT NULL,
+    total INTEGER NOT NULL,
+    indexed INTEGER NOT NULL,
+    skipped INTEGER NOT NULL,
+    failed INTEGER NOT NULL,
+    missing INTEGER NOT NULL,
+    bytes_read BIGINT NOT NULL,
+    rows_inserted BIGINT NOT NULL,
+    phases JSON NOT NULL,
+    sources JSON NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS failed_files (
+    source_path TEXT NOT NULL,
+    source TEXT NOT NULL,
+    file_mtime DOUBLE NOT NULL,
+    file_size BIGINT NOT NULL,
+    error TEXT NOT NULL,
+    attempts INTEGER NOT NULL,
+    failed_at TIMESTAMP NOT NULL,
+    retry_after TIMESTAMP NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS index_checkpoints (
+    started_at TIMESTAMP NOT NULL,
+    mode TEXT NOT NULL CHECK (mode IN ('full', 'recreate')),
+    source TEXT,
+    checkpointed_at TIMESTAMP NOT NULL,
+    sessions_done INTEGER NOT NULL
+);
+
 CREATE INDEX IF NOT EXISTS idx_sessions_source ON sessions(source);
 CREATE INDEX IF NOT EXISTS idx_sessions_cwd ON sessions(cwd);
 CREATE INDEX IF NOT EXISTS idx_sessions_git_repo ON sessions(git_repo);
@@ -72,3 +148,8 @@ CREATE INDEX IF NOT EXISTS idx_tool_calls_session ON tool_calls(session_id);
 CREATE INDEX IF NOT EXISTS idx_tool_calls_name ON tool_calls(tool_name);
 CREATE INDEX IF NOT EXISTS idx_tool_calls_bash_base ON tool_calls(bash_base);
 CREATE INDEX IF NOT EXISTS idx_tool_calls_bash_sub ON tool_calls(bash_sub);
+CREATE INDEX IF NOT EXISTS idx_bash_segments_session ON bash_segments(session_id);
+CREATE INDEX IF NOT EXISTS idx_bash_segments_base ON bash_segments(base, sub);
+CREATE INDEX IF NOT EXISTS idx_fts_postings_term ON fts_postings(term);
+CREATE INDEX IF NOT EXISTS idx_fts_postings_session ON fts_postings(session_id);
+CREATE INDEX IF NOT EXISTS idx_fts_documents_session ON fts_documents(session_id);
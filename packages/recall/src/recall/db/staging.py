@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+from collections.abc import Generator, Iterable
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+import duckdb
+
+from recall.core.records import MessageRecord, ToolCallRecord
+from recall.db.bulk import (
+    BASH_SEGMENT_SCHEMA,
+    MESSAGE_SCHEMA,
+    TOOL_CALL_SCHEMA,
+    bash_segment_columns,
+    load_columns,
+    message_columns,
+    tool_call_columns,
+)
+
+
+@dataclass(frozen=True)
+class StagedRows:
+    sessions: str
+    messages: str
+    tool_calls: str
+    bash_segments: str
+
+
+@contextmanager
+def staged_rows(conn: duckdb.DuckDBPyConnection, name: str) -> Generator[StagedRows]:
+    """Create empty scratch copies of the session tables, dropped on exit.
+
+    Scratch tables carry no constraints, so rows can be written before their
+    session row exists, and they live in the database file, so DuckDB can
+    evict them from memory while a large session is being staged.
+    """
+    staged = StagedRows(
+        sessions=f"_recall_{name}_sessions",
+        messages=f"_recall_{name}_messages",
+        tool_calls=f"_recall_{name}_tool_calls",
+        bash_segments=f"_recall_{name}_bash_segments",
+    )
+    tables = _table_pairs(staged)
+    for table, scratch in tables:
+        conn.execute(f"CREATE OR REPLACE TABLE {scratch} AS SELECT * FROM {table} LIMIT 0")
+    try:
+        yield staged
+    finally:
+        for _, scratch in tables:
+            conn.execute(f"DROP TABLE IF EXISTS {scratch}")
+
+
+def stage_rows(
+    conn: duckdb.DuckDBPyConnection,
+    staged: StagedRows,
+    messages: Iterable[MessageRecord],
+    tool_calls: Iterable[ToolCallRecord],
+) -> None:
+    load_columns(conn, staged.messages, MESSAGE_SCHEMA, message_columns(messages))
+    tool_calls = list(tool_calls)
+    load_columns(conn, staged.tool_calls, TOOL_CALL_SCHEMA, tool_call_columns(tool_calls))
+    load_columns(conn, staged.bash_segments, BASH_SEGMENT_SCHEMA, bash_segment_columns(tool_calls))
+
+
+def stage_session_rows(
+    conn: duckdb.DuckDBPyConnection, staged: StagedRows, session_id: str
+) -> None:
+    """Copy the stored rows of a session into scratch tables, e.g. before replacing it."""
+    conn.execute(f"INSERT INTO {staged.sessions} SELECT * FROM sessions WHERE id = ?", [session_id])
+    conn.execute(
+        f"INSERT INTO {staged.messages} SELECT * FROM messages WHERE session_id = ?", [session_id]
+    )
+    conn.execute(
+        f"INSERT INTO {staged.tool_calls} SELECT * FROM tool_calls WHERE session_id = ?",
+        [session_id],
+    )
+    conn.execute(
+        f"INSERT INTO {staged.bash_segments} SELECT * FROM bash_segments WHERE session_id = ?",
+        [session_id],
+    )
+
+
+def insert_staged_rows(conn: duckdb.DuckDBPyConnection, staged: StagedRows) -> None:
+    # Parents first, so foreign keys hold for every inserted row.
+    for table, scratch in _table_pairs(staged):
+        conn.execute(f"INSERT INTO {table} BY NAME SELECT * FROM {scratch}")
+
+
+def _table_pairs(staged: StagedRows) -> list[tuple[str, str]]:
+    return [
+        ("sessions", staged.sessions),
+        ("messages", staged.messages),
+        ("tool_calls", staged.tool_calls),
+        ("bash_segments", staged.bash_segments),
+    ]
@@ -1,14 +1,34 @@
 from recall.parsers.claude_code import ClaudeCodeParser
 from recall.parsers.codex import CodexParser
+from recall.parsers.compression import (
+    expanded_size,
+    is_compressed,
+    open_session_file,
+    session_name,
+)
+from recall.parsers.discovery import DirectoryCache, DiscoveredFile, iter_files
 from recall.parsers.pi_agent import PiAgentParser
-from recall.parsers.protocol import SessionParser
+from recall.parsers.protocol import ParseCheckpoint, SessionParser
 from recall.parsers.registry import all_parsers, get_parser
+from recall.parsers.stream import RowSink, SessionChunk, SessionHeader, SessionStream
 
 __all__ = [
     "ClaudeCodeParser",
     "CodexParser",
+    "DirectoryCache",
+    "DiscoveredFile",
+    "ParseCheckpoint",
     "PiAgentParser",
+    "RowSink",
+    "SessionChunk",
+    "SessionHeader",
     "SessionParser",
+    "SessionStream",
     "all_parsers",
+    "expanded_size",
     "get_parser",
+    "is_compressed",
+    "iter_files",
+    "open_session_file",
+    "session_name",
 ]
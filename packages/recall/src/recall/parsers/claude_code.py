@@ -1,18 +1,30 @@
 from __future__ import annotations
 
 import json
-from collections.abc import Iterable
+from collections.abc import Iterable, Iterator
 from dataclasses import dataclass
 from datetime import datetime
+from functools import partial
 from pathlib import Path
 from typing import Any
 
 from recall.core.bash import parse_bash_command
-from recall.core.ids import message_id as make_message_id
+from recall.core.ids import SessionIds
 from recall.core.ids import session_id as make_session_id
 from recall.core.ids import tool_call_id as make_tool_call_id
-from recall.core.models import Message, Session, ToolCall
+from recall.core.records import MessageRecord, SessionRecord, ToolCallRecord
 from recall.core.types import Role, Source
+from recall.parsers.compression import session_name, session_stem
+from recall.parsers.discovery import DiscoveredFile, scan_files
+from recall.parsers.prefilter import read_head
+from recall.parsers.protocol import ParseCheckpoint
+from recall.parsers.reader import LineReader, content_digest, prefix_digest
+from recall.parsers.state import ParseState
+from recall.parsers.stream import SessionHeader, SessionStream
+
+# Entry types with none of the top-level fields _read looks at (timestamps,
+# model, cwd, git, token counts, message); file history snapshots can be large.
+_IGNORED_TYPES = frozenset({"file-history-snapshot", "summary"})
 
 
 @dataclass
@@ -20,112 +32,129 @@ class ClaudeCodeParser:
     source: Source = Source.CLAUDE_CODE
 
     def discover(self) -> list[Path]:
-        root = Path.home() / ".claude/projects"
-        if not root.exists():
-            return []
-        return sorted(root.rglob("*.jsonl"))
+        return [item.path for item in self.scan()]
+
+    def scan(self) -> list[DiscoveredFile]:
+        return scan_files(self.root(), self.matches)
+
+    def root(self) -> Path:
+        return Path.home() / ".claude/projects"
+
+    def matches(self, name: str) -> bool:
+        return session_name(name).endswith(".jsonl")
+
+    def parse(self, path: Path) -> SessionRecord:
+        return self.stream(path).collect()
+
+    def resume(self, path: Path, checkpoint: ParseCheckpoint) -> SessionRecord:
+        return self.stream(path, checkpoint).collect()
 
-    def parse(self, path: Path) -> Session:
+    def stream(self, path: Path, checkpoint: ParseCheckpoint | None = None) -> SessionStream:
+        state = ParseState.from_dict(checkpoint.state) if checkpoint else ParseState()
         absolute_path = str(path.expanduser().resolve())
-        session_id_value = make_session_id(self.source.value, absolute_path)
-        file_mtime = path.stat().st_mtime
-        file_size = path.stat().st_size
-
-        messages: list[Message] = []
-        tool_calls: list[ToolCall] = []
-        is_complete = True
-        started_at: datetime | None = None
-        ended_at: datetime | None = None
-        model: str | None = None
-        cwd: str | None = None
-        git_repo: str | None = None
-        git_branch: str | None = None
-        input_tokens: int | None = None
-        output_tokens: int | None = None
-
-        with path.open("r", encoding="utf-8") as handle:
-            for line in handle:
-                line = line.strip()
-                if not line:
-                    continue
-                try:
-                    entry = json.loads(line)
-                except json.JSONDecodeError:
-                    is_complete = False
-                    continue
-
-                timestamp = _parse_timestamp(_get_first(entry, "timestamp", "created_at"))
-                if timestamp is not None:
-                    started_at = timestamp if started_at is None else min(started_at, timestamp)
-                    ended_at = timestamp if ended_at is None else max(ended_at, timestamp)
-
-                if model is None:
-                    model = _get_first(entry, "model", "model_name")
-
-                if cwd is None:
-                    cwd = _get_first(entry, "cwd", "working_directory")
-                if git_repo is None:
-                    git_repo = _get_first(entry, "git_root", "repo")
-                if git_branch is None:
-                    git_branch = _get_nested(entry, ("git", "branch"))
-
-                input_tokens = _accumulate_metric(input_tokens, entry.get("inputTokens"))
-                output_tokens = _accumulate_metric(output_tokens, entry.get("outputTokens"))
-
-                message_payload = entry.get("message") if isinstance(entry, dict) else None
-                if message_payload is None and isinstance(entry, dict) and "role" in entry:
-                    message_payload = entry
-                if message_payload:
-                    message = _parse_message(
-                        message_payload=message_payload,
-                        session_id=session_id_value,
-                        idx=len(messages),
-                        timestamp=timestamp,
-                    )
-                    messages.append(message)
-                    for tool_idx, tool_call in enumerate(message.tool_calls):
-                        tool_call.idx = tool_idx
-                        tool_call.id = make_tool_call_id(message.id, tool_idx)
-                        tool_call.session_id = session_id_value
-                        tool_call.message_id = message.id
-                        tool_calls.append(tool_call)
-
-        message_count = len(messages)
-        tool_count = len(tool_calls)
-        duration_seconds = None
-        if started_at and ended_at:
-            duration_seconds = int((ended_at - started_at).total_seconds())
-
-        session = Session(
-            id=session_id_value,
+        stat = path.stat()
+        header = SessionHeader(
+            id=make_session_id(self.source.value, session_name(absolute_path)),
             source=self.source,
             source_path=absolute_path,
-            source_session_id=path.stem,
-            started_at=started_at,
-            ended_at=ended_at,
-            duration_seconds=duration_seconds,
-            model=model,
-            cwd=cwd,
-            git_repo=git_repo,
-            git_branch=git_branch,
-            message_count=message_count,
-            tool_count=tool_count,
-            input_tokens=input_tokens,
-            output_tokens=output_tokens,
-            is_complete=is_complete,
-            file_mtime=file_mtime,
-            file_size=file_size,
-            messages=messages,
+            file_mtime=stat.st_mtime,
+            file_size=stat.st_size,
+            start=checkpoint.byte_offset if checkpoint else 0,
+        )
+        reader = LineReader(path, header.start)
+        return SessionStream(
+            header,
+            self._read(reader, state, header.id),
+            partial(self._finalize, path, header, reader, state),
+            reader,
+        )
+
+    def _read(
+        self, reader: LineReader, state: ParseState, session_id_value: str
+    ) -> Iterator[MessageRecord]:
+        ids = SessionIds(session_id_value)
+        for line in reader:
+            head = read_head(line)
+            if head is not None and head.type in _IGNORED_TYPES:
+                state.observe_timestamp(_parse_timestamp(head.timestamp))
+                continue
+            try:
+                entry = reader.decode(line)
+            except json.JSONDecodeError:
+                state.is_complete = False
+                continue
+
+            timestamp = _parse_timestamp(_get_first(entry, "timestamp", "created_at"))
+            state.observe_timestamp(timestamp)
+
+            if state.model is None:
+                state.model = _get_first(entry, "model", "model_name")
+
+            if state.cwd is None:
+                state.cwd = _get_first(entry, "cwd", "working_directory")
+            if state.git_repo is None:
+                state.git_repo = _get_first(entry, "git_root", "repo")
+            if state.git_branch is None:
+                state.git_branch = _get_nested(entry, ("git", "branch"))
+
+            state.input_tokens = _accumulate_metric(state.input_tokens, entry.get("inputTokens"))
+            state.output_tokens = _accumulate_metric(state.output_tokens, entry.get("outputTokens"))
+
+            message_payload = entry.get("message") if isinstance(entry, dict) else None
+            if message_payload is None and isinstance(entry, dict) and "role" in entry:
+                message_payload = entry
+            if message_payload:
+                message = _parse_message(
+                    message_payload=message_payload,
+                    ids=ids,
+                    idx=state.message_count,
+                    timestamp=timestamp,
+                )
+                state.message_count += 1
+                for tool_idx, tool_call in enumerate(message.tool_calls):
+                    tool_call.idx = tool_idx
+                    tool_call.id = make_tool_call_id(message.id, tool_idx)
+                    tool_call.session_id = session_id_value
+                    tool_call.message_id = message.id
+                    state.tool_count += 1
+                yield message
+
+    def _finalize(
+        self, path: Path, header: SessionHeader, reader: LineReader, state: ParseState
+    ) -> SessionRecord:
+        byte_offset = reader.resumable_offset
+        return SessionRecord(
+            id=header.id,
+            source=header.source,
+            source_path=header.source_path,
+            source_session_id=session_stem(path),
+            started_at=state.started_at,
+            ended_at=state.ended_at,
+            duration_seconds=state.duration_seconds,
+            model=state.model,
+            cwd=state.cwd,
+            git_repo=state.git_repo,
+            git_branch=state.git_branch,
+            message_count=state.message_count,
+            tool_count=state.tool_count,
+            input_tokens=state.input_tokens,
+            output_tokens=state.output_tokens,
+            is_complete=state.is_complete,
+            file_mtime=header.file_mtime,
+            file_size=header.file_size,
+            byte_offset=byte_offset,
+            prefix_digest=prefix_digest(path, byte_offset) if byte_offset is not None else None,
+            parser_state=state.to_dict(),
+            content_digest=content_digest(path, header.file_size),
         )
-        return session
 
 
 def _parse_message(
     message_payload: dict[str, Any],
-    session_id: str,
+    ids: SessionIds,
     idx: int,
     timestamp: datetime | None,
-) -> Message:
+) -> MessageRecord:
     role_value = message_payload.get("role") or message_payload.get("sender") or "user"
     try:
         role = Role(role_value)
@@ -135,10 +164,10 @@ def _parse_message(
     content = message_payload.get("content")
     text_parts, thinking_parts, tool_calls = _extract_content_blocks(content)
 
-    message_id_value = make_message_id(session_id, idx)
-    message = Message(
+    message_id_value = ids.message(idx)
+    message = MessageRecord(
         id=message_id_value,
-        session_id=session_id,
+        session_id=ids.session_id,
         idx=idx,
         role=role,
         content="\n".join(text_parts) if text_parts else None,
@@ -150,10 +179,10 @@ def _parse_message(
     return message
 
 
-def _extract_content_blocks(content: Any) -> tuple[list[str], list[str], list[ToolCall]]:
+def _extract_content_blocks(content: Any) -> tuple[list[str], list[str], list[ToolCallRecord]]:
     text_parts: list[str] = []
     thinking_parts: list[str] = []
-    tool_calls: list[ToolCall] = []
+    tool_calls: list[ToolCallRecord] = []
 
     if content is None:
         return text_parts, thinking_parts, tool_calls
@@ -184,10 +213,10 @@ def _extract_content_blocks(content: Any) -> tuple[list[str], list[str], list[To
     return text_parts, thinking_parts, tool_calls
 
 
-def _build_tool_call(tool_name: str, tool_input: Any) -> ToolCall:
+def _build_tool_call(tool_name: str, tool_input: Any) -> ToolCallRecord:
     bash_command = _extract_bash_command(tool_name, tool_input)
     parsed = parse_bash_command(bash_command) if bash_command else None
-    return ToolCall(
+    return ToolCallRecord(
         id="",
         session_id="",
         message_id=None,
@@ -198,6 +227,7 @@ def _build_tool_call(tool_name: str, tool_input: Any) -> ToolCall:
         bash_base=parsed.base if parsed else None,
         bash_sub=parsed.sub if parsed else None,
         is_compound=parsed.is_compound if parsed else False,
+        bash_segments=parsed.segments if parsed else (),
     )
 
 
@@ -1,18 +1,37 @@
 from __future__ import annotations
 
 import json
-from collections.abc import Iterable
+from collections.abc import Iterable, Iterator
 from dataclasses import dataclass
 from datetime import datetime
+from functools import partial
 from pathlib import Path
 from typing import Any
 
 from recall.core.bash import parse_bash_command
-from recall.core.ids import message_id as make_message_id
+from recall.core.ids import SessionIds
 from recall.core.ids import session_id as make_session_id
 from recall.core.ids import tool_call_id as make_tool_call_id
-from recall.core.models import Message, Session, ToolCall
+from recall.core.records import MessageRecord, SessionRecord, ToolCallRecord
 from recall.core.types import Role, Source
+from recall.parsers.compression import session_name
+from recall.parsers.discovery import DiscoveredFile, scan_files
+from recall.parsers.prefilter import EntryHead, read_head
+from recall.parsers.protocol import ParseCheckpoint
+from recall.parsers.reader import LineReader, content_digest, prefix_digest
+from recall.parsers.state import ParseState
+from recall.parsers.stream import SessionHeader, SessionStream
+
+# Entry types _read consumes, each with the payload types it reads (None: any).
+# Everything else (turn_context, token counts, reasoning, tool output) only
+# contributes its timestamp, so such lines are classified from their bytes and
+# not decoded.
+_CONSUMED_TYPES: dict[str, frozenset[str] | None] = {
+    "session_meta": None,
+    "message": None,
+    "event_msg": frozenset({"user_message", "agent_message", "function_call"}),
+    "response_item": frozenset({"function_call", "custom_tool_call", "web_search_call"}),
+}
 
 
 @dataclass
@@ -20,176 +39,199 @@ class CodexParser:
     source: Source = Source.CODEX
 
     def discover(self) -> list[Path]:
-        root = Path.home() / ".codex/sessions"
-        if not root.exists():
-            return []
-        return sorted(root.glob("**/rollout*.jsonl"))
+        return [item.path for item in self.scan()]
 
-    def parse(self, path: Path) -> Session:
+    def scan(self) -> list[DiscoveredFile]:
+        return scan_files(self.root(), self.matches)
+
+    def root(self) -> Path:
+        return Path.home() / ".codex/sessions"
+
+    def matches(self, name: str) -> bool:
+        return name.startswith("rollout") and session_name(name).endswith(".jsonl")
+
+    def parse(self, path: Path) -> SessionRecord:
+        return self.stream(path).collect()
+
+    def resume(self, path: Path, checkpoint: ParseCheckpoint) -> SessionRecord:
+        return self.stream(path, checkpoint).collect()
+
+    def stream(self, path: Path, checkpoint: ParseCheckpoint | None = None) -> SessionStream:
+        state = ParseState.from_dict(checkpoint.state) if checkpoint else ParseState()
         absolute_path = str(path.expanduser().resolve())
-        session_id_value = make_session_id(self.source.value, absolute_path)
-        file_mtime = path.stat().st_mtime
-        file_size = path.stat().st_size
-
-        messages: list[Message] = []
-        tool_calls: list[ToolCall] = []
-        orphan_tool_calls: list[ToolCall] = []
-        is_complete = True
-        started_at: datetime | None = None
-        ended_at: datetime | None = None
-        cwd: str | None = None
-        git_branch: str | None = None
-        git_repo: str | None = None
-        source_session_id: str | None = None
-
-        with path.open("r", encoding="utf-8") as handle:
-            for line in handle:
-                line = line.strip()
-                if not line:
-                    continue
-                try:
-                    entry = json.loads(line)
-                except json.JSONDecodeError:
-                    is_complete = False
-                    continue
-
-                timestamp = _parse_timestamp(entry.get("timestamp"))
-                if timestamp is not None:
-                    started_at = timestamp if started_at is None else min(started_at, timestamp)
-                    ended_at = timestamp if ended_at is None else max(ended_at, timestamp)
-
-                entry_type = entry.get("type")
-                if entry_type == "session_meta":
-                    payload = entry.get("payload", {})
-                    source_session_id = payload.get("id") or source_session_id
-                    cwd = payload.get("cwd") or cwd
-                    git_raw = payload.get("git")
-                    git_info = git_raw if isinstance(git_raw, dict) else {}
-                    git_branch = git_info.get("branch") or git_branch
-                    git_repo = git_info.get("root") or git_repo
-                    meta_ts = _parse_timestamp(payload.get("timestamp"))
-                    if meta_ts is not None:
-                        started_at = meta_ts if started_at is None else min(started_at, meta_ts)
-                        ended_at = meta_ts if ended_at is None else max(ended_at, meta_ts)
-                elif entry_type == "event_msg":
-                    payload = entry.get("payload", {})
-                    payload_type = payload.get("type")
-                    if payload_type == "user_message":
-                        message = _build_plain_message(
-                            role=Role.USER,
-                            text=str(payload.get("message", "")),
-                            session_id=session_id_value,
-                            idx=len(messages),
-                            timestamp=timestamp,
-                        )
-                        messages.append(message)
-                    elif payload_type == "agent_message":
-                        message = _build_plain_message(
-                            role=Role.ASSISTANT,
-                            text=str(payload.get("message", "")),
-                            session_id=session_id_value,
-                            idx=len(messages),
-                            timestamp=timestamp,
-                        )
-                        messages.append(message)
-                    elif payload_type == "function_call":
-                        tool_name = str(payload.get("name", ""))
-                        tool_input = payload.get("parameters")
-                        tool_call = _build_tool_call(tool_name, tool_input)
-                        orphan_tool_calls.append(tool_call)
-                elif entry_type == "response_item":
-                    payload = entry.get("payload", {})
-                    payload_type = payload.get("type")
-                    if payload_type == "function_call":
-                        tool_name = str(payload.get("name", ""))
-                        tool_input = _parse_function_call_arguments(payload.get("arguments"))
-                        orphan_tool_calls.append(_build_tool_call(tool_name, tool_input))
-                    elif payload_type == "custom_tool_call":
-                        tool_name = str(payload.get("name", ""))
-                        raw_input = payload.get("input")
-                        tool_input: dict[str, Any] | str | None = (
-                            raw_input if isinstance(raw_input, (dict, str)) else None
-                        )
-                        orphan_tool_calls.append(_build_tool_call(tool_name, tool_input))
-                    elif payload_type == "web_search_call":
-                        action = payload.get("action", {})
-                        url = action.get("url") if isinstance(action, dict) else None
-                        orphan_tool_calls.append(
-                            _build_tool_call(
-                                "web_search",
-                                {"url": url} if url else None,
-                            )
-                        )
-                elif entry_type == "message":
-                    payload = entry.get("payload", {})
-                    role_value = payload.get("role", "user")
-                    try:
-                        role = Role(role_value)
-                    except ValueError:
-                        role = Role.USER
-                    content = payload.get("content")
-                    message = _parse_message(
-                        content=content,
-                        role=role,
-                        session_id=session_id_value,
-                        idx=len(messages),
+        stat = path.stat()
+        header = SessionHeader(
+            id=make_session_id(self.source.value, session_name(absolute_path)),
+            source=self.source,
+            source_path=absolute_path,
+            file_mtime=stat.st_mtime,
+            file_size=stat.st_size,
+            start=checkpoint.byte_offset if checkpoint else 0,
+        )
+        reader = LineReader(path, header.start)
+        return SessionStream(
+            header,
+            self._read(reader, state, header.id),
+            partial(self._finalize, path, header, reader, state),
+            reader,
+        )
+
+    def _read(
+        self, reader: LineReader, state: ParseState, session_id_value: str
+    ) -> Iterator[MessageRecord | ToolCallRecord]:
+        ids = SessionIds(session_id_value)
+        for line in reader:
+            head = read_head(line)
+            ignored_timestamp = _ignored_timestamp(head) if head is not None else None
+            if ignored_timestamp is not None:
+                state.observe_timestamp(_parse_timestamp(ignored_timestamp))
+                continue
+            try:
+                entry = reader.decode(line)
+            except json.JSONDecodeError:
+                state.is_complete = False
+                continue
+
+            timestamp = _parse_timestamp(entry.get("timestamp"))
+            state.observe_timestamp(timestamp)
+
+            message: MessageRecord | None = None
+            tool_call: ToolCallRecord | None = None
+            entry_type = entry.get("type")
+            if entry_type == "session_meta":
+                payload = entry.get("payload", {})
+                state.source_session_id = payload.get("id") or state.source_session_id
+                state.cwd = payload.get("cwd") or state.cwd
+                git_raw = payload.get("git")
+                git_info = git_raw if isinstance(git_raw, dict) else {}
+                state.git_branch = git_info.get("branch") or state.git_branch
+                state.git_repo = git_info.get("root") or state.git_repo
+                state.observe_timestamp(_parse_timestamp(payload.get("timestamp")))
+            elif entry_type == "event_msg":
+                payload = entry.get("payload", {})
+                payload_type = payload.get("type")
+                if payload_type == "user_message":
+                    message = _build_plain_message(
+                        role=Role.USER,
+                        text=str(payload.get("message", "")),
+                        ids=ids,
+                        idx=state.message_count,
                         timestamp=timestamp,
                     )
-                    messages.append(message)
-
-        for message in messages:
-            for tool_idx, tool_call in enumerate(message.tool_calls):
-                tool_call.idx = tool_idx
-                tool_call.id = make_tool_call_id(message.id, tool_idx)
+                elif payload_type == "agent_message":
+                    message = _build_plain_message(
+                        role=Role.ASSISTANT,
+                        text=str(payload.get("message", "")),
+                        ids=ids,
+                        idx=state.message_count,
+                        timestamp=timestamp,
+                    )
+                elif payload_type == "function_call":
+                    tool_name = str(payload.get("name", ""))
+                    tool_input = payload.get("parameters")
+                    tool_call = _build_tool_call(tool_name, tool_input)
+            elif entry_type == "response_item":
+                payload = entry.get("payload", {})
+                payload_type = payload.get("type")
+                if payload_type == "function_call":
+                    tool_name = str(payload.get("name", ""))
+                    tool_input = _parse_function_call_arguments(payload.get("arguments"))
+                    tool_call = _build_tool_call(tool_name, tool_input)
+                elif payload_type == "custom_tool_call":
+                    tool_name = str(payload.get("name", ""))
+                    raw_input = payload.get("input")
+                    tool_input: dict[str, Any] | str | None = (
+                        raw_input if isinstance(raw_input, (dict, str)) else None
+                    )
+                    tool_call = _build_tool_call(tool_name, tool_input)
+                elif payload_type == "web_search_call":
+                    action = payload.get("action", {})
+                    url = action.get("url") if isinstance(action, dict) else None
+                    tool_call = _build_tool_call("web_search", {"url": url} if url else None)
+            elif entry_type == "message":
+                payload = entry.get("payload", {})
+                role_value = payload.get("role", "user")
+                try:
+                    role = Role(role_value)
+                except ValueError:
+                    role = Role.USER
+                content = payload.get("content")
+                message = _parse_message(
+                    content=content,
+                    role=role,
+                    ids=ids,
+                    idx=state.message_count,
+                    timestamp=timestamp,
+                )
+
+            if message is not None:
+                state.message_count += 1
+                for tool_idx, message_tool_call in enumerate(message.tool_calls):
+                    message_tool_call.idx = tool_idx
+                    message_tool_call.id = make_tool_call_id(message.id, tool_idx)
+                    message_tool_call.session_id = session_id_value
+                    message_tool_call.message_id = message.id
+                    state.tool_count += 1
+                yield message
+
+            if tool_call is not None:
+                orphan_idx = state.orphan_count
+                tool_call.idx = orphan_idx
+                tool_call.id = ids.orphan_tool_call(orphan_idx)
                 tool_call.session_id = session_id_value
-                tool_call.message_id = message.id
-                tool_calls.append(tool_call)
-
-        for orphan_idx, tool_call in enumerate(orphan_tool_calls):
-            tool_call.idx = orphan_idx
-            tool_call.id = make_tool_call_id(None, orphan_idx, session_id_value=session_id_value)
-            tool_call.session_id = session_id_value
-            tool_call.message_id = None
-            tool_calls.append(tool_call)
-
-        message_count = len(messages)
-        tool_count = len(tool_calls)
-        duration_seconds = None
-        if started_at and ended_at:
-            duration_seconds = int((ended_at - started_at).total_seconds())
-
-        session = Session(
-            id=session_id_value,
-            source=self.source,
-            source_path=absolute_path,
-            source_session_id=source_session_id,
-            started_at=started_at,
-            ended_at=ended_at,
-            duration_seconds=duration_seconds,
+                tool_call.message_id = None
+                state.orphan_count += 1
+                state.tool_count += 1
+                yield tool_call
+
+    def _finalize(
+        self, path: Path, header: SessionHeader, reader: LineReader, state: ParseState
+    ) -> SessionRecord:
+        byte_offset = reader.resumable_offset
+        return SessionRecord(
+            id=header.id,
+            source=header.source,
+            source_path=header.source_path,
+            source_session_id=state.source_session_id,
+            started_at=state.started_at,
+            ended_at=state.ended_at,
+            duration_seconds=state.duration_seconds,
             model=None,
-            cwd=cwd,
-            git_repo=git_repo,
-            git_branch=git_branch,
-            message_count=message_count,
-            tool_count=tool_count,
+            cwd=state.cwd,
+            git_repo=state.git_repo,
+            git_branch=state.git_branch,
+            message_count=state.message_count,
+            tool_count=state.tool_count,
             input_tokens=None,
             output_tokens=None,
-            is_complete=is_complete,
-            file_mtime=file_mtime,
-            file_size=file_size,
-            messages=messages,
-            orphan_tool_calls=orphan_tool_calls,
+            is_complete=state.is_complete,
+            file_mtime=header.file_mtime,
+            file_size=header.file_size,
+            byte_offset=byte_offset,
+            prefix_digest=prefix_digest(path, byte_offset) if byte_offset is not None else None,
+            parser_state=state.to_dict(),
+            content_digest=content_digest(path, header.file_size),
         )
-        return session
+
+
+def _ignored_timestamp(head: EntryHead) -> str | None:
+    """The timestamp of an entry _read would not consume; None if it must be decoded."""
+    if head.type in _CONSUMED_TYPES:
+        payload_types = _CONSUMED_TYPES[head.type]
+        if payload_types is None or head.payload_type is None:
+            return None
+        if head.payload_type in payload_types:
+            return None
+    return head.timestamp
 
 
 def _build_plain_message(
-    role: Role, text: str, session_id: str, idx: int, timestamp: datetime | None
-) -> Message:
-    message_id_value = make_message_id(session_id, idx)
-    return Message(
+    role: Role, text: str, ids: SessionIds, idx: int, timestamp: datetime | None
+) -> MessageRecord:
+    message_id_value = ids.message(idx)
+    return MessageRecord(
         id=message_id_value,
-        session_id=session_id,
+        session_id=ids.session_id,
         idx=idx,
         role=role,
         content=text or None,
@@ -203,15 +245,15 @@ def _build_plain_message(
 def _parse_message(
     content: Any,
     role: Role,
-    session_id: str,
+    ids: SessionIds,
     idx: int,
     timestamp: datetime | None,
-) -> Message:
+) -> MessageRecord:
     text_parts, thinking_parts, tool_calls = _extract_content_blocks(content)
-    message_id_value = make_message_id(session_id, idx)
-    return Message(
+    message_id_value = ids.message(idx)
+    return MessageRecord(
         id=message_id_value,
-        session_id=session_id,
+        session_id=ids.session_id,
         idx=idx,
         role=role,
         content="\n".join(text_parts) if text_parts else None,
@@ -222,10 +264,10 @@ def _parse_message(
     )
 
 
-def _extract_content_blocks(content: Any) -> tuple[list[str], list[str], list[ToolCall]]:
+def _extract_content_blocks(content: Any) -> tuple[list[str], list[str], list[ToolCallRecord]]:
     text_parts: list[str] = []
     thinking_parts: list[str] = []
-    tool_calls: list[ToolCall] = []
+    tool_calls: list[ToolCallRecord] = []
 
     if content is None:
         return text_parts, thinking_parts, tool_calls
@@ -270,10 +312,10 @@ def _parse_function_call_arguments(raw: Any) -> dict[str, Any] | None:
     return None
 
 
-def _build_tool_call(tool_name: str, tool_input: Any) -> ToolCall:
+def _build_tool_call(tool_name: str, tool_input: Any) -> ToolCallRecord:
     bash_command = _extract_bash_command(tool_name, tool_input)
     parsed = parse_bash_command(bash_command) if bash_command else None
-    return ToolCall(
+    return ToolCallRecord(
         id="",
         session_id="",
         message_id=None,
@@ -284,6 +326,7 @@ def _build_tool_call(tool_name: str, tool_input: Any) -> ToolCall:
         bash_base=parsed.base if parsed else None,
         bash_sub=parsed.sub if parsed else None,
         is_compound=parsed.is_compound if parsed else False,
+        bash_segments=parsed.segments if parsed else (),
     )
 
 
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import gzip
+import importlib
+import io
+from pathlib import Path
+
+# Suffixes of archived session files, decompressed while they are read.
+COMPRESSED_SUFFIXES = (".gz", ".zst")
+
+# Session JSONL compresses about tenfold; used to estimate how much a
+# compressed file expands when deciding whether to stream it.
+COMPRESSION_RATIO = 10
+
+
+def session_name(name: str) -> str:
+    """The file name without a compression suffix, e.g. for matching `*.jsonl`."""
+    for suffix in COMPRESSED_SUFFIXES:
+        if name.endswith(suffix):
+            return name[: -len(suffix)]
+    return name
+
+
+def session_stem(path: Path) -> str:
+    """The stem of the uncompressed file name: `abc` for abc.jsonl and abc.jsonl.gz."""
+    return Path(session_name(path.name)).stem
+
+
+def is_compressed(path: Path) -> bool:
+    return path.name.endswith(COMPRESSED_SUFFIXES)
+
+
+def expanded_size(path: Path, size: int) -> int:
+    """Estimate the decompressed size of a file of the given size on disk."""
+    return size * COMPRESSION_RATIO if is_compressed(path) else size
+
+
+def open_session_file(path: Path) -> io.BufferedIOBase:
+    """Open a session file for binary reading, decompressing .gz and .zst as it is read.
+
+    zstd uses the standard library's compression.zstd (Python 3.14+) or the
+    zstandard package; ValueError is raised when neither is installed.
+    """
+    if path.name.endswith(".gz"):
+        return gzip.open(path, "rb")
+    if path.name.endswith(".zst"):
+        return _open_zstd(path)
+    return path.open("rb")
+
+
+def _open_zstd(path: Path) -> io.BufferedIOBase:
+    try:
+        zstd = importlib.import_module("compression.zstd")
+    except ImportError:
+        pass
+    else:
+        return zstd.open(path, "rb")
+    try:
+        zstandard = importlib.import_module("zstandard")
+    except ImportError:
+        raise ValueError(
+            f"cannot read {path.name}: zstd support needs Python 3.14 or the zstandard "
+            "package (pip install 'recall[zstd]')"
+        ) from None
+    handle = path.open("rb")
+    try:
+        reader = zstandard.ZstdDecompressor().stream_reader(handle, closefd=True)
+    except Exception:
+        handle.close()
+        raise
+    return io.BufferedReader(reader)
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import functools
+import importlib
+import json
+from collections.abc import Callable
+from typing import Any
+
+from recall.core.config import AppConfig
+
+type JsonDecoder = Callable[[bytes], Any]
+
+# Tried in order by "auto".
+FAST_DECODERS = ("orjson", "msgspec")
+DECODER_NAMES = ("auto", *FAST_DECODERS, "json")
+
+
+def load_decoder(name: str) -> tuple[str, JsonDecoder]:
+    """Resolve a decoder name to (resolved name, decode function).
+
+    "auto" picks the first installed fast decoder and falls back to the
+    standard library. Fast decoders hand every line they reject (invalid
+    UTF-8, NaN, integers beyond 64 bits) to json.loads, so results and raised
+    errors are the same as with "json".
+    """
+    if name not in DECODER_NAMES:
+        raise ValueError(f"unknown JSON decoder: {name} (expected {', '.join(DECODER_NAMES)})")
+    if name == "json":
+        return "json", json.loads
+    candidates = FAST_DECODERS if name == "auto" else (name,)
+    for candidate in candidates:
+        try:
+            module = importlib.import_module(candidate)
+        except ImportError:
+            if name != "auto":
+                raise ValueError(f"JSON decoder {name} is not installed") from None
+            continue
+        if candidate == "orjson":
+            return candidate, _with_fallback(module.loads, module.JSONDecodeError)
+        return candidate, _with_fallback(module.json.Decoder().decode, module.DecodeError)
+    return "json", json.loads
+
+
+@functools.cache
+def default_decoder() -> tuple[str, JsonDecoder]:
+    """The decoder selected by RECALL_JSON_DECODER or [parsers] json_decoder."""
+    return load_decoder(AppConfig.load().json_decoder)
+
+
+def _with_fallback(decode: JsonDecoder, error: type[Exception]) -> JsonDecoder:
+    def loads(line: bytes) -> Any:
+        try:
+            return decode(line)
+        except error:
+            return json.loads(line)
+
+    return loads
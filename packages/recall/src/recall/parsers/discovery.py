@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+import json
+import os
+import stat as stat_module
+import time
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass
+from pathlib import Path
+
+DIRECTORY_CACHE_VERSION = 1
+
+# Directory mtimes have limited resolution: an entry added in the same tick
+# as a listing does not change the mtime again. Listings of directories
+# modified this recently are not trusted on the next scan.
+RACY_LISTING_NS = 2_000_000_000
+
+
+@dataclass(frozen=True)
+class DiscoveredFile:
+    path: Path
+    mtime: float
+    size: int
+
+
+@dataclass(frozen=True)
+class CachedDirectory:
+    # -1 when the listing raced a modification and must not be reused.
+    mtime_ns: int
+    # (name, is_symlink) of subdirectories and of files whose name matched.
+    directories: tuple[tuple[str, bool], ...]
+    files: tuple[tuple[str, bool], ...]
+
+
+class DirectoryCache:
+    """Directory listings from earlier scans, keyed by directory path.
+
+    A directory whose mtime is unchanged has the same entries, so its listing
+    is reused instead of read again. Its files are still stat'ed: appending to
+    a session file changes the file's mtime, not the directory's.
+    """
+
+    def __init__(self, directories: dict[str, CachedDirectory] | None = None) -> None:
+        self.directories = directories or {}
+        self.hits = 0
+        self.misses = 0
+        self._roots: list[str] = []
+        self._seen: set[str] = set()
+
+    @classmethod
+    def load(cls, path: Path) -> DirectoryCache:
+        """Read a saved cache; a missing or unreadable file yields an empty one."""
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+            if data.get("version") != DIRECTORY_CACHE_VERSION:
+                return cls()
+            return cls(
+                {
+                    directory: CachedDirectory(
+                        mtime_ns=int(mtime_ns),
+                        directories=tuple((name, bool(link)) for name, link in directories),
+                        files=tuple((name, bool(link)) for name, link in files),
+                    )
+                    for directory, (mtime_ns, directories, files) in data["directories"].items()
+                }
+            )
+        except (OSError, ValueError, TypeError, KeyError, AttributeError):
+            return cls()
+
+    def save(self, path: Path) -> None:
+        """Write the cache, dropping directories under scanned roots that no longer exist."""
+        directories = {
+            directory: entry
+            for directory, entry in self.directories.items()
+            if directory in self._seen or not self._under_scanned_root(directory)
+        }
+        data = {
+            "version": DIRECTORY_CACHE_VERSION,
+            "directories": {
+                directory: [entry.mtime_ns, entry.directories, entry.files]
+                for directory, entry in directories.items()
+            },
+        }
+        path.parent.mkdir(parents=True, exist_ok=True)
+        partial = path.with_suffix(path.suffix + ".tmp")
+        partial.write_text(json.dumps(data), encoding="utf-8")
+        os.replace(partial, path)
+
+    def add_root(self, root: str) -> None:
+        self._roots.append(root)
+
+    def lookup(self, directory: str, mtime_ns: int) -> CachedDirectory | None:
+        """Return the listing of directory if it is still valid for mtime_ns."""
+        self._seen.add(directory)
+        cached = self.directories.get(directory)
+        if cached is None or cached.mtime_ns != mtime_ns:
+            return None
+        self.hits += 1
+        return cached
+
+    def record(
+        self,
+        directory: str,
+        mtime_ns: int,
+        directories: list[tuple[str, bool]],
+        files: list[tuple[str, bool]],
+    ) -> None:
+        self.misses += 1
+        racy = time.time_ns() - mtime_ns < RACY_LISTING_NS
+        self.directories[directory] = CachedDirectory(
+            mtime_ns=-1 if racy else mtime_ns, directories=tuple(directories), files=tuple(files)
+        )
+
+    def _under_scanned_root(self, directory: str) -> bool:
+        return any(
+            directory == root or directory.startswith(root.rstrip(os.sep) + os.sep)
+            for root in self._roots
+        )
+
+
+def scan_files(root: Path, match: Callable[[str], bool]) -> list[DiscoveredFile]:
+    """Recursively list files under root whose name matches, sorted by path."""
+    return sorted(iter_files(root, match), key=lambda item: item.path)
+
+
+def iter_files(
+    root: Path, match: Callable[[str], bool], cache: DirectoryCache | None = None
+) -> Iterator[DiscoveredFile]:
+    """Yield files under root whose name matches, with their stat results, as found.
+
+    Uses os.scandir so each file costs one stat call; with a cache, listings
+    of directories whose mtime is unchanged are reused. Paths are absolute and
+    resolved, matching the `source_path` stored for indexed sessions.
+    """
+    if not root.exists():
+        return
+    start = str(root.resolve())
+    if cache is not None:
+        cache.add_root(start)
+    visited: set[tuple[int, int]] = set()
+    stack: list[tuple[str, bool]] = [(start, False)]
+    while stack:
+        directory, via_symlink = stack.pop()
+        try:
+            directory_stat = os.stat(directory)
+        except OSError:
+            continue
+        key = (directory_stat.st_dev, directory_stat.st_ino)
+        if key in visited:
+            continue
+        visited.add(key)
+
+        cached = cache.lookup(directory, directory_stat.st_mtime_ns) if cache is not None else None
+        if cached is not None:
+            for name, is_symlink in cached.directories:
+                stack.append((os.path.join(directory, name), via_symlink or is_symlink))
+            for name, is_symlink in cached.files:
+                file_path = os.path.join(directory, name)
+                try:
+                    stat = os.stat(file_path)
+                except OSError:
+                    continue
+                if stat_module.S_ISREG(stat.st_mode):
+                    yield _discovered(file_path, stat, via_symlink or is_symlink)
+            continue
+
+        directories: list[tuple[str, bool]] = []
+        files: list[tuple[str, bool]] = []
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    try:
+                        is_symlink = entry.is_symlink()
+                        if entry.is_dir():
+                            directories.append((entry.name, is_symlink))
+                            stack.append((entry.path, via_symlink or is_symlink))
+                            continue
+                        if not match(entry.name) or not entry.is_file():
+                            continue
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    files.append((entry.name, is_symlink))
+                    yield _discovered(entry.path, stat, via_symlink or is_symlink)
+        except OSError:
+            continue
+        if cache is not None:
+            cache.record(directory, directory_stat.st_mtime_ns, directories, files)
+
+
+def _discovered(path: str, stat: os.stat_result, resolve: bool) -> DiscoveredFile:
+    resolved = Path(path).resolve() if resolve else Path(path)
+    return DiscoveredFile(path=resolved, mtime=stat.st_mtime, size=stat.st_size)
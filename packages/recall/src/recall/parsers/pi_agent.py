@@ -1,18 +1,29 @@
 from __future__ import annotations
 
 import json
-from collections.abc import Iterable
+from collections.abc import Iterable, Iterator
 from dataclasses import dataclass
 from datetime import datetime
+from functools import partial
 from pathlib import Path
 from typing import Any
 
 from recall.core.bash import parse_bash_command
-from recall.core.ids import message_id as make_message_id
+from recall.core.ids import SessionIds
 from recall.core.ids import session_id as make_session_id
 from recall.core.ids import tool_call_id as make_tool_call_id
-from recall.core.models import Message, Session, ToolCall
+from recall.core.records import MessageRecord, SessionRecord, ToolCallRecord
 from recall.core.types import Role, Source
+from recall.parsers.compression import session_name
+from recall.parsers.discovery import DiscoveredFile, scan_files
+from recall.parsers.prefilter import EntryHead, read_head
+from recall.parsers.protocol import ParseCheckpoint
+from recall.parsers.reader import LineReader, content_digest, prefix_digest
+from recall.parsers.state import ParseState
+from recall.parsers.stream import SessionHeader, SessionStream
+
+# Entry types _read consumes; the rest only contribute their timestamp.
+_CONSUMED_TYPES = frozenset({"session", "model_change", "message"})
 
 
 @dataclass
@@ -20,111 +31,135 @@ class PiAgentParser:
     source: Source = Source.PI_AGENT
 
     def discover(self) -> list[Path]:
-        root = Path.home() / ".pi" / "agent" / "sessions"
-        if not root.exists():
-            return []
-        return sorted(root.rglob("*.jsonl"))
+        return [item.path for item in self.scan()]
 
-    def parse(self, path: Path) -> Session:
-        absolute_path = str(path.expanduser().resolve())
-        session_id_value = make_session_id(self.source.value, absolute_path)
-        file_mtime = path.stat().st_mtime
-        file_size = path.stat().st_size
-
-        messages: list[Message] = []
-        tool_calls: list[ToolCall] = []
-        is_complete = True
-        started_at: datetime | None = None
-        ended_at: datetime | None = None
-        model: str | None = None
-        cwd: str | None = None
-        source_session_id: str | None = None
-        input_tokens: int | None = None
-        output_tokens: int | None = None
-
-        with path.open("r", encoding="utf-8") as handle:
-            for line in handle:
-                line = line.strip()
-                if not line:
-                    continue
-                try:
-                    entry = json.loads(line)
-                except json.JSONDecodeError:
-                    is_complete = False
-                    continue
+    def scan(self) -> list[DiscoveredFile]:
+        return scan_files(self.root(), self.matches)
 
-                timestamp = _parse_timestamp(entry.get("timestamp"))
-                if timestamp is not None:
-                    started_at = timestamp if started_at is None else min(started_at, timestamp)
-                    ended_at = timestamp if ended_at is None else max(ended_at, timestamp)
-
-                entry_type = entry.get("type")
-                if entry_type == "session":
-                    source_session_id = _coerce_str(entry.get("id")) or source_session_id
-                    cwd = _coerce_str(entry.get("cwd")) or cwd
-                elif entry_type == "model_change":
-                    model = _coerce_str(entry.get("modelId")) or model
-                elif entry_type == "message":
-                    message_payload = entry.get("message")
-                    if not isinstance(message_payload, dict):
-                        continue
-                    message = _parse_message(
-                        message_payload=message_payload,
-                        session_id=session_id_value,
-                        idx=len(messages),
-                        timestamp=timestamp,
-                    )
-                    messages.append(message)
-                    for tool_idx, tool_call in enumerate(message.tool_calls):
-                        tool_call.idx = tool_idx
-                        tool_call.id = make_tool_call_id(message.id, tool_idx)
-                        tool_call.session_id = session_id_value
-                        tool_call.message_id = message.id
-                        tool_calls.append(tool_call)
-
-                    usage = message_payload.get("usage")
-                    if isinstance(usage, dict):
-                        input_tokens = _accumulate_metric(input_tokens, usage.get("input"))
-                        output_tokens = _accumulate_metric(output_tokens, usage.get("output"))
-
-        duration_seconds = None
-        if started_at and ended_at:
-            duration_seconds = int((ended_at - started_at).total_seconds())
-
-        return Session(
-            id=session_id_value,
+    def root(self) -> Path:
+        return Path.home() / ".pi" / "agent" / "sessions"
+
+    def matches(self, name: str) -> bool:
+        return session_name(name).endswith(".jsonl")
+
+    def parse(self, path: Path) -> SessionRecord:
+        return self.stream(path).collect()
+
+    def resume(self, path: Path, checkpoint: ParseCheckpoint) -> SessionRecord:
+        return self.stream(path, checkpoint).collect()
+
+    def stream(self, path: Path, checkpoint: ParseCheckpoint | None = None) -> SessionStream:
+        state = ParseState.from_dict(checkpoint.state) if checkpoint else ParseState()
+        absolute_path = str(path.expanduser().resolve())
+        stat = path.stat()
+        header = SessionHeader(
+            id=make_session_id(self.source.value, session_name(absolute_path)),
             source=self.source,
             source_path=absolute_path,
-            source_session_id=source_session_id,
-            started_at=started_at,
-            ended_at=ended_at,
-            duration_seconds=duration_seconds,
-            model=model,
-            cwd=cwd,
+            file_mtime=stat.st_mtime,
+            file_size=stat.st_size,
+            start=checkpoint.byte_offset if checkpoint else 0,
+        )
+        reader = LineReader(path, header.start)
+        return SessionStream(
+            header,
+            self._read(reader, state, header.id),
+            partial(self._finalize, path, header, reader, state),
+            reader,
+        )
+
+    def _read(
+        self, reader: LineReader, state: ParseState, session_id_value: str
+    ) -> Iterator[MessageRecord]:
+        ids = SessionIds(session_id_value)
+        for line in reader:
+            head = read_head(line)
+            ignored_timestamp = _ignored_timestamp(head) if head is not None else None
+            if ignored_timestamp is not None:
+                state.observe_timestamp(_parse_timestamp(ignored_timestamp))
+                continue
+            try:
+                entry = reader.decode(line)
+            except json.JSONDecodeError:
+                state.is_complete = False
+                continue
+
+            timestamp = _parse_timestamp(entry.get("timestamp"))
+            state.observe_timestamp(timestamp)
+
+            entry_type = entry.get("type")
+            if entry_type == "session":
+                state.source_session_id = _coerce_str(entry.get("id")) or state.source_session_id
+                state.cwd = _coerce_str(entry.get("cwd")) or state.cwd
+            elif entry_type == "model_change":
+                state.model = _coerce_str(entry.get("modelId")) or state.model
+            elif entry_type == "message":
+                message_payload = entry.get("message")
+                if not isinstance(message_payload, dict):
+                    continue
+                message = _parse_message(
+                    message_payload=message_payload,
+                    ids=ids,
+                    idx=state.message_count,
+                    timestamp=timestamp,
+                )
+                state.message_count += 1
+                for tool_idx, tool_call in enumerate(message.tool_calls):
+                    tool_call.idx = tool_idx
+                    tool_call.id = make_tool_call_id(message.id, tool_idx)
+                    tool_call.session_id = session_id_value
+                    tool_call.message_id = message.id
+                    state.tool_count += 1
+
+                usage = message_payload.get("usage")
+                if isinstance(usage, dict):
+                    state.input_tokens = _accumulate_metric(state.input_tokens, usage.get("input"))
+                    state.output_tokens = _accumulate_metric(
+                        state.output_tokens, usage.get("output")
+                    )
+                yield message
+
+    def _finalize(
+        self, path: Path, header: SessionHeader, reader: LineReader, state: ParseState
+    ) -> SessionRecord:
+        byte_offset = reader.resumable_offset
+        return SessionRecord(
+            id=header.id,
+            source=header.source,
+            source_path=header.source_path,
+            source_session_id=state.source_session_id,
+            started_at=state.started_at,
+            ended_at=state.ended_at,
+            duration_seconds=state.duration_seconds,
+            model=state.model,
+            cwd=state.cwd,
             git_repo=None,
             git_branch=None,
-            message_count=len(messages),
-            tool_count=len(tool_calls),
-            input_tokens=input_tokens,
-            output_tokens=output_tokens,
-            is_complete=is_complete,
-            file_mtime=file_mtime,
-            file_size=file_size,
-            messages=messages,
+            message_count=state.message_count,
+            tool_count=state.tool_count,
+            input_tokens=state.input_tokens,
+            output_tokens=state.output_tokens,
+            is_complete=state.is_complete,
+            file_mtime=header.file_mtime,
+            file_size=header.file_size,
+            byte_offset=byte_offset,
+            prefix_digest=prefix_digest(path, byte_offset) if byte_offset is not None else None,
+            parser_state=state.to_dict(),
+            content_digest=content_digest(path, header.file_size),
         )
 
 
 def _parse_message(
     message_payload: dict[str, Any],
-    session_id: str,
+    ids: SessionIds,
     idx: int,
     timestamp: datetime | None,
-) -> Message:
+) -> MessageRecord:
     role = _parse_role(message_payload.get("role"))
     text_parts, thinking_parts, tool_calls = _extract_content_blocks(message_payload.get("content"))
-    return Message(
-        id=make_message_id(session_id, idx),
-        session_id=session_id,
+    return MessageRecord(
+        id=ids.message(idx),
+        session_id=ids.session_id,
         idx=idx,
         role=role,
         content="\n".join(text_parts) if text_parts else None,
@@ -146,10 +181,10 @@ def _parse_role(value: Any) -> Role:
             return Role.USER
 
 
-def _extract_content_blocks(content: Any) -> tuple[list[str], list[str], list[ToolCall]]:
+def _extract_content_blocks(content: Any) -> tuple[list[str], list[str], list[ToolCallRecord]]:
     text_parts: list[str] = []
     thinking_parts: list[str] = []
-    tool_calls: list[ToolCall] = []
+    tool_calls: list[ToolCallRecord] = []
 
     if content is None:
         return text_parts, thinking_parts, tool_calls
@@ -198,10 +233,10 @@ def _parse_tool_arguments(raw: Any) -> dict[str, Any] | None:
     return None
 
 
-def _build_tool_call(tool_name: str, tool_input: dict[str, Any] | None) -> ToolCall:
+def _build_tool_call(tool_name: str, tool_input: dict[str, Any] | None) -> ToolCallRecord:
     bash_command = _extract_bash_command(tool_name, tool_input)
     parsed = parse_bash_command(bash_command) if bash_command else None
-    return ToolCall(
+    return ToolCallRecord(
         id="",
         session_id="",
         message_id=None,
@@ -212,6 +247,7 @@ def _build_tool_call(tool_name: str, tool_input: dict[str, Any] | None) -> ToolC
         bash_base=parsed.base if parsed else None,
         bash_sub=parsed.sub if parsed else None,
         is_compound=parsed.is_compound if parsed else False,
+        bash_segments=parsed.segments if parsed else (),
     )
 
 
@@ -227,6 +263,11 @@ def _extract_bash_command(tool_name: str, tool_input: dict[str, Any] | None) ->
     return None
 
 
+def _ignored_timestamp(head: EntryHead) -> str | None:
+    """The timestamp of an entry _read would not consume; None if it must be decoded."""
+    return None if head.type in _CONSUMED_TYPES else head.timestamp
+
+
 def _parse_timestamp(value: Any) -> datetime | None:
     if not isinstance(value, str) or not value:
         return None
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+
+# Reading the head costs a few microseconds whatever the line length, about
+# as much as decoding a small line, so only longer lines are classified.
+PREFILTER_MIN_BYTES = 2048
+
+# Each lookahead only scans the head, the part of the line before its first
+# nested object or array, so keys of nested values never match. Quotes inside
+# JSON strings are always escaped, so a quoted key found there is top-level.
+_HEAD = re.compile(
+    rb'\{(?=[^{\[]*?"type"\s*:\s*"([^"\\]*)")'
+    rb'(?=[^{\[]*?"timestamp"\s*:\s*"([^"\\]*)")?'
+    rb'(?:(?=[^{\[]*?"payload"\s*:\s*\{\s*"type"\s*:\s*"([^"\\]*)"))?'
+)
+
+
+@dataclass(frozen=True, slots=True)
+class EntryHead:
+    """Top-level fields of a JSONL entry, read from its bytes without decoding it."""
+
+    type: str
+    # Set when a plain string in the head.
+    timestamp: str | None
+    # "type" of the "payload" object, when that is the payload's first key.
+    payload_type: str | None
+
+
+def read_head(line: bytes) -> EntryHead | None:
+    """Classify a long JSONL entry by its top-level "type" so it can be skipped.
+
+    Returns None when the line is shorter than PREFILTER_MIN_BYTES, is not
+    brace-delimited, or has no plain string "type" before its first nested
+    value; the caller then decodes the line as usual.
+    """
+    if len(line) < PREFILTER_MIN_BYTES or not line.endswith(b"}"):
+        return None
+    match = _HEAD.match(line)
+    if match is None:
+        return None
+    entry_type, timestamp, payload_type = match.groups()
+    try:
+        return EntryHead(
+            type=entry_type.decode(),
+            timestamp=timestamp.decode() if timestamp is not None else None,
+            payload_type=payload_type.decode() if payload_type is not None else None,
+        )
+    except UnicodeDecodeError:
+        return None
@@ -1,10 +1,19 @@
 from __future__ import annotations
 
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Protocol
+from typing import Any, Protocol
 
-from recall.core.models import Session
+from recall.core.records import SessionRecord
 from recall.core.types import Source
+from recall.parsers.discovery import DiscoveredFile
+from recall.parsers.stream import SessionStream
+
+
+@dataclass(frozen=True)
+class ParseCheckpoint:
+    byte_offset: int
+    state: dict[str, Any]
 
 
 class SessionParser(Protocol):
@@ -12,4 +21,14 @@ class SessionParser(Protocol):
 
     def discover(self) -> list[Path]: ...
 
-    def parse(self, path: Path) -> Session: ...
+    def scan(self) -> list[DiscoveredFile]: ...
+
+    def root(self) -> Path: ...
+
+    def matches(self, name: str) -> bool: ...
+
+    def parse(self, path: Path) -> SessionRecord: ...
+
+    def resume(self, path: Path, checkpoint: ParseCheckpoint) -> SessionRecord: ...
+
+    def stream(self, path: Path, checkpoint: ParseCheckpoint | None = None) -> SessionStream: ...
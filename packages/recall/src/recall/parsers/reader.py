@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import hashlib
+import mmap
+import os
+import time
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+from typing import Any
+
+from recall.parsers.compression import is_compressed, open_session_file
+from recall.parsers.decoder import JsonDecoder, default_decoder
+
+DIGEST_BLOCK_BYTES = 4096
+# Files modified more recently than this are read, not memory-mapped: a file
+# truncated or rewritten while mapped raises SIGBUS when the lost pages are
+# touched, which kills the process instead of raising an exception.
+MMAP_SETTLE_SECONDS = 300.0
+
+
+class LineReader:
+    """Iterate the non-empty lines of a JSONL file from a byte offset.
+
+    `resumable_offset` is the position just past the last newline-terminated
+    line, or None when the file ends in a partial line that may still be
+    written to. Compressed files (.gz, .zst) are decompressed as they are
+    read; offsets then count decompressed bytes and they are never resumed.
+    Lines decoded through decode() are timed into decode_seconds; the decoder
+    defaults to the configured one.
+
+    Uncompressed files not modified for MMAP_SETTLE_SECONDS are memory-mapped
+    and split on newlines in place, so each line costs one bytes slice instead
+    of a buffered readline copy. Files that may still be written to, which
+    includes everything `recall watch` indexes after a change, are read
+    through a buffered stream.
+    """
+
+    def __init__(self, path: Path, start: int = 0, decoder: JsonDecoder | None = None) -> None:
+        self.path = path
+        self.start = start
+        self.offset = start
+        self.has_partial_tail = False
+        self.decode_seconds = 0.0
+        self._loads = decoder or default_decoder()[1]
+
+    def __iter__(self) -> Iterator[bytes]:
+        self.offset = self.start
+        self.has_partial_tail = False
+        if is_compressed(self.path):
+            yield from self._read_stream()
+            return
+        with self.path.open("rb") as handle:
+            stat = os.fstat(handle.fileno())
+            if stat.st_size <= self.start:
+                return
+            mapped = _map_settled(handle.fileno(), stat)
+            if mapped is None:
+                handle.seek(self.start)
+                yield from self._split(handle)
+                return
+            with mapped:
+                yield from self._split_mapped(mapped, stat.st_size)
+
+    def _split_mapped(self, mapped: mmap.mmap, size: int) -> Iterator[bytes]:
+        find = mapped.find
+        position = self.start
+        while position < size:
+            end = find(b"\n", position)
+            if end < 0:
+                line = mapped[position:size].strip()
+                self.has_partial_tail = bool(line)
+                if line:
+                    yield line
+                return
+            line = mapped[position:end].strip()
+            position = end + 1
+            self.offset = position
+            if line:
+                yield line
+
+    def _read_stream(self) -> Iterator[bytes]:
+        with open_session_file(self.path) as handle:
+            if self.start:
+                handle.seek(self.start)
+            yield from self._split(handle)
+
+    def _split(self, handle: Iterable[bytes]) -> Iterator[bytes]:
+        for raw in handle:
+            if raw.endswith(b"\n"):
+                self.offset += len(raw)
+            else:
+                self.has_partial_tail = bool(raw.strip())
+            line = raw.strip()
+            if line:
+                yield line
+
+    def decode(self, line: bytes) -> Any:
+        started = time.perf_counter()
+        try:
+            return self._loads(line)
+        finally:
+            self.decode_seconds += time.perf_counter() - started
+
+    @property
+    def bytes_read(self) -> int:
+        return self.offset - self.start
+
+    @property
+    def resumable_offset(self) -> int | None:
+        if self.has_partial_tail or is_compressed(self.path):
+            return None
+        return self.offset
+
+
+def _map_settled(fileno: int, stat: os.stat_result) -> mmap.mmap | None:
+    if time.time() - stat.st_mtime < MMAP_SETTLE_SECONDS:
+        return None
+    try:
+        return mmap.mmap(fileno, 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        # Not mappable (e.g. some network or virtual file systems).
+        return None
+
+
+def prefix_digest(path: Path, offset: int) -> str:
+    """Digest the first and last blocks before offset to detect rewritten prefixes."""
+    digest = hashlib.blake2b(digest_size=16)
+    with path.open("rb") as handle:
+        digest.update(handle.read(min(offset, DIGEST_BLOCK_BYTES)))
+        tail_start = max(0, offset - DIGEST_BLOCK_BYTES)
+        handle.seek(tail_start)
+        digest.update(handle.read(offset - tail_start))
+    return digest.hexdigest()
+
+
+def content_digest(path: Path, size: int) -> str:
+    """Fingerprint a file of the given size by its first and last blocks.
+
+    Session files are append-only, so together with the size this tells a
+    file whose mtime was bumped (restore, rsync, editor) from a changed one.
+    """
+    return prefix_digest(path, size)
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass, fields
+from datetime import datetime
+from typing import Any
+
+_DATETIME_FIELDS = ("started_at", "ended_at")
+
+
+@dataclass
+class ParseState:
+    """Session aggregates a parser carries from one line to the next.
+
+    The state is persisted with each session so an append-only file can be
+    resumed from its last byte offset without rereading the prefix.
+    """
+
+    is_complete: bool = True
+    started_at: datetime | None = None
+    ended_at: datetime | None = None
+    source_session_id: str | None = None
+    model: str | None = None
+    cwd: str | None = None
+    git_repo: str | None = None
+    git_branch: str | None = None
+    input_tokens: int | None = None
+    output_tokens: int | None = None
+    message_count: int = 0
+    tool_count: int = 0
+    orphan_count: int = 0
+
+    def observe_timestamp(self, timestamp: datetime | None) -> None:
+        if timestamp is None:
+            return
+        self.started_at = timestamp if self.started_at is None else min(self.started_at, timestamp)
+        self.ended_at = timestamp if self.ended_at is None else max(self.ended_at, timestamp)
+
+    @property
+    def duration_seconds(self) -> int | None:
+        if self.started_at and self.ended_at:
+            return int((self.ended_at - self.started_at).total_seconds())
+        return None
+
+    def to_dict(self) -> dict[str, Any]:
+        data = asdict(self)
+        for name in _DATETIME_FIELDS:
+            value = data[name]
+            data[name] = value.isoformat() if value is not None else None
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> ParseState:
+        known = {field.name for field in fields(cls)}
+        values = {key: value for key, value in data.items() if key in known}
+        for name in _DATETIME_FIELDS:
+            value = values.get(name)
+            values[name] = datetime.fromisoformat(value) if isinstance(value, str) else None
+        return cls(**values)
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass, field
+from typing import Protocol
+
+from recall.core.records import MessageRecord, SessionRecord, ToolCallRecord
+from recall.core.types import Source
+from recall.parsers.reader import LineReader
+
+
+@dataclass(frozen=True)
+class SessionHeader:
+    id: str
+    source: Source
+    source_path: str
+    file_mtime: float
+    file_size: int
+    # Offset parsing starts at; non-zero when resuming an appended file.
+    start: int = 0
+
+
+class RowSink(Protocol):
+    """Receives rows as they are parsed, e.g. column buffers for a bulk load."""
+
+    def add_message(self, message: MessageRecord) -> None: ...
+
+    def add_tool_call(self, tool_call: ToolCallRecord) -> None: ...
+
+
+@dataclass
+class SessionChunk:
+    messages: list[MessageRecord] = field(default_factory=list)
+    orphan_tool_calls: list[ToolCallRecord] = field(default_factory=list)
+    row_count: int = 0
+
+
+class SessionStream:
+    """A session file read incrementally.
+
+    The header is known up front, rows arrive through chunks(), and
+    finalize() returns the session row with its aggregates (and no messages)
+    once the chunks are exhausted. The reader exposes bytes read and time
+    spent decoding JSON for profiling.
+    """
+
+    def __init__(
+        self,
+        header: SessionHeader,
+        items: Iterator[MessageRecord | ToolCallRecord],
+        finalize: Callable[[], SessionRecord],
+        reader: LineReader,
+    ) -> None:
+        self.header = header
+        self.reader = reader
+        self._items = items
+        self._finalize = finalize
+
+    def chunks(self, max_rows: int) -> Iterator[SessionChunk]:
+        """Yield rows in chunks of about max_rows messages plus tool calls."""
+        chunk = SessionChunk()
+        for item in self._items:
+            if isinstance(item, MessageRecord):
+                chunk.messages.append(item)
+                chunk.row_count += 1 + len(item.tool_calls)
+            else:
+                chunk.orphan_tool_calls.append(item)
+                chunk.row_count += 1
+            if chunk.row_count >= max_rows:
+                yield chunk
+                chunk = SessionChunk()
+        if chunk.row_count:
+            yield chunk
+
+    def finalize(self) -> SessionRecord:
+        return self._finalize()
+
+    def collect(self) -> SessionRecord:
+        """Read the whole file into one SessionRecord, messages included."""
+        messages: list[MessageRecord] = []
+        orphan_tool_calls: list[ToolCallRecord] = []
+        for item in self._items:
+            if isinstance(item, MessageRecord):
+                messages.append(item)
+            else:
+                orphan_tool_calls.append(item)
+        session = self._finalize()
+        session.messages = messages
+        session.orphan_tool_calls = orphan_tool_calls
+        return session
+
+    def collect_rows(self, sink: RowSink) -> SessionRecord:
+        """Read the whole file into sink; returns the session row without messages.
+
+        The columnar counterpart of collect(): each row is handed to sink as
+        soon as it is parsed and not retained, so no object graph is built.
+        Tool calls of a message arrive with it in message.tool_calls.
+        """
+        for item in self._items:
+            if isinstance(item, MessageRecord):
+                sink.add_message(item)
+            else:
+                sink.add_tool_call(item)
+        return self._finalize()
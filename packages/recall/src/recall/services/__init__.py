@@ -1,11 +1,15 @@
 from recall.services.analytics import (
     BashStat,
+    IndexHistory,
+    IndexRunStat,
     OverviewStats,
     PermissionSkipped,
     PermissionSuggestion,
+    ThroughputTrend,
     ToolStat,
     bash_breakdown,
     bash_suggestions,
+    index_history,
     overview,
     token_usage,
     tool_usage,
@@ -13,18 +17,23 @@ from recall.services.analytics import (
 from recall.services.indexer import IndexSummary, index_sessions
 from recall.services.search import SearchResult, search
 from recall.services.sessions import SessionSummary, list_sessions, load_session
+from recall.services.watcher import watch_sessions
 
 __all__ = [
     "BashStat",
+    "IndexHistory",
+    "IndexRunStat",
     "IndexSummary",
     "OverviewStats",
     "PermissionSkipped",
     "PermissionSuggestion",
     "SearchResult",
     "SessionSummary",
+    "ThroughputTrend",
     "ToolStat",
     "bash_breakdown",
     "bash_suggestions",
+    "index_history",
     "index_sessions",
     "list_sessions",
     "load_session",
@@ -32,4 +41,5 @@ __all__ = [
     "search",
     "token_usage",
     "tool_usage",
+    "watch_sessions",
 ]
@@ -1,11 +1,13 @@
 from __future__ import annotations
 
+import statistics
 from dataclasses import dataclass
+from datetime import datetime
 
 import duckdb
 
 from recall.core.config import AppConfig
-from recall.db import connect
+from recall.db import IndexRun, connect, fetch_index_runs
 
 DANGEROUS_BASES = {
     "rm",
@@ -43,6 +45,10 @@ class BashStat:
     bash_sub: str | None
     count: int
     is_compound: bool
+    # Uses inside a compound command; the rest ran on their own.
+    compound_count: int
+    # Ran in a compound command together with a destructive command.
+    with_destructive: bool
 
 
 @dataclass(frozen=True)
@@ -60,6 +66,43 @@ class PermissionSkipped:
     reason: str
 
 
+@dataclass(frozen=True)
+class IndexRunStat:
+    started_at: datetime
+    mode: str
+    source: str | None
+    recall_version: str | None
+    duration_seconds: float
+    indexed: int
+    skipped: int
+    failed: int
+    bytes_read: int
+    rows_inserted: int
+    # Bytes over decode + build time; None when nothing was parsed.
+    parse_mb_per_second: float | None
+    # Rows over write + stream time; None when nothing was written.
+    write_rows_per_second: float | None
+    phases: dict[str, float]
+
+
+@dataclass(frozen=True)
+class ThroughputTrend:
+    mode: str
+    metric: str
+    latest: float
+    # Median of the earlier runs of the same mode.
+    baseline: float
+    # Relative change of latest against baseline (-0.2 is 20% slower).
+    change: float
+    runs: int
+
+
+@dataclass(frozen=True)
+class IndexHistory:
+    runs: list[IndexRunStat]
+    trends: list[ThroughputTrend]
+
+
 def overview() -> OverviewStats:
     config = AppConfig.load()
     conn = connect(config)
@@ -104,23 +147,40 @@ def bash_breakdown(limit: int = 100) -> list[BashStat]:
     config = AppConfig.load()
     conn = connect(config)
     try:
+        # Counts every simple command, including those after the first one of
+        # a compound command, and how many of those uses were in one.
         rows = conn.execute(
             """
-            SELECT bash_base, bash_sub, COUNT(*) AS count, MAX(is_compound) AS is_compound
-            FROM tool_calls
-            WHERE bash_command IS NOT NULL
-            GROUP BY bash_base, bash_sub
-            ORDER BY count DESC
+            WITH segments AS (
+                SELECT
+                    base,
+                    sub,
+                    COUNT(*) OVER calls > 1 AS in_compound,
+                    BOOL_OR(list_contains(?, base)) OVER calls AS with_destructive
+                FROM bash_segments
+                WINDOW calls AS (PARTITION BY tool_call_id)
+            )
+            SELECT
+                base,
+                sub,
+                COUNT(*) AS count,
+                COUNT(*) FILTER (WHERE in_compound) AS compound_count,
+                BOOL_OR(in_compound AND with_destructive) AS with_destructive
+            FROM segments
+            GROUP BY base, sub
+            ORDER BY count DESC, base, sub
             LIMIT ?
             """,
-            [limit],
+            [sorted(DANGEROUS_BASES), limit],
         ).fetchall()
         return [
             BashStat(
                 bash_base=row[0],
                 bash_sub=row[1],
                 count=int(row[2]),
-                is_compound=bool(row[3]),
+                is_compound=int(row[3]) > 0,
+                compound_count=int(row[3]),
+                with_destructive=bool(row[4]),
             )
             for row in rows
         ]
@@ -143,13 +203,20 @@ def bash_suggestions(
                 PermissionSkipped(pattern=pattern, count=stat.count, reason="Destructive command")
             )
             continue
-        if stat.is_compound:
+        # Patterns that mostly run on their own keep their suggestion even if
+        # they also appear in compound commands such as `cd app && npm test`.
+        compound_reason = None
+        if stat.with_destructive:
+            compound_reason = "Chained with destructive commands"
+        elif stat.compound_count * 2 > stat.count:
+            compound_reason = "Mostly used in compound commands"
+        if compound_reason is not None:
             suggestions.append(
                 PermissionSuggestion(
                     pattern=pattern,
                     count=stat.count,
                     confidence="review",
-                    reason="Contains compound operators",
+                    reason=compound_reason,
                 )
             )
             continue
@@ -203,6 +270,59 @@ def token_usage(limit: int = 50) -> list[tuple[str | None, int, int]]:
         conn.close()
 
 
+def index_history(limit: int = 20) -> IndexHistory:
+    """Recent `recall index` runs (newest first) and each mode's throughput trend."""
+    config = AppConfig.load()
+    conn = connect(config)
+    try:
+        runs = [_index_run_stat(run) for run in fetch_index_runs(conn, limit)]
+    finally:
+        conn.close()
+    trends: list[ThroughputTrend] = []
+    for mode in sorted({run.mode for run in runs}):
+        mode_runs = [run for run in runs if run.mode == mode]
+        for metric in ("parse_mb_per_second", "write_rows_per_second"):
+            values = [value for run in mode_runs if (value := getattr(run, metric)) is not None]
+            if len(values) < 2:
+                continue
+            baseline = statistics.median(values[1:])
+            trends.append(
+                ThroughputTrend(
+                    mode=mode,
+                    metric=metric,
+                    latest=values[0],
+                    baseline=baseline,
+                    change=values[0] / baseline - 1 if baseline else 0.0,
+                    runs=len(values),
+                )
+            )
+    return IndexHistory(runs=runs, trends=trends)
+
+
+def _index_run_stat(run: IndexRun) -> IndexRunStat:
+    parse_seconds = run.phases.get("decode", 0.0) + run.phases.get("build", 0.0)
+    write_seconds = run.phases.get("write", 0.0) + run.phases.get("stream", 0.0)
+    return IndexRunStat(
+        started_at=run.started_at,
+        mode=run.mode,
+        source=run.source,
+        recall_version=run.recall_version,
+        duration_seconds=(run.ended_at - run.started_at).total_seconds(),
+        indexed=run.indexed,
+        skipped=run.skipped,
+        failed=run.failed,
+        bytes_read=run.bytes_read,
+        rows_inserted=run.rows_inserted,
+        parse_mb_per_second=(
+            run.bytes_read / 1_000_000 / parse_seconds if run.bytes_read and parse_seconds else None
+        ),
+        write_rows_per_second=(
+            run.rows_inserted / write_seconds if run.rows_inserted and write_seconds else None
+        ),
+        phases=run.phases,
+    )
+
+
 def _format_pattern(base: str, sub: str | None) -> str:
     if sub:
         return f"{base} {sub}"
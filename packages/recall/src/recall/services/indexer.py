@@ -1,29 +1,114 @@
 from __future__ import annotations
 
 import logging
-from collections.abc import Iterable
-from dataclasses import dataclass
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field, replace
+from datetime import UTC, datetime, timedelta
+from functools import partial
+from importlib.metadata import PackageNotFoundError, version
 from pathlib import Path
 
 import duckdb
+import pyarrow as pa
 
+from recall.core.bash import BASH_COMMAND_CACHE
 from recall.core.config import AppConfig
-from recall.core.models import Session, ToolCall
+from recall.core.records import SessionRecord, ToolCallRecord
+from recall.core.time import naive_utc
 from recall.core.types import Source
 from recall.db import (
+    BASH_SEGMENT_SCHEMA,
+    MESSAGE_SCHEMA,
+    SESSION_SCHEMA,
+    TOOL_CALL_SCHEMA,
+    ColumnBatch,
+    FailedFile,
+    IndexCheckpoint,
+    IndexRun,
+    SessionColumns,
+    SessionState,
+    StagedRows,
     advisory_lock,
+    clear_index_checkpoint,
     connect,
-    create_fts_indexes,
+    delete_failed_files,
     delete_session,
-    fetch_session_state,
+    delete_sessions,
+    fetch_failed_files,
+    fetch_parser_state,
+    fetch_session_states,
+    insert_arrow_table,
+    insert_column_batch,
+    insert_index_run,
     insert_messages,
     insert_session,
+    insert_staged_rows,
     insert_tool_calls,
+    read_index_checkpoint,
+    record_failed_files,
+    registered_ids,
+    sessions_indexed_since,
+    stage_rows,
+    stage_session_rows,
+    staged_rows,
+    start_index_checkpoint,
+    update_appended_session,
+    update_fts_index,
+    update_index_checkpoint,
+    update_session_mtimes,
 )
-from recall.parsers import SessionParser, all_parsers, get_parser
+from recall.parsers import (
+    DirectoryCache,
+    DiscoveredFile,
+    ParseCheckpoint,
+    SessionParser,
+    all_parsers,
+    expanded_size,
+    get_parser,
+    is_compressed,
+    iter_files,
+    session_name,
+)
+from recall.parsers.reader import content_digest, prefix_digest
+from recall.parsers.state import ParseState
+from recall.services.pipeline import Channel, PipelineCancelled, StageStats, StageThread
+from recall.services.profile import IndexProfile
 
 logger = logging.getLogger("recall.indexer")
 
+# Bounded queues between the discover, parse and write stages. A full queue
+# blocks the stage feeding it, so a slow writer throttles parsing and a slow
+# parser throttles discovery instead of buffering sessions in memory.
+JOB_QUEUE_SIZE = 256
+OUTCOME_QUEUE_SIZE = 16
+
+# Jobs submitted per pool worker ahead of the one being collected.
+PARSE_BACKLOG_PER_WORKER = 4
+
+# Parsed sessions are written in one transaction once a batch reaches either limit.
+BATCH_MAX_SESSIONS = 500
+BATCH_MAX_ROWS = 50_000
+
+# Files (or appended tails) at least this large are streamed instead of parsed
+# whole, so memory stays bounded by the chunk size rather than the file size.
+STREAM_MIN_BYTES = 64 * 1024 * 1024
+STREAM_CHUNK_ROWS = 10_000
+
+# A file that failed to index is skipped until it changes or its backoff
+# expires; the backoff doubles with every failed attempt up to the maximum.
+FAILURE_BACKOFF = timedelta(minutes=30)
+FAILURE_BACKOFF_MAX = timedelta(days=7)
+
+# How often a full reindex records its progress and folds the WAL into the
+# database file, bounding the work lost to an interruption.
+CHECKPOINT_SECONDS = 30.0
+
 
 @dataclass(frozen=True)
 class IndexSummary:
@@ -31,6 +116,102 @@ class IndexSummary:
     indexed: int
     skipped: int
     failed: int
+    # Previously indexed session files no longer found on disk (rows are kept).
+    missing: int = 0
+    # Files that failed before and were skipped because they have not changed.
+    quarantined: int = 0
+    # True when the time budget ran out before every changed file was indexed.
+    budget_exhausted: bool = False
+    # Sessions already reindexed by an interrupted run that this one resumed.
+    resumed: int = 0
+    # Throughput counters of the discover, parse and write stages.
+    stages: tuple[StageStats, ...] = ()
+    profile: IndexProfile = field(default_factory=IndexProfile)
+
+
+@dataclass(frozen=True)
+class IndexJob:
+    parser: SessionParser
+    path: Path
+    # Set when the file only grew since it was last indexed.
+    checkpoint: ParseCheckpoint | None = None
+    # True when no session row exists yet, so the batch write deletes nothing.
+    is_new: bool = False
+    # Bytes left to parse: the file size, or the appended tail when resuming.
+    size: int = 0
+    # The file's mtime and size when discovered, recorded if it fails.
+    mtime: float = 0.0
+    file_size: int = 0
+
+
+@dataclass(frozen=True)
+class ParseOutcome:
+    job: IndexJob
+    session: SessionRecord | None
+    error: str | None
+    # Rows of a session parsed in columnar mode; session then has no messages.
+    columns: SessionColumns | None = None
+    seconds: float = 0.0
+    # Part of seconds spent decoding JSON.
+    decode_seconds: float = 0.0
+    # Bash command cache lookups while parsing, counted in the parsing process.
+    bash_cache_hits: int = 0
+    bash_cache_misses: int = 0
+
+
+@dataclass(frozen=True)
+class FileFailure:
+    source: str
+    path: str
+    mtime: float
+    size: int
+    error: str
+
+
+@dataclass
+class DiscoveryResult:
+    total: int = 0
+    skipped: int = 0
+    quarantined: int = 0
+    failures: list[FileFailure] = field(default_factory=list)
+    # Previously failed files that were attempted again.
+    retried: list[str] = field(default_factory=list)
+    # Jobs large enough to be streamed by the writer instead of parsed whole.
+    streamed: list[IndexJob] = field(default_factory=list)
+    # New mtimes of sessions whose file was touched but not changed, by id.
+    retimed: dict[str, float] = field(default_factory=dict)
+
+
+@dataclass
+class ReindexProgress:
+    """Checkpointing state of a full reindex.
+
+    session_ids holds the sessions an interrupted earlier attempt already
+    reindexed: discovery diffs them like an incremental run instead of
+    parsing them again, and the final search index update includes them.
+    """
+
+    session_ids: frozenset[str] = frozenset()
+    sessions_done: int = 0
+    last_checkpoint: float = field(default_factory=time.perf_counter)
+
+    def committed(self, conn: duckdb.DuckDBPyConnection, sessions: int) -> None:
+        """Count committed sessions and checkpoint once CHECKPOINT_SECONDS passed."""
+        self.sessions_done += sessions
+        if time.perf_counter() - self.last_checkpoint < CHECKPOINT_SECONDS:
+            return
+        update_index_checkpoint(conn, datetime.now(UTC), self.sessions_done)
+        conn.execute("CHECKPOINT")
+        self.last_checkpoint = time.perf_counter()
+        logger.info("checkpoint: %d sessions reindexed", self.sessions_done)
+
+
+@dataclass(frozen=True)
+class PersistedBatchRows:
+    sessions: pa.Table
+    messages: pa.Table
+    tool_calls: pa.Table
+    bash_segments: pa.Table
 
 
 @dataclass(frozen=True)
@@ -38,6 +219,7 @@ class PersistedSessionRows:
     session_row: tuple[object, ...]
     message_rows: list[tuple[object, ...]]
     tool_call_rows: list[tuple[object, ...]]
+    bash_segment_rows: list[tuple[object, ...]]
 
 
 def index_sessions(
@@ -46,62 +228,861 @@ def index_sessions(
     full: bool,
     recreate: bool,
     verbose: bool,
+    workers: int = 1,
+    retry_failed: bool = False,
+    budget: timedelta | None = None,
 ) -> IndexSummary:
+    """Index new and changed session files.
+
+    With a budget, files are indexed newest first and indexing stops once it
+    is spent: the batch being written is committed, the search index is
+    updated for what was written, and the older files left over are picked
+    up by the next run. Ordering needs the whole scan before the first file
+    is parsed, so without a budget discovery streams into the pipeline in
+    directory order instead.
+
+    Full reindexes record a checkpoint. When one was interrupted (or stopped
+    by its budget), the next call resumes it with its mode and source instead
+    of doing what was asked.
+    """
     config = AppConfig.load()
     if verbose:
         logging.basicConfig(level=logging.INFO)
     else:
         logging.basicConfig(level=logging.WARNING)
 
-    if recreate:
-        full = True
-
     with advisory_lock(config.lock_path):
-        conn = connect(config, recreate=recreate)
+        checkpoint = read_index_checkpoint(config.db_path)
+        if checkpoint is not None:
+            logger.warning(
+                "resuming interrupted %s reindex started at %s",
+                checkpoint.mode,
+                checkpoint.started_at,
+            )
+            recreate = checkpoint.mode == "recreate"
+            full = True
+            source = Source(checkpoint.source) if checkpoint.source else None
+        mode = "recreate" if recreate else "full" if full else "incremental"
+        conn = connect(config, recreate=recreate and checkpoint is None)
+        started_at = datetime.now(UTC)
+        progress = None
+        if checkpoint is not None:
+            progress = ReindexProgress(
+                session_ids=frozenset(sessions_indexed_since(conn, checkpoint.started_at)),
+                sessions_done=checkpoint.sessions_done,
+            )
+        elif full or recreate:
+            start_index_checkpoint(
+                conn,
+                IndexCheckpoint(
+                    started_at=started_at,
+                    mode=mode,
+                    source=source.value if source else None,
+                    checkpointed_at=started_at,
+                    sessions_done=0,
+                ),
+            )
+            progress = ReindexProgress()
+        full = full or recreate
+        deadline = time.perf_counter() + budget.total_seconds() if budget is not None else None
         try:
-            paths = _discover_paths(source)
-            indexed = 0
-            skipped = 0
-            failed = 0
-            for parser, path in paths:
-                try:
-                    if not full and _is_unchanged(conn, path):
-                        skipped += 1
-                        logger.info("skip unchanged %s", path)
-                        continue
-                    session = parser.parse(path)
-                    _write_session(conn, session)
-                    indexed += 1
-                    logger.info("indexed %s", path)
-                except Exception as err:
-                    failed += 1
-                    logger.error("failed to index %s: %s", path, err)
-            if indexed:
-                create_fts_indexes(conn, config.fts)
-            return IndexSummary(total=len(paths), indexed=indexed, skipped=skipped, failed=failed)
+            parsers = [get_parser(source)] if source else all_parsers()
+            cache = DirectoryCache.load(config.discovery_cache_path)
+            # Failures of files the scan no longer finds are forgotten with it.
+            sources = {parser.source.value for parser in parsers}
+            unseen_failures = {
+                path
+                for path, failure in fetch_failed_files(conn).items()
+                if failure.source in sources
+            }
+            files: Iterable[tuple[SessionParser, DiscoveredFile]] = _discover_files(
+                parsers, cache, unseen_failures
+            )
+            if deadline is not None:
+                # Recent sessions are the ones searched for; when the run may stop
+                # early, index them before old history.
+                files = sorted(files, key=lambda pair: pair[1].mtime, reverse=True)
+            # One query for all known sessions; diffing against the scan yields the
+            # new, changed, unchanged and missing sets without per-file lookups.
+            fresh = recreate and checkpoint is None
+            states = {} if fresh else fetch_session_states(conn, [p.source for p in parsers])
+            summary = index_files(
+                conn,
+                config,
+                files,
+                states,
+                full=full,
+                workers=workers,
+                retry_failed=retry_failed,
+                deadline=deadline,
+                progress=progress,
+            )
+            if progress is not None and summary.budget_exhausted:
+                update_index_checkpoint(conn, datetime.now(UTC), progress.sessions_done)
+            elif progress is not None:
+                clear_index_checkpoint(conn)
+            if summary.budget_exhausted:
+                # Files left unvisited by the discover stage still exist.
+                for _, item in files:
+                    states.pop(str(item.path), None)
+                logger.info("time budget exhausted; remaining files are indexed by the next run")
+            for missing_path in states:
+                logger.info("session file missing %s", missing_path)
+            if unseen_failures:
+                delete_failed_files(conn, sorted(unseen_failures))
+                logger.info("forgot %d failed files that are gone", len(unseen_failures))
+            cache.save(config.discovery_cache_path)
+            logger.info("discovery reused %d directory listings, read %d", cache.hits, cache.misses)
+            for stage in summary.stages:
+                logger.info("stage %s", stage.describe())
+            summary = replace(summary, missing=len(states))
+            insert_index_run(
+                conn,
+                _index_run(summary, started_at, mode=mode, source=source, workers=workers),
+            )
+            return summary
         finally:
             conn.close()
 
 
-def _discover_paths(source: Source | None) -> list[tuple[SessionParser, Path]]:
-    parsers = [get_parser(source)] if source else all_parsers()
-    paths: list[tuple[SessionParser, Path]] = []
+def index_files(
+    conn: duckdb.DuckDBPyConnection,
+    config: AppConfig,
+    files: Iterable[tuple[SessionParser, DiscoveredFile]],
+    states: dict[str, SessionState],
+    *,
+    full: bool,
+    workers: int = 1,
+    retry_failed: bool = False,
+    deadline: float | None = None,
+    progress: ReindexProgress | None = None,
+) -> IndexSummary:
+    """Index discovered files over an open connection.
+
+    Runs as a pipeline: a discover thread consumes files (which may be a lazy
+    scan) and queues parse jobs, a parse thread (or process pool) turns them
+    into sessions, and the calling thread is the only writer.
+
+    states holds the stored state of previously indexed files keyed by path;
+    entries for the given files are popped, leaving those not seen. Files
+    that failed before are skipped while unchanged and backing off, unless
+    retry_failed is set. deadline is a time.perf_counter() value after which
+    the writer stops taking new sessions and the other stages wind down.
+    progress, when given, is told about every commit so a full reindex can
+    checkpoint.
+    """
+    started = time.perf_counter()
+    previous_failures = fetch_failed_files(conn)
+    quarantine = {} if retry_failed else previous_failures
+    cancelled = threading.Event()
+    # Set by the writer when the deadline passes; unlike cancelled, the
+    # stages finish normally and what was parsed so far is committed.
+    stop = threading.Event()
+    jobs: Channel[IndexJob] = Channel(JOB_QUEUE_SIZE, cancelled)
+    outcomes: Channel[ParseOutcome] = Channel(OUTCOME_QUEUE_SIZE, cancelled)
+    discovery = DiscoveryResult()
+    discover_stats = StageStats("discover")
+    parse_stats = StageStats("parse")
+    write_stats = StageStats("write")
+    profile = IndexProfile()
+    # DuckDB connections are not shared across threads; the discover stage
+    # reads parser state over its own cursor.
+    cursor = conn.cursor()
+    stages = [
+        StageThread(
+            "discover",
+            partial(
+                _discover_jobs,
+                cursor,
+                files,
+                states,
+                quarantine,
+                full,
+                jobs,
+                discovery,
+                discover_stats,
+                stop,
+                progress.session_ids if progress is not None else frozenset(),
+            ),
+            jobs,
+            cancelled,
+        ),
+        StageThread(
+            "parse",
+            partial(_parse_stage, jobs, outcomes, workers, parse_stats, stop),
+            outcomes,
+            cancelled,
+        ),
+    ]
+    for stage in stages:
+        stage.start()
+    indexed = 0
+    failures: list[FileFailure] = []
+    try:
+        indexed, failures = _write_stage(
+            conn, config, outcomes, discovery, write_stats, profile, deadline, stop, progress
+        )
+    except PipelineCancelled:
+        pass
+    except BaseException:
+        cancelled.set()
+        raise
+    finally:
+        for stage in stages:
+            stage.join()
+        cursor.close()
+    for stage in stages:
+        if stage.error is not None:
+            raise stage.error
+    failures = discovery.failures + failures
+    _update_failed_files(conn, previous_failures, discovery.retried, failures)
+    profile.add_phase("discover", discover_stats.busy_seconds)
+    profile.finish(time.perf_counter() - started)
+    return IndexSummary(
+        total=discovery.total,
+        indexed=indexed,
+        skipped=discovery.skipped,
+        failed=len(failures),
+        quarantined=discovery.quarantined,
+        budget_exhausted=stop.is_set(),
+        resumed=len(progress.session_ids) if progress is not None else 0,
+        stages=(discover_stats, parse_stats, write_stats),
+        profile=profile,
+    )
+
+
+def _index_run(
+    summary: IndexSummary,
+    started_at: datetime,
+    *,
+    mode: str,
+    source: Source | None,
+    workers: int,
+) -> IndexRun:
+    profile = summary.profile
+    return IndexRun(
+        started_at=started_at,
+        ended_at=datetime.now(UTC),
+        mode=mode,
+        source=source.value if source else None,
+        recall_version=_recall_version(),
+        workers=workers,
+        total=summary.total,
+        indexed=summary.indexed,
+        skipped=summary.skipped,
+        failed=summary.failed,
+        missing=summary.missing,
+        bytes_read=profile.bytes_read,
+        rows_inserted=profile.rows_inserted,
+        phases=dict(profile.phases),
+        sources={name: asdict(stats) for name, stats in profile.sources.items()},
+    )
+
+
+def _recall_version() -> str | None:
+    try:
+        return version("recall")
+    except PackageNotFoundError:
+        return None
+
+
+def _discover_files(
+    parsers: list[SessionParser], cache: DirectoryCache, unseen: set[str]
+) -> Iterator[tuple[SessionParser, DiscoveredFile]]:
+    """Scan the parsers' roots, removing every path found from unseen."""
     for parser in parsers:
-        for path in parser.discover():
-            paths.append((parser, path))
-    return paths
+        for item in iter_files(parser.root(), parser.matches, cache):
+            unseen.discard(str(item.path))
+            yield parser, item
+
+
+def _discover_jobs(
+    conn: duckdb.DuckDBPyConnection,
+    files: Iterable[tuple[SessionParser, DiscoveredFile]],
+    states: dict[str, SessionState],
+    quarantine: dict[str, FailedFile],
+    full: bool,
+    jobs: Channel[IndexJob],
+    result: DiscoveryResult,
+    stats: StageStats,
+    stop: threading.Event,
+    resumed: frozenset[str],
+) -> None:
+    """Diff discovered files against stored state and queue the changed ones."""
+    started = time.perf_counter()
+    now = naive_utc(datetime.now(UTC))
+    try:
+        for parser, item in files:
+            if stop.is_set():
+                break
+            result.total += 1
+            stats.items += 1
+            path = str(item.path)
+            state = states.pop(path, None)
+            if state is None and is_compressed(item.path):
+                original = session_name(path)
+                if os.path.exists(original):
+                    # Both share a session id; the uncompressed file is indexed.
+                    result.skipped += 1
+                    logger.info("skip %s, archive of %s", item.path, original)
+                    continue
+                # Compressed in place: the archive takes over the original's session.
+                state = states.pop(original, None)
+            failure = quarantine.get(path)
+            if failure is not None:
+                if _is_quarantined(failure, item, now):
+                    result.quarantined += 1
+                    logger.info("skip failed %s until %s", item.path, failure.retry_after)
+                    continue
+                result.retried.append(path)
+            checkpoint = None
+            if state is not None and (not full or state.id in resumed):
+                if _is_unchanged(state, item):
+                    result.skipped += 1
+                    logger.info("skip unchanged %s", item.path)
+                    continue
+                try:
+                    if _is_same_content(state, item):
+                        result.skipped += 1
+                        result.retimed[state.id] = item.mtime
+                        logger.info("skip touched %s (content unchanged)", item.path)
+                        continue
+                    checkpoint = _append_checkpoint(conn, item, state)
+                except Exception as err:
+                    result.failures.append(
+                        FileFailure(parser.source.value, path, item.mtime, item.size, str(err))
+                    )
+                    logger.error("failed to index %s: %s", item.path, err)
+                    continue
+            start = checkpoint.byte_offset if checkpoint is not None else 0
+            job = IndexJob(
+                parser=parser,
+                path=item.path,
+                checkpoint=checkpoint,
+                is_new=state is None,
+                size=item.size - start,
+                mtime=item.mtime,
+                file_size=item.size,
+            )
+            stats.bytes += job.size
+            if expanded_size(item.path, job.size) >= STREAM_MIN_BYTES:
+                result.streamed.append(job)
+            else:
+                jobs.put(job, stats)
+    finally:
+        stats.busy_seconds = time.perf_counter() - started - stats.blocked_seconds
+
+
+def _parse_stage(
+    jobs: Channel[IndexJob],
+    outcomes: Channel[ParseOutcome],
+    workers: int,
+    stats: StageStats,
+    stop: threading.Event,
+) -> None:
+    for outcome in _parse_sessions(_until_stopped(jobs.drain(stats), stop), workers):
+        stats.items += 1
+        stats.bytes += outcome.job.size
+        # Summed over workers, so with a pool this exceeds the wall time.
+        stats.busy_seconds += outcome.seconds
+        outcomes.put(outcome, stats)
+
+
+def _write_stage(
+    conn: duckdb.DuckDBPyConnection,
+    config: AppConfig,
+    outcomes: Channel[ParseOutcome],
+    discovery: DiscoveryResult,
+    stats: StageStats,
+    profile: IndexProfile,
+    deadline: float | None,
+    stop: threading.Event,
+    progress: ReindexProgress | None,
+) -> tuple[int, list[FileFailure]]:
+    """Drain parsed sessions into DuckDB; returns the indexed count and the failures."""
+    started = time.perf_counter()
+    try:
+        return _write_outcomes(
+            conn,
+            config,
+            outcomes.drain(stats),
+            discovery,
+            stats,
+            profile,
+            deadline,
+            stop,
+            progress,
+        )
+    finally:
+        stats.busy_seconds = time.perf_counter() - started - stats.starved_seconds
+
+
+def _write_outcomes(
+    conn: duckdb.DuckDBPyConnection,
+    config: AppConfig,
+    outcomes: Iterable[ParseOutcome],
+    discovery: DiscoveryResult,
+    stats: StageStats,
+    profile: IndexProfile,
+    deadline: float | None,
+    stop: threading.Event,
+    progress: ReindexProgress | None,
+) -> tuple[int, list[FileFailure]]:
+    indexed = 0
+    failures: list[FileFailure] = []
+    batch = ColumnBatch()
+    batch_bytes = 0
+    # Sessions whose rows may have changed; only these are re-tokenized for search.
+    touched: list[str] = []
+    for outcome in outcomes:
+        # Past the deadline, sessions still in flight are dropped; the
+        # upstream stages see stop and wind down.
+        if stop.is_set() or _is_past(deadline):
+            stop.set()
+            continue
+        path = outcome.job.path
+        if outcome.session is None:
+            failures.append(_job_failure(outcome.job, outcome.error or "parse failed"))
+            logger.error("failed to index %s: %s", path, outcome.error)
+            continue
+        source = outcome.job.parser.source.value
+        profile.add_phase("decode", outcome.decode_seconds)
+        profile.add_phase("build", outcome.seconds - outcome.decode_seconds)
+        profile.add_bash_cache(outcome.bash_cache_hits, outcome.bash_cache_misses)
+        profile.add_file(source, str(path), outcome.job.size, outcome.seconds)
+        touched.append(outcome.session.id)
+        if outcome.columns is not None:
+            batch.add_columns(outcome.session, outcome.columns, replaces=not outcome.job.is_new)
+            batch_bytes += outcome.job.size
+            if len(batch) >= BATCH_MAX_SESSIONS or batch.row_count >= BATCH_MAX_ROWS:
+                with profile.timed("write"):
+                    written, errors, rows = _flush_batch(conn, batch)
+                indexed += written
+                failures.extend(errors)
+                profile.rows_inserted += rows
+                stats.items += written
+                stats.bytes += batch_bytes
+                if progress is not None:
+                    progress.committed(conn, written)
+                batch = ColumnBatch()
+                batch_bytes = 0
+            continue
+        try:
+            with profile.timed("write"):
+                appended, rows = _write_outcome(conn, outcome.job, outcome.session)
+            logger.info("%s %s", "appended" if appended else "indexed", path)
+            indexed += 1
+            profile.rows_inserted += rows
+            stats.items += 1
+            stats.bytes += outcome.job.size
+            if progress is not None:
+                progress.committed(conn, 1)
+        except Exception as err:
+            failures.append(_job_failure(outcome.job, str(err)))
+            logger.error("failed to index %s: %s", path, err)
+    with profile.timed("write"):
+        written, errors, rows = _flush_batch(conn, batch)
+    indexed += written
+    failures.extend(errors)
+    profile.rows_inserted += rows
+    stats.items += written
+    stats.bytes += batch_bytes
+    if progress is not None:
+        progress.committed(conn, written)
+    # Large files are parsed in this thread and written chunk by chunk once
+    # discovery has finished.
+    for job in discovery.streamed:
+        if stop.is_set() or _is_past(deadline):
+            stop.set()
+            break
+        job_started = time.perf_counter()
+        cache_before = BASH_COMMAND_CACHE.stats()
+        try:
+            with profile.timed("stream"):
+                session_id, appended, rows = _write_streamed(conn, job)
+        except Exception as err:
+            failures.append(_job_failure(job, str(err)))
+            logger.error("failed to index %s: %s", job.path, err)
+            continue
+        cache_after = BASH_COMMAND_CACHE.stats()
+        profile.add_bash_cache(
+            cache_after.hits - cache_before.hits, cache_after.misses - cache_before.misses
+        )
+        touched.append(session_id)
+        indexed += 1
+        profile.rows_inserted += rows
+        profile.add_file(
+            job.parser.source.value, str(job.path), job.size, time.perf_counter() - job_started
+        )
+        stats.items += 1
+        stats.bytes += job.size
+        if progress is not None:
+            progress.committed(conn, 1)
+        logger.info("%s %s", "appended" if appended else "indexed", job.path)
+    with profile.timed("write"):
+        update_session_mtimes(conn, discovery.retimed)
+    if progress is not None:
+        # Sessions written before an interruption never got their postings.
+        touched.extend(progress.session_ids)
+    with profile.timed("fts"):
+        update_fts_index(conn, config.fts, touched)
+    return indexed, failures
+
+
+def _until_stopped(jobs: Iterable[IndexJob], stop: threading.Event) -> Iterator[IndexJob]:
+    # Keeps draining after stop so the discover stage is never left blocked.
+    for job in jobs:
+        if not stop.is_set():
+            yield job
+
+
+def _is_past(deadline: float | None) -> bool:
+    return deadline is not None and time.perf_counter() >= deadline
+
+
+def _parse_sessions(jobs: Iterable[IndexJob], workers: int) -> Iterator[ParseOutcome]:
+    """Parse jobs in order, fanning out to a process pool when workers > 1."""
+    if workers <= 1:
+        for job in jobs:
+            yield _parse_job(job)
+        return
+
+    job_iter = iter(jobs)
+    first_job = next(job_iter, None)
+    if first_job is None:
+        return
+    # Spawned workers avoid forking the process that holds the DuckDB connection.
+    context = multiprocessing.get_context("spawn")
+    executor = ProcessPoolExecutor(max_workers=workers, mp_context=context)
+    try:
+        in_flight: deque[Future[ParseOutcome]] = deque([executor.submit(_parse_job, first_job)])
+        backlog = workers * PARSE_BACKLOG_PER_WORKER
+        for job in job_iter:
+            in_flight.append(executor.submit(_parse_job, job))
+            if len(in_flight) >= backlog:
+                break
+        while in_flight:
+            outcome = in_flight.popleft().result()
+            next_job = next(job_iter, None)
+            if next_job is not None:
+                in_flight.append(executor.submit(_parse_job, next_job))
+            yield outcome
+    finally:
+        # Queued jobs are dropped when the pipeline is cancelled.
+        executor.shutdown(cancel_futures=True)
+
+
+def _parse_job(job: IndexJob) -> ParseOutcome:
+    started = time.perf_counter()
+    cache_before = BASH_COMMAND_CACHE.stats()
+    try:
+        stream = job.parser.stream(job.path, job.checkpoint)
+        if job.checkpoint is not None:
+            # Appends may fall back to a full reparse, which needs the records.
+            session = stream.collect()
+            columns = None
+        else:
+            columns = SessionColumns()
+            session = stream.collect_rows(columns)
+        cache_after = BASH_COMMAND_CACHE.stats()
+        return ParseOutcome(
+            job=job,
+            session=session,
+            error=None,
+            columns=columns,
+            seconds=time.perf_counter() - started,
+            decode_seconds=stream.reader.decode_seconds,
+            bash_cache_hits=cache_after.hits - cache_before.hits,
+            bash_cache_misses=cache_after.misses - cache_before.misses,
+        )
+    except Exception as err:
+        return ParseOutcome(
+            job=job, session=None, error=str(err), seconds=time.perf_counter() - started
+        )
+
+
+def _is_unchanged(state: SessionState, item: DiscoveredFile) -> bool:
+    return state.file_mtime == item.mtime and state.file_size == item.size
+
+
+def _is_same_content(state: SessionState, item: DiscoveredFile) -> bool:
+    # Only the mtime differs when the size and head/tail fingerprint match.
+    return (
+        state.content_digest is not None
+        and state.file_size == item.size
+        and content_digest(item.path, item.size) == state.content_digest
+    )
+
+
+def _is_quarantined(failure: FailedFile, item: DiscoveredFile, now: datetime) -> bool:
+    unchanged = failure.file_mtime == item.mtime and failure.file_size == item.size
+    return unchanged and now < failure.retry_after
+
+
+def _job_failure(job: IndexJob, error: str) -> FileFailure:
+    return FileFailure(job.parser.source.value, str(job.path), job.mtime, job.file_size, error)
+
+
+def _update_failed_files(
+    conn: duckdb.DuckDBPyConnection,
+    previous: dict[str, FailedFile],
+    retried: list[str],
+    failures: list[FileFailure],
+) -> None:
+    """Record this run's failures and forget retried files that now indexed."""
+    now = naive_utc(datetime.now(UTC))
+    failed_paths = {failure.path for failure in failures}
+    delete_failed_files(conn, [path for path in retried if path not in failed_paths])
+    records = []
+    for failure in failures:
+        earlier = previous.get(failure.path)
+        attempts = earlier.attempts + 1 if earlier is not None else 1
+        backoff = min(FAILURE_BACKOFF * 2 ** (attempts - 1), FAILURE_BACKOFF_MAX)
+        records.append(
+            FailedFile(
+                source_path=failure.path,
+                source=failure.source,
+                file_mtime=failure.mtime,
+                file_size=failure.size,
+                error=failure.error,
+                attempts=attempts,
+                failed_at=now,
+                retry_after=now + backoff,
+            )
+        )
+    record_failed_files(conn, records)
+
+
+def _append_checkpoint(
+    conn: duckdb.DuckDBPyConnection, item: DiscoveredFile, state: SessionState
+) -> ParseCheckpoint | None:
+    if state.byte_offset is None or item.size < state.byte_offset:
+        return None
+    if prefix_digest(item.path, state.byte_offset) != state.prefix_digest:
+        return None
+    parser_state = fetch_parser_state(conn, state.id)
+    if parser_state is None:
+        return None
+    return ParseCheckpoint(byte_offset=state.byte_offset, state=parser_state)
+
+
+def _write_outcome(
+    conn: duckdb.DuckDBPyConnection, job: IndexJob, session: SessionRecord
+) -> tuple[bool, int]:
+    """Persist a parsed session.
+
+    Returns whether only the new tail was appended and the number of rows inserted.
+    """
+    if job.checkpoint is None:
+        _write_session(conn, session)
+        return False, _row_count(session)
+    if _can_append(job.checkpoint, session):
+        _append_session(conn, session)
+        return True, _row_count(session)
+    return False, _rewrite_file(conn, replace(job, checkpoint=None))
+
+
+def _rewrite_file(conn: duckdb.DuckDBPyConnection, job: IndexJob) -> int:
+    """Parse a whole file again and replace its session; returns the rows inserted."""
+    # The job may have been routed by a small appended tail or a batch, so a
+    # large file is streamed here rather than loaded into memory.
+    if expanded_size(job.path, job.file_size) >= STREAM_MIN_BYTES:
+        _, _, rows = _write_streamed(conn, job)
+        return rows
+    session = job.parser.parse(job.path)
+    _write_session(conn, session)
+    return _row_count(session)
+
+
+def _can_append(checkpoint: ParseCheckpoint, session: SessionRecord) -> bool:
+    # Indexed session columns cannot be updated in place while child rows exist.
+    previous = ParseState.from_dict(checkpoint.state)
+    return (previous.started_at, previous.cwd, previous.git_repo) == (
+        session.started_at,
+        session.cwd,
+        session.git_repo,
+    )
+
+
+def _append_session(conn: duckdb.DuckDBPyConnection, session: SessionRecord) -> None:
+    conn.execute("BEGIN")
+    try:
+        update_appended_session(conn, session)
+        insert_messages(conn, session.messages)
+        insert_tool_calls(conn, _collect_tool_calls(session))
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+
+def _write_streamed(conn: duckdb.DuckDBPyConnection, job: IndexJob) -> tuple[str, bool, int]:
+    """Stage a large file's rows chunk by chunk, then move them in one transaction.
+
+    Returns the session id, whether only the new tail was appended and the
+    number of rows inserted.
+    """
+    stream = job.parser.stream(job.path, job.checkpoint)
+    # The session row itself.
+    rows = 1
+    with staged_rows(conn, "stream") as staged:
+        # One transaction for all chunks avoids a WAL commit (and checkpoints) per chunk.
+        conn.execute("BEGIN")
+        try:
+            for chunk in stream.chunks(STREAM_CHUNK_ROWS):
+                tool_calls = [call for message in chunk.messages for call in message.tool_calls]
+                tool_calls.extend(chunk.orphan_tool_calls)
+                stage_rows(conn, staged, chunk.messages, tool_calls)
+                rows += chunk.row_count
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        session = stream.finalize()
+        if job.checkpoint is None:
+            _replace_with_staged(conn, session, staged, replaces=not job.is_new)
+            return session.id, False, rows
+        if _can_append(job.checkpoint, session):
+            conn.execute("BEGIN")
+            try:
+                update_appended_session(conn, session)
+                insert_staged_rows(conn, staged)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            return session.id, True, rows
+    session_id, _, rows = _write_streamed(conn, replace(job, checkpoint=None))
+    return session_id, False, rows
+
 
+def _replace_with_staged(
+    conn: duckdb.DuckDBPyConnection, session: SessionRecord, staged: StagedRows, *, replaces: bool
+) -> None:
+    # Same DuckDB FK limitation as _write_session_duckdb_compatible, but the
+    # previous rows are snapshotted into scratch tables instead of memory.
+    with staged_rows(conn, "previous") as previous:
+        if replaces:
+            stage_session_rows(conn, previous, session.id)
+            delete_session(conn, session.id)
+        conn.execute("BEGIN")
+        try:
+            insert_session(conn, session)
+            insert_staged_rows(conn, staged)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            if replaces:
+                insert_staged_rows(conn, previous)
+            raise
 
-def _is_unchanged(conn: duckdb.DuckDBPyConnection, path: Path) -> bool:
-    state = fetch_session_state(conn, str(path.expanduser().resolve()))
-    if state is None:
-        return False
-    _, stored_mtime, stored_size = state
-    stat = path.stat()
-    return stored_mtime == stat.st_mtime and stored_size == stat.st_size
 
+def _flush_batch(
+    conn: duckdb.DuckDBPyConnection, batch: ColumnBatch
+) -> tuple[int, list[FileFailure], int]:
+    """Write a batch of parsed sessions; returns (indexed, failures, rows inserted)."""
+    if not batch:
+        return 0, [], 0
+    # Same DuckDB FK limitation as _write_session_duckdb_compatible: replaced
+    # sessions are deleted set-based in autocommit mode after a snapshot, and
+    # all inserts of the batch share one transaction.
+    previous_rows = None
+    if batch.replaced_ids:
+        previous_rows = _load_persisted_batch_rows(conn, batch.replaced_ids)
+        delete_sessions(conn, batch.replaced_ids)
 
-def _write_session(conn: duckdb.DuckDBPyConnection, session: Session) -> None:
+    conn.execute("BEGIN")
+    try:
+        insert_column_batch(conn, batch)
+        conn.execute("COMMIT")
+    except Exception as err:
+        conn.execute("ROLLBACK")
+        if previous_rows is not None:
+            _restore_persisted_batch_rows(conn, previous_rows)
+        logger.warning(
+            "batch write of %d sessions failed, retrying one by one: %s", len(batch), err
+        )
+        return _write_sessions_individually(conn, batch.sessions)
+    for session in batch.sessions:
+        logger.info("indexed %s", session.source_path)
+    return len(batch), [], batch.row_count
+
+
+def _write_sessions_individually(
+    conn: duckdb.DuckDBPyConnection, sessions: list[SessionRecord]
+) -> tuple[int, list[FileFailure], int]:
+    indexed = 0
+    failures: list[FileFailure] = []
+    rows = 0
+    # Batched sessions were parsed in columnar mode and their rows only exist
+    # in the failed batch, so each file is parsed again.
+    for session in sessions:
+        try:
+            job = IndexJob(
+                get_parser(session.source),
+                Path(session.source_path),
+                size=session.file_size,
+                mtime=session.file_mtime,
+                file_size=session.file_size,
+            )
+            rows += _rewrite_file(conn, job)
+            indexed += 1
+            logger.info("indexed %s", session.source_path)
+        except Exception as err:
+            failures.append(
+                FileFailure(
+                    session.source.value,
+                    session.source_path,
+                    session.file_mtime,
+                    session.file_size,
+                    str(err),
+                )
+            )
+            logger.error("failed to index %s: %s", session.source_path, err)
+    return indexed, failures, rows
+
+
+def _load_persisted_batch_rows(
+    conn: duckdb.DuckDBPyConnection, session_ids: list[str]
+) -> PersistedBatchRows:
+    with registered_ids(conn, session_ids) as ids:
+        sessions = conn.execute(
+            f"SELECT {', '.join(SESSION_SCHEMA.names)} FROM sessions "
+            f"WHERE id IN (SELECT id FROM {ids})"
+        ).to_arrow_table()
+        messages = conn.execute(
+            f"SELECT {', '.join(MESSAGE_SCHEMA.names)} FROM messages "
+            f"WHERE session_id IN (SELECT id FROM {ids})"
+        ).to_arrow_table()
+        tool_calls = conn.execute(
+            f"SELECT {', '.join(TOOL_CALL_SCHEMA.names)} FROM tool_calls "
+            f"WHERE session_id IN (SELECT id FROM {ids})"
+        ).to_arrow_table()
+        bash_segments = conn.execute(
+            f"SELECT {', '.join(BASH_SEGMENT_SCHEMA.names)} FROM bash_segments "
+            f"WHERE session_id IN (SELECT id FROM {ids})"
+        ).to_arrow_table()
+    return PersistedBatchRows(
+        sessions=sessions, messages=messages, tool_calls=tool_calls, bash_segments=bash_segments
+    )
+
+
+def _restore_persisted_batch_rows(
+    conn: duckdb.DuckDBPyConnection, rows: PersistedBatchRows
+) -> None:
+    conn.execute("BEGIN")
+    try:
+        insert_arrow_table(conn, "sessions", rows.sessions)
+        insert_arrow_table(conn, "messages", rows.messages)
+        insert_arrow_table(conn, "tool_calls", rows.tool_calls)
+        insert_arrow_table(conn, "bash_segments", rows.bash_segments)
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+
+def _write_session(conn: duckdb.DuckDBPyConnection, session: SessionRecord) -> None:
     try:
         _write_session_transactional(conn, session)
     except Exception as err:
@@ -114,7 +1095,7 @@ def _write_session(conn: duckdb.DuckDBPyConnection, session: Session) -> None:
         _write_session_duckdb_compatible(conn, session)
 
 
-def _write_session_transactional(conn: duckdb.DuckDBPyConnection, session: Session) -> None:
+def _write_session_transactional(conn: duckdb.DuckDBPyConnection, session: SessionRecord) -> None:
     conn.execute("BEGIN")
     try:
         delete_session(conn, session.id)
@@ -128,7 +1109,9 @@ def _write_session_transactional(conn: duckdb.DuckDBPyConnection, session: Sessi
         raise
 
 
-def _write_session_duckdb_compatible(conn: duckdb.DuckDBPyConnection, session: Session) -> None:
+def _write_session_duckdb_compatible(
+    conn: duckdb.DuckDBPyConnection, session: SessionRecord
+) -> None:
     # DuckDB currently fails FK checks for delete-then-parent-delete sequences
     # when performed inside one explicit transaction. Keep deletes in autocommit
     # mode and wrap inserts in a transaction. Snapshot existing rows so a failed
@@ -161,7 +1144,8 @@ def _load_persisted_session_rows(
             started_at, ended_at, duration_seconds,
             model, cwd, git_repo, git_branch,
             message_count, tool_count, input_tokens, output_tokens,
-            is_complete, file_mtime, file_size, indexed_at
+            is_complete, file_mtime, file_size, indexed_at,
+            byte_offset, prefix_digest, parser_state, content_digest
         FROM sessions
         WHERE id = ?
         """,
@@ -192,11 +1176,20 @@ def _load_persisted_session_rows(
         """,
         [session_id],
     ).fetchall()
+    bash_segment_rows = conn.execute(
+        """
+        SELECT tool_call_id, session_id, idx, base, sub, argv
+        FROM bash_segments
+        WHERE session_id = ?
+        """,
+        [session_id],
+    ).fetchall()
 
     return PersistedSessionRows(
         session_row=tuple(session_row),
         message_rows=[tuple(row) for row in message_rows],
         tool_call_rows=[tuple(row) for row in tool_call_rows],
+        bash_segment_rows=[tuple(row) for row in bash_segment_rows],
     )
 
 
@@ -212,12 +1205,14 @@ def _restore_persisted_session_rows(
                 started_at, ended_at, duration_seconds,
                 model, cwd, git_repo, git_branch,
                 message_count, tool_count, input_tokens, output_tokens,
-                is_complete, file_mtime, file_size, indexed_at
+                is_complete, file_mtime, file_size, indexed_at,
+                byte_offset, prefix_digest, parser_state, content_digest
             ) VALUES (
                 ?, ?, ?, ?,
                 ?, ?, ?,
                 ?, ?, ?, ?,
                 ?, ?, ?, ?,
+                ?, ?, ?, ?,
                 ?, ?, ?, ?
             )
             """,
@@ -244,6 +1239,14 @@ def _restore_persisted_session_rows(
                 """,
                 rows.tool_call_rows,
             )
+        if rows.bash_segment_rows:
+            conn.executemany(
+                """
+                INSERT INTO bash_segments (tool_call_id, session_id, idx, base, sub, argv)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                rows.bash_segment_rows,
+            )
         conn.execute("COMMIT")
     except Exception:
         conn.execute("ROLLBACK")
@@ -259,8 +1262,14 @@ def _is_duckdb_fk_delete_limitation(err: Exception) -> bool:
     )
 
 
-def _collect_tool_calls(session: Session) -> Iterable[ToolCall]:
-    tool_calls: list[ToolCall] = []
+def _row_count(session: SessionRecord) -> int:
+    """Rows written for a session: itself, its messages and their tool calls."""
+    tool_calls = sum(len(message.tool_calls) for message in session.messages)
+    return 1 + len(session.messages) + tool_calls + len(session.orphan_tool_calls)
+
+
+def _collect_tool_calls(session: SessionRecord) -> Iterable[ToolCallRecord]:
+    tool_calls: list[ToolCallRecord] = []
     for message in session.messages:
         tool_calls.extend(message.tool_calls)
     tool_calls.extend(session.orphan_tool_calls)
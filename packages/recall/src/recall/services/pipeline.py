@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import contextlib
+import queue
+import threading
+import time
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass
+from typing import cast
+
+# How often blocked stages re-check whether the pipeline was cancelled.
+CANCEL_POLL_SECONDS = 0.1
+
+_END = object()
+
+
+class PipelineCancelled(Exception):
+    pass
+
+
+@dataclass
+class StageStats:
+    """Throughput counters of one pipeline stage.
+
+    busy_seconds is time spent working; starved_seconds waiting for input and
+    blocked_seconds waiting for the next stage to make room. The bottleneck
+    is the stage that is busy while its neighbours are starved or blocked.
+    """
+
+    name: str
+    items: int = 0
+    bytes: int = 0
+    busy_seconds: float = 0.0
+    starved_seconds: float = 0.0
+    blocked_seconds: float = 0.0
+
+    @property
+    def items_per_second(self) -> float:
+        return self.items / self.busy_seconds if self.busy_seconds else 0.0
+
+    @property
+    def megabytes_per_second(self) -> float:
+        return self.bytes / 1_000_000 / self.busy_seconds if self.busy_seconds else 0.0
+
+    def describe(self) -> str:
+        return (
+            f"{self.name}: {self.items} items, {self.bytes / 1_000_000:.1f} MB, "
+            f"busy {self.busy_seconds:.2f}s ({self.items_per_second:.1f}/s, "
+            f"{self.megabytes_per_second:.1f} MB/s), starved {self.starved_seconds:.2f}s, "
+            f"blocked {self.blocked_seconds:.2f}s"
+        )
+
+
+class Channel[T]:
+    """Bounded hand-off between two stages; a full channel blocks the producer."""
+
+    def __init__(self, maxsize: int, cancelled: threading.Event) -> None:
+        self._queue: queue.Queue[object] = queue.Queue(maxsize)
+        self._cancelled = cancelled
+
+    def put(self, item: T, stats: StageStats) -> None:
+        started = time.perf_counter()
+        self._put(item)
+        stats.blocked_seconds += time.perf_counter() - started
+
+    def close(self) -> None:
+        with contextlib.suppress(PipelineCancelled):
+            self._put(_END)
+
+    def drain(self, stats: StageStats) -> Iterator[T]:
+        while True:
+            started = time.perf_counter()
+            item = self._get()
+            stats.starved_seconds += time.perf_counter() - started
+            if item is _END:
+                return
+            yield cast(T, item)
+
+    def _put(self, item: object) -> None:
+        while True:
+            if self._cancelled.is_set():
+                raise PipelineCancelled
+            try:
+                self._queue.put(item, timeout=CANCEL_POLL_SECONDS)
+                return
+            except queue.Full:
+                continue
+
+    def _get(self) -> object:
+        while True:
+            if self._cancelled.is_set():
+                raise PipelineCancelled
+            try:
+                return self._queue.get(timeout=CANCEL_POLL_SECONDS)
+            except queue.Empty:
+                continue
+
+
+class StageThread(threading.Thread):
+    """Run a producing stage in a thread and close its output when it ends."""
+
+    def __init__(
+        self,
+        name: str,
+        target: Callable[[], None],
+        output: Channel,
+        cancelled: threading.Event,
+    ) -> None:
+        super().__init__(name=f"recall-{name}", daemon=True)
+        self._target_fn = target
+        self._output = output
+        self._cancelled = cancelled
+        self.error: BaseException | None = None
+
+    def run(self) -> None:
+        try:
+            self._target_fn()
+        except PipelineCancelled:
+            pass
+        except BaseException as err:
+            self.error = err
+            self._cancelled.set()
+        finally:
+            self._output.close()
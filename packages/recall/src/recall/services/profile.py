@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import heapq
+import time
+from collections.abc import Generator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+# Slowest files kept in the profile.
+SLOWEST_FILES = 10
+
+# Phases in report order. decode is JSON decoding inside the parsers; build is
+# the rest of parsing (reading lines, constructing models); stream covers large
+# files parsed and written chunk by chunk.
+PHASES = ("discover", "decode", "build", "write", "stream", "fts")
+
+
+@dataclass
+class SourceProfile:
+    sessions: int = 0
+    bytes: int = 0
+    # Parse time; summed over workers when parsing in a process pool.
+    seconds: float = 0.0
+    sessions_per_second: float = 0.0
+    megabytes_per_second: float = 0.0
+
+    def add(self, size: int, seconds: float) -> None:
+        self.sessions += 1
+        self.bytes += size
+        self.seconds += seconds
+        if self.seconds:
+            self.sessions_per_second = self.sessions / self.seconds
+            self.megabytes_per_second = self.bytes / 1_000_000 / self.seconds
+
+
+@dataclass(frozen=True, order=True)
+class FileTiming:
+    seconds: float
+    path: str
+    source: str
+    bytes: int
+
+
+@dataclass
+class IndexProfile:
+    """Cumulative timings and volumes of one index run.
+
+    Filled by the writer thread (and the discover stage's busy time once it
+    finished), so no locking is needed.
+    """
+
+    phases: dict[str, float] = field(default_factory=lambda: dict.fromkeys(PHASES, 0.0))
+    bytes_read: int = 0
+    rows_inserted: int = 0
+    # Lookups in the bash command cache while parsing, summed over workers.
+    bash_cache_hits: int = 0
+    bash_cache_misses: int = 0
+    wall_seconds: float = 0.0
+    sources: dict[str, SourceProfile] = field(default_factory=dict)
+    slowest: list[FileTiming] = field(default_factory=list)
+
+    def add_phase(self, name: str, seconds: float) -> None:
+        self.phases[name] += seconds
+
+    @contextmanager
+    def timed(self, phase: str) -> Generator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[phase] += time.perf_counter() - started
+
+    def add_bash_cache(self, hits: int, misses: int) -> None:
+        self.bash_cache_hits += hits
+        self.bash_cache_misses += misses
+
+    def add_file(self, source: str, path: str, size: int, seconds: float) -> None:
+        """Record the bytes and processing time of one indexed file."""
+        self.bytes_read += size
+        self.sources.setdefault(source, SourceProfile()).add(size, seconds)
+        timing = FileTiming(seconds=seconds, path=path, source=source, bytes=size)
+        if len(self.slowest) < SLOWEST_FILES:
+            heapq.heappush(self.slowest, timing)
+        else:
+            heapq.heappushpop(self.slowest, timing)
+
+    def finish(self, wall_seconds: float) -> None:
+        self.wall_seconds = wall_seconds
+        self.slowest.sort(reverse=True)
+
+    def report(self) -> list[str]:
+        lines = [f"wall time {self.wall_seconds:.2f}s"]
+        lines.append("phases:")
+        for name, seconds in self.phases.items():
+            lines.append(f"  {name:<8} {seconds:8.2f}s")
+        megabytes = self.bytes_read / 1_000_000
+        lines.append(f"read {megabytes:.1f} MB, inserted {self.rows_inserted} rows")
+        lookups = self.bash_cache_hits + self.bash_cache_misses
+        if lookups:
+            lines.append(
+                f"bash cache {self.bash_cache_hits} hits, {self.bash_cache_misses} misses "
+                f"({self.bash_cache_hits / lookups:.0%} hit rate)"
+            )
+        if self.sources:
+            lines.append("sources:")
+            for source, stats in sorted(self.sources.items()):
+                megabytes = stats.bytes / 1_000_000
+                lines.append(
+                    f"  {source:<12} {stats.sessions:6d} sessions {megabytes:8.1f} MB "
+                    f"{stats.sessions_per_second:8.1f} sessions/s "
+                    f"{stats.megabytes_per_second:6.1f} MB/s"
+                )
+        if self.slowest:
+            lines.append(f"slowest {len(self.slowest)} files:")
+            for timing in self.slowest:
+                lines.append(
+                    f"  {timing.seconds:7.3f}s {timing.bytes / 1_000_000:7.1f} MB  {timing.path}"
+                )
+        return lines
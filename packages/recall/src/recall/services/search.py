@@ -7,7 +7,7 @@ import duckdb
 
 from recall.core.config import AppConfig
 from recall.core.types import Source
-from recall.db import connect, load_fts_extension
+from recall.db import bm25_scores_sql, connect, indexed_fts_fields, load_fts_extension
 
 
 @dataclass(frozen=True)
@@ -37,6 +37,8 @@ def search(
     config = AppConfig.load()
     conn = connect(config)
     try:
+        if not set(config.fts.fields) <= set(indexed_fts_fields(conn)):
+            raise RuntimeError("search failed: run `recall index` to create FTS indexes")
         load_fts_extension(conn)
         if tool:
             return _search_tool_calls(conn, query, source, tool, limit)
@@ -71,31 +73,28 @@ def _search_messages(
     limit: int,
     fields: list[str],
 ) -> list[SearchResult]:
-    fields_value = ",".join(fields)
     where_clause = ""
-    params: list[object] = [query, fields_value]
+    params: list[object] = [query]
     if source is not None:
         where_clause = "WHERE s.source = ?"
         params.append(source.value)
 
     sql = f"""
-        WITH ranked AS (
-            SELECT
-                m.id AS message_id,
-                m.session_id,
-                m.role,
-                m.content,
-                m.thinking,
-                m.timestamp,
-                s.source,
-                s.source_path,
-                fts_main_messages.match_bm25(m.id, ?, fields := ?) AS score
-            FROM messages m
-            JOIN sessions s ON s.id = m.session_id
-            {where_clause}
-        )
-        SELECT * FROM ranked
-        WHERE score IS NOT NULL
+        WITH scores AS ({bm25_scores_sql(fields)})
+        SELECT
+            m.id AS message_id,
+            m.session_id,
+            m.role,
+            m.content,
+            m.thinking,
+            m.timestamp,
+            s.source,
+            s.source_path,
+            scores.score
+        FROM scores
+        JOIN messages m ON m.id = scores.doc_id
+        JOIN sessions s ON s.id = m.session_id
+        {where_clause}
         ORDER BY score DESC
         LIMIT {limit}
     """
@@ -138,22 +137,20 @@ def _search_tool_calls(
     where_clause = f"WHERE {' AND '.join(where_parts)}" if where_parts else ""
 
     sql = f"""
-        WITH ranked AS (
-            SELECT
-                tc.id AS tool_call_id,
-                tc.session_id,
-                tc.message_id,
-                tc.tool_name,
-                tc.bash_command,
-                s.source,
-                s.source_path,
-                fts_main_tool_calls.match_bm25(tc.id, ?, fields := 'bash_command') AS score
-            FROM tool_calls tc
-            JOIN sessions s ON s.id = tc.session_id
-            {where_clause}
-        )
-        SELECT * FROM ranked
-        WHERE score IS NOT NULL
+        WITH scores AS ({bm25_scores_sql(["bash"])})
+        SELECT
+            tc.id AS tool_call_id,
+            tc.session_id,
+            tc.message_id,
+            tc.tool_name,
+            tc.bash_command,
+            s.source,
+            s.source_path,
+            scores.score
+        FROM scores
+        JOIN tool_calls tc ON tc.id = scores.doc_id
+        JOIN sessions s ON s.id = tc.session_id
+        {where_clause}
         ORDER BY score DESC
         LIMIT {limit}
     """
@@ -6,6 +6,7 @@ from typing import Any
 
 from recall.core.config import AppConfig
 from recall.core.models import Message, Session, ToolCall
+from recall.core.time import naive_utc
 from recall.core.types import Role, Source
 from recall.db import connect
 
@@ -41,7 +42,7 @@ def list_sessions(
             params.append(source.value)
         if since is not None:
             where_parts.append("COALESCE(started_at, indexed_at) >= ?")
-            params.append(since)
+            params.append(naive_utc(since))
         if project:
             where_parts.append("git_repo ILIKE ?")
             params.append(f"%{project}%")
@@ -0,0 +1,352 @@
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import errno
+import logging
+import os
+import select
+import struct
+import time
+from collections.abc import Callable, Iterable
+from pathlib import Path
+from typing import Protocol
+
+import duckdb
+
+from recall.core.config import AppConfig
+from recall.core.types import Source
+from recall.db import advisory_lock, connect, fetch_session_state, fetch_session_states
+from recall.parsers import (
+    DirectoryCache,
+    DiscoveredFile,
+    SessionParser,
+    all_parsers,
+    get_parser,
+    iter_files,
+    session_name,
+)
+from recall.services.indexer import IndexSummary, index_files
+
+logger = logging.getLogger("recall.watcher")
+
+# Quiet period after the last change before touched files are indexed.
+DEFAULT_DEBOUNCE_SECONDS = 1.0
+# Rescan interval of the polling fallback; also bounds how long a wait blocks.
+DEFAULT_POLL_INTERVAL_SECONDS = 5.0
+# Files written continuously are still indexed at least this often.
+MAX_DELAY_SECONDS = 10.0
+# DuckDB allows one writing process, so the connection is released after this
+# long without changes to let `recall search` and friends open the database.
+IDLE_RELEASE_SECONDS = 5.0
+
+# inotify(7) event masks.
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+EVENT_HEADER = struct.Struct("iIII")
+
+
+class FileWatcher(Protocol):
+    def wait(self, timeout: float) -> set[Path]:
+        """Block up to timeout seconds; return paths of files that may have changed."""
+        ...
+
+    def close(self) -> None: ...
+
+
+class InotifyWatcher:
+    """Recursive inotify watch over the session roots (Linux only).
+
+    A root whose directories cannot all be watched once the watch limit is
+    reached is polled instead.
+    """
+
+    def __init__(
+        self, parsers: Iterable[SessionParser], roots: Iterable[Path], poll_interval: float
+    ) -> None:
+        libc_name = ctypes.util.find_library("c") or "libc.so.6"
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        if not hasattr(self._libc, "inotify_init1"):
+            raise OSError("inotify is not available")
+        fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, os.strerror(error))
+        self._fd = fd
+        self._directories: dict[int, Path] = {}
+        self._parsers = dict(zip(roots, parsers, strict=True))
+        self._roots = list(self._parsers)
+        self._pending_roots = list(self._roots)
+        self._poll_interval = poll_interval
+        self._polled: dict[Path, PollingWatcher] = {}
+        try:
+            self._watch_new_roots(initial=True)
+        except OSError:
+            self.close()
+            raise
+
+    def wait(self, timeout: float) -> set[Path]:
+        changed = self._watch_new_roots()
+        readable, _, _ = select.select([self._fd], [], [], max(timeout, 0.0))
+        if readable:
+            changed |= self._read_events()
+        for poller in self._polled.values():
+            changed |= poller.wait(0.0)
+        return changed
+
+    def close(self) -> None:
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+        for poller in self._polled.values():
+            poller.close()
+
+    def _watch_new_roots(self, *, initial: bool = False) -> set[Path]:
+        # Roots created after startup (e.g. first Codex run) are picked up here.
+        found: set[Path] = set()
+        for root in list(self._pending_roots):
+            if root.is_dir():
+                self._pending_roots.remove(root)
+                found |= self._watch_tree(root, initial=initial)
+        return found
+
+    def _watch_tree(self, directory: Path, *, initial: bool = False) -> set[Path]:
+        """Watch directory and its subdirectories; return files already inside them.
+
+        Only the initial setup raises when a directory cannot be watched.
+        """
+        root = next(root for root in self._roots if directory.is_relative_to(root))
+        files: set[Path] = set()
+        for current, _, names in os.walk(directory, followlinks=True):
+            if root not in self._polled:
+                try:
+                    self._add_watch(Path(current))
+                except OSError as err:
+                    if initial:
+                        raise
+                    self._watch_failed(root, err)
+            files.update(Path(current) / name for name in names)
+        return files
+
+    def _watch_failed(self, root: Path, err: OSError) -> None:
+        if err.errno == errno.ENOENT:
+            # Removed again before it could be watched.
+            logger.info("%s", err)
+        elif err.errno == errno.ENOSPC:
+            logger.warning(
+                "%s (raise fs.inotify.max_user_watches), polling %s every %ss",
+                err,
+                root,
+                self._poll_interval,
+            )
+            self._polled[root] = PollingWatcher([self._parsers[root]], self._poll_interval)
+        else:
+            logger.warning("%s", err)
+
+    def _add_watch(self, directory: Path) -> None:
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), WATCH_MASK)
+        if wd < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, f"cannot watch {directory}: {os.strerror(error)}")
+        self._directories[wd] = directory
+
+    def _read_events(self) -> set[Path]:
+        changed: set[Path] = set()
+        while True:
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                return changed
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+                offset += EVENT_HEADER.size
+                name = data[offset : offset + length].rstrip(b"\0")
+                offset += length
+                if mask & IN_Q_OVERFLOW:
+                    logger.warning("inotify queue overflowed, rescanning session roots")
+                    for root in self._roots:
+                        if root.is_dir():
+                            changed |= self._watch_tree(root)
+                    continue
+                if mask & IN_IGNORED:
+                    self._directories.pop(wd, None)
+                    continue
+                directory = self._directories.get(wd)
+                if directory is None or not name:
+                    continue
+                path = directory / os.fsdecode(name)
+                if mask & IN_ISDIR:
+                    if mask & (IN_CREATE | IN_MOVED_TO):
+                        changed |= self._watch_tree(path)
+                    continue
+                changed.add(path)
+
+
+class PollingWatcher:
+    """Fallback watcher that rescans the session roots on an interval."""
+
+    def __init__(self, parsers: Iterable[SessionParser], interval: float) -> None:
+        self._parsers = list(parsers)
+        self._interval = interval
+        # Rescans only re-list directories whose entries changed.
+        self._cache = DirectoryCache()
+        self._next_scan = time.monotonic() + interval
+        self._snapshot = self._scan()
+
+    def wait(self, timeout: float) -> set[Path]:
+        now = time.monotonic()
+        if now + timeout < self._next_scan:
+            time.sleep(max(timeout, 0.0))
+            return set()
+        time.sleep(max(self._next_scan - now, 0.0))
+        self._next_scan = time.monotonic() + self._interval
+        snapshot = self._scan()
+        changed = {
+            path for path, signature in snapshot.items() if self._snapshot.get(path) != signature
+        }
+        self._snapshot = snapshot
+        return changed
+
+    def close(self) -> None:
+        self._snapshot = {}
+
+    def _scan(self) -> dict[Path, tuple[float, int]]:
+        return {
+            item.path: (item.mtime, item.size)
+            for parser in self._parsers
+            for item in iter_files(parser.root(), parser.matches, self._cache)
+        }
+
+
+def watch_sessions(
+    *,
+    source: Source | None,
+    verbose: bool,
+    debounce: float = DEFAULT_DEBOUNCE_SECONDS,
+    poll_interval: float = DEFAULT_POLL_INTERVAL_SECONDS,
+    polling: bool = False,
+    on_index: Callable[[IndexSummary], None] | None = None,
+    should_stop: Callable[[], bool] | None = None,
+) -> None:
+    """Index session files as they change until interrupted (or should_stop returns True).
+
+    Holds the index lock for its whole lifetime, so `recall index` is not run
+    concurrently.
+    """
+    config = AppConfig.load()
+    if verbose:
+        logging.basicConfig(level=logging.INFO)
+    else:
+        logging.basicConfig(level=logging.WARNING)
+
+    parsers = [get_parser(source)] if source else all_parsers()
+    roots = [parser.root().resolve() for parser in parsers]
+
+    with advisory_lock(config.lock_path):
+        # Start watching before the catch-up pass so no change slips in between.
+        watcher = _open_watcher(parsers, roots, poll_interval, polling)
+        conn: duckdb.DuckDBPyConnection | None = connect(config)
+        try:
+            summary = _index_all(conn, config, parsers)
+            if on_index is not None:
+                on_index(summary)
+            pending: dict[Path, SessionParser] = {}
+            first_change = last_change = last_write = time.monotonic()
+            while should_stop is None or not should_stop():
+                now = time.monotonic()
+                timeout = poll_interval
+                if pending:
+                    timeout = min(
+                        debounce - (now - last_change), MAX_DELAY_SECONDS - (now - first_change)
+                    )
+                elif conn is not None:
+                    timeout = min(timeout, IDLE_RELEASE_SECONDS - (now - last_write))
+                changed = watcher.wait(max(timeout, 0.0))
+
+                now = time.monotonic()
+                for path in changed:
+                    parser = _parser_for(path, parsers, roots)
+                    if parser is None:
+                        continue
+                    if not pending:
+                        first_change = now
+                    pending[path] = parser
+                    last_change = now
+
+                if pending and (
+                    now - last_change >= debounce or now - first_change >= MAX_DELAY_SECONDS
+                ):
+                    if conn is None:
+                        conn = connect(config)
+                    summary = _index_paths(conn, config, pending)
+                    pending = {}
+                    last_write = time.monotonic()
+                    if on_index is not None:
+                        on_index(summary)
+                elif conn is not None and not pending and now - last_write >= IDLE_RELEASE_SECONDS:
+                    conn.close()
+                    conn = None
+        finally:
+            watcher.close()
+            if conn is not None:
+                conn.close()
+
+
+def _open_watcher(
+    parsers: list[SessionParser], roots: list[Path], poll_interval: float, polling: bool
+) -> FileWatcher:
+    if not polling:
+        try:
+            return InotifyWatcher(parsers, roots, poll_interval)
+        except (OSError, AttributeError) as err:
+            logger.warning("inotify unavailable (%s), polling every %ss", err, poll_interval)
+    return PollingWatcher(parsers, poll_interval)
+
+
+def _parser_for(
+    path: Path, parsers: list[SessionParser], roots: list[Path]
+) -> SessionParser | None:
+    for parser, root in zip(parsers, roots, strict=True):
+        if path.is_relative_to(root) and parser.matches(path.name):
+            return parser
+    return None
+
+
+def _index_all(
+    conn: duckdb.DuckDBPyConnection, config: AppConfig, parsers: list[SessionParser]
+) -> IndexSummary:
+    files = [(parser, item) for parser in parsers for item in parser.scan()]
+    states = fetch_session_states(conn, [parser.source for parser in parsers])
+    return index_files(conn, config, files, states, full=False)
+
+
+def _index_paths(
+    conn: duckdb.DuckDBPyConnection, config: AppConfig, pending: dict[Path, SessionParser]
+) -> IndexSummary:
+    discovered: dict[Path, tuple[SessionParser, DiscoveredFile]] = {}
+    for path, parser in pending.items():
+        try:
+            resolved = path.resolve()
+            stat = resolved.stat()
+        except OSError:
+            # Deleted or renamed away; rows of indexed sessions are kept.
+            continue
+        if resolved.is_file():
+            item = DiscoveredFile(path=resolved, mtime=stat.st_mtime, size=stat.st_size)
+            discovered[resolved] = (parser, item)
+    files = [discovered[path] for path in sorted(discovered)]
+    states = {}
+    for _, item in files:
+        for path in dict.fromkeys((str(item.path), session_name(str(item.path)))):
+            state = fetch_session_state(conn, path)
+            if state is not None:
+                states[path] = state
+                break
+    return index_files(conn, config, files, states, full=False)
@@ -4,6 +4,7 @@ import json
 import shutil
 from pathlib import Path
 
+import duckdb
 from recall.cli.app import app
 from typer.testing import CliRunner
 
@@ -36,3 +37,50 @@ def test_cli_smoke(tmp_path, monkeypatch) -> None:
     payload = json.loads(result.stdout)
     assert isinstance(payload, list)
     assert payload
+
+
+def test_cli_index_reports_profile(tmp_path, monkeypatch) -> None:
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.setenv("RECALL_DATA_DIR", str(tmp_path / ".local/share/recall"))
+
+    fixtures = Path(__file__).resolve().parents[2] / "fixtures"
+    claude_target = tmp_path / ".claude" / "projects" / "proj1"
+    codex_target = tmp_path / ".codex" / "sessions" / "s1"
+    claude_target.mkdir(parents=True)
+    codex_target.mkdir(parents=True)
+    shutil.copy(fixtures / "claude_code" / "session1.jsonl", claude_target / "session1.jsonl")
+    shutil.copy(fixtures / "codex" / "session1" / "rollout.jsonl", codex_target / "rollout.jsonl")
+
+    runner = CliRunner()
+    result = runner.invoke(app, ["index", "--recreate", "--json"])
+    assert result.exit_code == 0
+    profile = json.loads(result.stdout)["profile"]
+    assert set(profile["phases"]) == {"discover", "decode", "build", "write", "stream", "fts"}
+    assert set(profile["sources"]) == {"claude_code", "codex"}
+    assert profile["sources"]["codex"]["sessions"] == 1
+    assert profile["bytes_read"] == sum(
+        path.stat().st_size
+        for path in (claude_target / "session1.jsonl", codex_target / "rollout.jsonl")
+    )
+    conn = duckdb.connect(str(tmp_path / ".local/share/recall" / "recall.duckdb"))
+    try:
+        row = conn.execute(
+            "SELECT (SELECT COUNT(*) FROM sessions) + (SELECT COUNT(*) FROM messages) "
+            "+ (SELECT COUNT(*) FROM tool_calls)"
+        ).fetchone()
+        bash_row = conn.execute(
+            "SELECT COUNT(*) FROM tool_calls WHERE bash_command IS NOT NULL"
+        ).fetchone()
+    finally:
+        conn.close()
+    assert row is not None and profile["rows_inserted"] == row[0]
+    # One cache lookup per bash tool call.
+    assert bash_row is not None and bash_row[0] > 0
+    assert profile["bash_cache_hits"] + profile["bash_cache_misses"] == bash_row[0]
+    assert len(profile["slowest"]) == 2
+
+    result = runner.invoke(app, ["index", "--full", "--profile"])
+    assert result.exit_code == 0
+    assert "phases:" in result.stdout
+    assert "slowest 2 files:" in result.stdout
+    assert "bash cache" in result.stdout
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+from recall.core.bash import BashCommandCache, split_segments
+
+
+def test_bash_cache_keys_on_stripped_command_and_counts_lookups() -> None:
+    cache = BashCommandCache()
+    first = cache.get("git status")
+    assert (first.base, first.sub, first.is_compound) == ("git", "status", False)
+    assert cache.get("git status") is first
+    cache.get("uv run pytest && git diff")
+
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.entries) == (1, 2, 2)
+
+
+def test_bash_cache_evicts_least_recently_used_within_size_bound() -> None:
+    cache = BashCommandCache(max_chars=20, max_command_chars=12)
+    cache.get("git status")
+    cache.get("ls -la")
+    cache.get("git status")
+    # 10 + 6 + 8 characters: evicts "ls -la", the least recently used.
+    cache.get("uv build")
+    cache.get("cat " + "x" * 20)
+
+    stats = cache.stats()
+    assert (stats.entries, stats.chars) == (2, 18)
+    cache.get("git status")
+    cache.get("ls -la")
+    assert cache.stats().hits == 2
+
+
+def test_split_segments_parses_every_simple_command() -> None:
+    segments = split_segments(
+        "cd app && FOO=1 uv run pytest -q 2>&1 | tee log.txt; (git status || echo $(date))\n"
+        "cat <<EOF > notes.txt\nrm -rf /\nEOF\nnpm test"
+    )
+    assert [(segment.base, segment.sub, segment.argv) for segment in segments] == [
+        ("cd", None, ("cd", "app")),
+        ("uv", "run", ("FOO=1", "uv", "run", "pytest", "-q")),
+        ("tee", None, ("tee", "log.txt")),
+        ("git", "status", ("git", "status")),
+        ("echo", None, ("echo", "$(date)")),
+        ("cat", None, ("cat",)),
+        ("npm", "test", ("npm", "test")),
+    ]
+    assert [segment.argv for segment in split_segments("echo 'a && b' 'unclosed | wc")] == [
+        ("echo", "'a"),
+        ("b'", "'unclosed"),
+        ("wc",),
+    ]
+
+
+def test_split_segments_finds_commands_inside_conditionals_and_loops() -> None:
+    def bases(command: str) -> list[str | None]:
+        return [segment.base for segment in split_segments(command)]
+
+    assert bases("if true; then rm -rf x; fi") == ["true", "rm"]
+    assert bases("for f in *.py; do rm $f; done") == ["rm"]
+    assert bases('while read -r line; do\n  sudo rm "$line"\ndone < files.txt') == [
+        "read",
+        "sudo",
+    ]
+    assert bases("until ! make; do sleep 1; done && { git push; }") == ["make", "sleep", "git"]
+    assert bases("case $1 in start) kill 1;; esac") == ["kill"]
+
+    # An escaped semicolon ends find's -exec, not the command.
+    (find,) = split_segments(r"find . -name '*.pyc' -exec rm {} \; -print")
+    assert find.argv == ("find", ".", "-name", "*.pyc", "-exec", "rm", "{}", ";", "-print")
@@ -0,0 +1,12 @@
+from __future__ import annotations
+
+from recall.core.ids import SessionIds, message_id, session_id, tool_call_id
+
+
+def test_session_ids_match_per_row_ids() -> None:
+    session = session_id("codex", "/home/user/.codex/sessions/rollout.jsonl")
+    ids = SessionIds(session)
+
+    messages = [ids.message(idx) for idx in range(12)]
+    assert messages == [message_id(session, idx) for idx in range(12)]
+    assert ids.orphan_tool_call(7) == tool_call_id(None, 7, session_id_value=session)
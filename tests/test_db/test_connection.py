@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+from datetime import UTC, datetime
+
+from recall.core.config import AppConfig
+from recall.db import IndexRun, connect, fetch_index_runs, insert_index_run
+
+
+def test_recreate_keeps_index_runs_not_yet_checkpointed(tmp_path, monkeypatch) -> None:
+    monkeypatch.setenv("RECALL_DATA_DIR", str(tmp_path))
+    config = AppConfig.load()
+    now = datetime.now(UTC)
+    run = IndexRun(
+        started_at=now,
+        ended_at=now,
+        mode="full",
+        source=None,
+        recall_version=None,
+        workers=1,
+        total=1,
+        indexed=1,
+        skipped=0,
+        failed=0,
+        missing=0,
+        bytes_read=10,
+        rows_inserted=3,
+        phases={},
+        sources={},
+    )
+
+    conn = connect(config)
+    conn.execute("CHECKPOINT")
+    # Leave the run only in the WAL, as after a crash or a killed process.
+    conn.execute("PRAGMA disable_checkpoint_on_shutdown")
+    conn.execute("SET checkpoint_threshold = '1GB'")
+    insert_index_run(conn, run)
+    conn.close()
+    assert config.db_path.with_name(config.db_path.name + ".wal").exists()
+
+    conn = connect(config, recreate=True)
+    try:
+        assert [(item.mode, item.rows_inserted) for item in fetch_index_runs(conn, 10)] == [
+            ("full", 3)
+        ]
+    finally:
+        conn.close()
+    backups = list(tmp_path.glob("recall.bak-*"))
+    assert len(backups) == 1
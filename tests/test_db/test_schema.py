@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import duckdb
+from recall.db.schema import SCHEMA_VERSION, ensure_schema
+
+# schema.sql as released with schema version 2, before any migration existed.
+V2_SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS schema_version (
+    version INTEGER PRIMARY KEY,
+    applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS sessions (
+    id TEXT PRIMARY KEY,
+    source TEXT NOT NULL CHECK (source IN ('claude_code', 'codex', 'pi_agent')),
+    source_path TEXT UNIQUE NOT NULL,
+    source_session_id TEXT,
+
+    started_at TIMESTAMP,
+    ended_at TIMESTAMP,
+    duration_seconds INTEGER,
+
+    model TEXT,
+    cwd TEXT,
+    git_repo TEXT,
+    git_branch TEXT,
+
+    message_count INTEGER DEFAULT 0,
+    tool_count INTEGER DEFAULT 0,
+    input_tokens INTEGER,
+    output_tokens INTEGER,
+
+    is_complete BOOLEAN DEFAULT TRUE,
+    file_mtime DOUBLE NOT NULL,
+    file_size BIGINT NOT NULL,
+    indexed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS messages (
+    id TEXT PRIMARY KEY,
+    session_id TEXT NOT NULL REFERENCES sessions(id),
+    idx INTEGER NOT NULL,
+    role TEXT NOT NULL CHECK (role IN ('user', 'assistant', 'system')),
+    content TEXT,
+    thinking TEXT,
+    timestamp TIMESTAMP,
+    has_thinking BOOLEAN DEFAULT FALSE,
+
+    content_embedding FLOAT[384],
+    thinking_embedding FLOAT[384],
+
+    UNIQUE(session_id, idx)
+);
+
+CREATE TABLE IF NOT EXISTS tool_calls (
+    id TEXT PRIMARY KEY,
+    session_id TEXT NOT NULL REFERENCES sessions(id),
+    message_id TEXT REFERENCES messages(id),
+    idx INTEGER NOT NULL,
+
+    tool_name TEXT NOT NULL,
+    tool_input JSON,
+
+    bash_command TEXT,
+    bash_base TEXT,
+    bash_sub TEXT,
+    is_compound BOOLEAN DEFAULT FALSE,
+
+    bash_embedding FLOAT[384]
+);
+
+CREATE INDEX IF NOT EXISTS idx_sessions_source ON sessions(source);
+CREATE INDEX IF NOT EXISTS idx_sessions_cwd ON sessions(cwd);
+CREATE INDEX IF NOT EXISTS idx_sessions_git_repo ON sessions(git_repo);
+CREATE INDEX IF NOT EXISTS idx_sessions_started ON sessions(started_at DESC);
+CREATE INDEX IF NOT EXISTS idx_messages_session ON messages(session_id);
+CREATE INDEX IF NOT EXISTS idx_messages_has_thinking ON messages(has_thinking);
+CREATE INDEX IF NOT EXISTS idx_tool_calls_session ON tool_calls(session_id);
+CREATE INDEX IF NOT EXISTS idx_tool_calls_name ON tool_calls(tool_name);
+CREATE INDEX IF NOT EXISTS idx_tool_calls_bash_base ON tool_calls(bash_base);
+CREATE INDEX IF NOT EXISTS idx_tool_calls_bash_sub ON tool_calls(bash_sub);
+"""
+
+
+def _layout(conn: duckdb.DuckDBPyConnection) -> tuple[set[tuple[str, str, str]], set[str]]:
+    columns = conn.execute(
+        "SELECT table_name, column_name, data_type FROM information_schema.columns "
+        "WHERE table_schema = 'main'"
+    ).fetchall()
+    indexes = conn.execute("SELECT index_name FROM duckdb_indexes()").fetchall()
+    return set(columns), {row[0] for row in indexes}
+
+
+def test_ensure_schema_migrates_version_2_database() -> None:
+    conn = duckdb.connect(":memory:")
+    fresh = duckdb.connect(":memory:")
+    try:
+        conn.execute(V2_SCHEMA_SQL)
+        conn.execute("INSERT INTO schema_version (version) VALUES (2)")
+        conn.execute(
+            "INSERT INTO sessions (id, source, source_path, file_mtime, file_size) "
+            "VALUES ('s1', 'codex', '/tmp/rollout.jsonl', 1.0, 10)"
+        )
+
+        ensure_schema(conn)
+        ensure_schema(fresh)
+
+        versions = conn.execute("SELECT version FROM schema_version ORDER BY version").fetchall()
+        assert [row[0] for row in versions] == list(range(2, SCHEMA_VERSION + 1))
+        # Every table, column and index of a new database exists after upgrading.
+        assert _layout(conn) == _layout(fresh)
+        row = conn.execute(
+            "SELECT id, file_mtime, byte_offset, prefix_digest, parser_state, content_digest "
+            "FROM sessions"
+        ).fetchone()
+        # Version 9 clears the stored mtime so the next run reparses the file.
+        assert row == ("s1", 0.0, None, None, None, None)
+    finally:
+        conn.close()
+        fresh.close()
+
+
+def test_ensure_schema_migrates_fts_fields_to_corpus_totals() -> None:
+    conn = duckdb.connect(":memory:")
+    fresh = duckdb.connect(":memory:")
+    try:
+        ensure_schema(conn)
+        ensure_schema(fresh)
+        # Reduce the new database to version 9.
+        conn.execute("UPDATE schema_version SET version = 9")
+        for index in ("fts_postings_term", "fts_postings_session", "fts_documents_session"):
+            conn.execute(f"DROP INDEX idx_{index}")
+        conn.execute("DROP TABLE fts_fields")
+        conn.execute("CREATE TABLE fts_fields (field TEXT NOT NULL)")
+        conn.execute("INSERT INTO fts_fields VALUES ('bash'), ('content')")
+        conn.execute(
+            "INSERT INTO sessions (id, source, source_path, file_mtime, file_size) "
+            "VALUES ('s1', 'codex', '/tmp/rollout.jsonl', 1.0, 10)"
+        )
+        conn.execute(
+            "INSERT INTO messages (id, session_id, idx, role) "
+            "VALUES ('m1', 's1', 0, 'user'), ('m2', 's1', 1, 'assistant')"
+        )
+        conn.execute(
+            "INSERT INTO fts_documents "
+            "VALUES ('m1', 's1', 'content', 3), ('m2', 's1', 'content', 4)"
+        )
+
+        ensure_schema(conn)
+
+        assert _layout(conn) == _layout(fresh)
+        totals = conn.execute("SELECT * FROM fts_fields ORDER BY field").fetchall()
+        assert totals == [("bash", 0, 0), ("content", 2, 7)]
+    finally:
+        conn.close()
+        fresh.close()
@@ -1,8 +1,10 @@
 from __future__ import annotations
 
+from datetime import UTC, datetime
 from pathlib import Path
 
 from recall.parsers.claude_code import ClaudeCodeParser
+from recall.parsers.prefilter import PREFILTER_MIN_BYTES
 
 
 def test_claude_code_parser_parses_messages() -> None:
@@ -21,3 +23,32 @@ def test_claude_code_parser_parses_messages() -> None:
     assert tool_call.bash_command == "git status"
     assert tool_call.bash_base == "git"
     assert tool_call.bash_sub == "status"
+
+
+def test_claude_parser_builds_slotted_records() -> None:
+    fixture = Path(__file__).resolve().parents[2] / "fixtures" / "claude_code" / "session1.jsonl"
+    record = ClaudeCodeParser().parse(fixture)
+
+    message = record.messages[0]
+    assert not hasattr(message, "__dict__")
+    assert not hasattr(record, "__dict__")
+    tool_calls = [call for item in record.messages for call in item.tool_calls]
+    assert tool_calls and not hasattr(tool_calls[0], "__dict__")
+    assert {call.session_id for call in tool_calls} == {record.id}
+
+
+def test_claude_parser_skips_large_snapshots_but_keeps_their_timestamp(tmp_path) -> None:
+    fixture = Path(__file__).resolve().parents[2] / "fixtures" / "claude_code" / "session1.jsonl"
+    session_path = tmp_path / "session1.jsonl"
+    snapshot = (
+        '{"type":"file-history-snapshot","timestamp":"2024-01-15T15:00:00Z",'
+        f'"snapshot":{{"files":"{"x" * PREFILTER_MIN_BYTES}"}}}}\n'
+    )
+    session_path.write_text(fixture.read_text(encoding="utf-8") + snapshot, encoding="utf-8")
+
+    expected = ClaudeCodeParser().parse(fixture)
+    session = ClaudeCodeParser().parse(session_path)
+
+    assert session.ended_at == datetime(2024, 1, 15, 15, 0, tzinfo=UTC)
+    assert session.started_at == expected.started_at
+    assert session.message_count == expected.message_count
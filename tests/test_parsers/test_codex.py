@@ -1,8 +1,12 @@
 from __future__ import annotations
 
+from datetime import UTC, datetime
 from pathlib import Path
 
+from recall.db.bulk import ColumnBatch, SessionColumns
 from recall.parsers.codex import CodexParser
+from recall.parsers.prefilter import PREFILTER_MIN_BYTES
+from recall.parsers.protocol import ParseCheckpoint
 
 
 def test_codex_parser_parses_orphans() -> None:
@@ -69,3 +73,80 @@ def test_codex_parser_response_item_shell_command_alias() -> None:
     shell_call = session.orphan_tool_calls[0]
     assert shell_call.tool_name == "shell_command"
     assert shell_call.bash_command == "echo hello"
+
+
+def test_codex_parser_resume_matches_full_parse(tmp_path) -> None:
+    fixture_dir = Path(__file__).resolve().parents[2] / "fixtures" / "codex" / "session2"
+    fixture = next(fixture_dir.glob("rollout-*.jsonl"))
+    lines = fixture.read_text(encoding="utf-8").splitlines(keepends=True)
+    rollout = tmp_path / fixture.name
+    rollout.write_text("".join(lines[:4]), encoding="utf-8")
+
+    parser = CodexParser()
+    head = parser.parse(rollout)
+    byte_offset, parser_state = head.byte_offset, head.parser_state
+    assert byte_offset is not None and parser_state is not None
+    assert byte_offset == rollout.stat().st_size
+
+    rollout.write_text("".join(lines), encoding="utf-8")
+    checkpoint = ParseCheckpoint(byte_offset=byte_offset, state=parser_state)
+    tail = parser.resume(rollout, checkpoint)
+    full = parser.parse(rollout)
+
+    assert tail.messages == []
+    assert tail.tool_count == full.tool_count == 4
+    assert tail.ended_at == full.ended_at
+    head_ids = [call.id for call in head.orphan_tool_calls]
+    tail_ids = [call.id for call in tail.orphan_tool_calls]
+    assert head_ids + tail_ids == [call.id for call in full.orphan_tool_calls]
+    assert [call.idx for call in tail.orphan_tool_calls] == [1, 2, 3]
+
+
+def test_codex_parser_columnar_rows_match_parsed_records() -> None:
+    fixture = (
+        Path(__file__).resolve().parents[2] / "fixtures" / "codex" / "session1" / "rollout.jsonl"
+    )
+    parser = CodexParser()
+    from_records = ColumnBatch()
+    from_records.add(parser.parse(fixture))
+
+    columns = SessionColumns()
+    session = parser.stream(fixture).collect_rows(columns)
+    from_columns = ColumnBatch()
+    from_columns.add_columns(session, columns)
+
+    assert session.messages == []
+    assert session.orphan_tool_calls == []
+    assert from_columns.message_columns == from_records.message_columns
+    # Orphan tool calls arrive in file order rather than after all messages.
+    assert _rows(from_columns.tool_call_columns) == _rows(from_records.tool_call_columns)
+    assert len(from_columns.tool_call_columns["id"]) == session.tool_count
+    assert from_columns.row_count == from_records.row_count
+    session_row = {**from_columns.session_columns, "indexed_at": None}
+    assert session_row == {**from_records.session_columns, "indexed_at": None}
+
+
+def _rows(columns: dict[str, list]) -> list[tuple]:
+    return sorted(zip(*columns.values(), strict=True), key=lambda row: row[0])
+
+
+def test_codex_parser_skips_large_ignored_entries_but_keeps_their_timestamp(tmp_path) -> None:
+    fixture = (
+        Path(__file__).resolve().parents[2] / "fixtures" / "codex" / "session1" / "rollout.jsonl"
+    )
+    rollout = tmp_path / "rollout.jsonl"
+    # Never decoded: classified as turn_context from its bytes, so even a
+    # malformed payload leaves the session complete.
+    ignored = (
+        '{"timestamp":"2024-01-16T13:00:00Z","type":"turn_context",'
+        f'"payload":{{"instructions":"{"x" * PREFILTER_MIN_BYTES}",}}}}\n'
+    )
+    rollout.write_text(fixture.read_text(encoding="utf-8") + ignored, encoding="utf-8")
+
+    expected = CodexParser().parse(fixture)
+    session = CodexParser().parse(rollout)
+
+    assert session.is_complete
+    assert session.ended_at == datetime(2024, 1, 16, 13, 0, tzinfo=UTC)
+    assert session.message_count == expected.message_count
+    assert session.tool_count == expected.tool_count
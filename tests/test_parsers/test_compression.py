@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import gzip
+import shutil
+from pathlib import Path
+
+import pytest
+from recall.parsers import all_parsers
+from recall.parsers.claude_code import ClaudeCodeParser
+from recall.parsers.compression import session_name
+
+FIXTURE = Path(__file__).resolve().parents[2] / "fixtures" / "claude_code" / "session1.jsonl"
+
+
+def _compress(suffix: str, target: Path) -> Path:
+    data = FIXTURE.read_bytes()
+    if suffix == ".gz":
+        target.write_bytes(gzip.compress(data))
+    else:
+        zstandard = pytest.importorskip("zstandard")
+        target.write_bytes(zstandard.ZstdCompressor().compress(data))
+    return target
+
+
+@pytest.mark.parametrize("suffix", [".gz", ".zst"])
+def test_compressed_session_parses_like_uncompressed(tmp_path, suffix) -> None:
+    plain = tmp_path / "session1.jsonl"
+    shutil.copy(FIXTURE, plain)
+    archive = _compress(suffix, tmp_path / f"session1.jsonl{suffix}")
+    parser = ClaudeCodeParser()
+
+    expected = parser.parse(plain)
+    session = parser.parse(archive)
+
+    assert session.source_session_id == "session1"
+    assert session.file_size == archive.stat().st_size
+    # Archives are reparsed whole when they change, never resumed.
+    assert (session.byte_offset, session.prefix_digest) == (None, None)
+    assert session.content_digest is not None
+    assert [(m.role, m.content, m.timestamp) for m in session.messages] == [
+        (m.role, m.content, m.timestamp) for m in expected.messages
+    ]
+    assert [call.bash_command for m in session.messages for call in m.tool_calls] == [
+        call.bash_command for m in expected.messages for call in m.tool_calls
+    ]
+
+
+def test_parsers_match_compressed_session_files() -> None:
+    assert session_name("rollout-1.jsonl.zst") == "rollout-1.jsonl"
+    for parser in all_parsers():
+        name = "rollout-1.jsonl" if parser.source.value == "codex" else "session.jsonl"
+        assert parser.matches(name)
+        assert parser.matches(name + ".gz")
+        assert parser.matches(name + ".zst")
+        assert not parser.matches(name + ".bz2")
@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+from recall.core.config import AppConfig
+from recall.parsers.decoder import load_decoder
+
+LINES = [
+    b'{"type": "user", "message": {"content": [{"text": "caf\\u00e9 \xc3\xa9"}]}}',
+    b'{"n": 1.5e300, "big": 123456789012345678901234567890, "nan": NaN, "dup": 1, "dup": 2}',
+    b"[1, 2.0, -0.0, true, null]",
+]
+
+
+@pytest.mark.parametrize("name", ["orjson", "msgspec"])
+def test_fast_decoders_match_stdlib(name: str) -> None:
+    pytest.importorskip(name)
+    resolved, decode = load_decoder(name)
+    assert resolved == name
+    for line in LINES:
+        # Serialized, so NaN compares equal and int/float types must match.
+        assert json.dumps(decode(line)) == json.dumps(json.loads(line))
+    # Rejected lines raise what the standard library raises.
+    with pytest.raises(UnicodeDecodeError):
+        decode(b'{"type": "\xff"}')
+    with pytest.raises(json.JSONDecodeError):
+        decode(b'{"type": ')
+
+
+def test_load_decoder_names() -> None:
+    assert load_decoder("json") == ("json", json.loads)
+    assert load_decoder("auto")[0] in ("orjson", "msgspec", "json")
+    with pytest.raises(ValueError, match="unknown JSON decoder"):
+        load_decoder("simdjson")
+
+
+def test_json_decoder_selected_by_env_over_config_file(tmp_path, monkeypatch) -> None:
+    config_path = tmp_path / "config.toml"
+    config_path.write_text('[parsers]\njson_decoder = "json"\n', encoding="utf-8")
+    monkeypatch.setenv("RECALL_CONFIG_PATH", str(config_path))
+    monkeypatch.delenv("RECALL_JSON_DECODER", raising=False)
+    assert AppConfig.load().json_decoder == "json"
+    monkeypatch.setenv("RECALL_JSON_DECODER", "orjson")
+    assert AppConfig.load().json_decoder == "orjson"
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+from recall.parsers.discovery import DirectoryCache, iter_files
+
+
+def _settle(*directories: Path) -> None:
+    # Move directory mtimes out of the racy window so listings get cached.
+    for directory in directories:
+        os.utime(directory, ns=(1_000_000_000, 1_000_000_000))
+
+
+def _scan(root: Path, cache: DirectoryCache) -> dict[str, int]:
+    return {
+        item.path.name: item.size
+        for item in iter_files(root, lambda name: name.endswith(".jsonl"), cache)
+    }
+
+
+def test_directory_cache_reuses_listings_and_sees_changes(tmp_path: Path) -> None:
+    root = tmp_path / "sessions"
+    project = root / "project"
+    project.mkdir(parents=True)
+    (project / "a.jsonl").write_text("{}\n", encoding="utf-8")
+    (project / "notes.txt").write_text("skip", encoding="utf-8")
+    _settle(root, project)
+
+    cache_path = tmp_path / "cache.json"
+    first = DirectoryCache.load(cache_path)
+    assert _scan(root, first) == {"a.jsonl": 3}
+    assert first.misses == 2
+    first.save(cache_path)
+
+    # Appending to a file leaves its directory's mtime alone; the cached
+    # listing is reused and the new size is still seen.
+    with (project / "a.jsonl").open("a", encoding="utf-8") as handle:
+        handle.write("{}\n")
+    second = DirectoryCache.load(cache_path)
+    assert _scan(root, second) == {"a.jsonl": 6}
+    assert (second.hits, second.misses) == (2, 0)
+
+    # A new file changes the directory mtime, so only that directory is re-read.
+    (project / "b.jsonl").write_text("{}\n", encoding="utf-8")
+    third = DirectoryCache.load(cache_path)
+    assert _scan(root, third) == {"a.jsonl": 6, "b.jsonl": 3}
+    assert (third.hits, third.misses) == (1, 1)
+
+
+def test_directory_cache_drops_removed_directories(tmp_path: Path) -> None:
+    root = tmp_path / "sessions"
+    old = root / "old"
+    old.mkdir(parents=True)
+    (old / "a.jsonl").write_text("{}\n", encoding="utf-8")
+    _settle(root, old)
+
+    cache_path = tmp_path / "cache.json"
+    cache = DirectoryCache.load(cache_path)
+    _scan(root, cache)
+    cache.save(cache_path)
+    assert str(old.resolve()) in DirectoryCache.load(cache_path).directories
+
+    (old / "a.jsonl").unlink()
+    old.rmdir()
+    cache = DirectoryCache.load(cache_path)
+    assert _scan(root, cache) == {}
+    cache.save(cache_path)
+    assert str(old.resolve()) not in DirectoryCache.load(cache_path).directories
+
+
+def test_directory_cache_ignores_unreadable_file(tmp_path: Path) -> None:
+    cache_path = tmp_path / "cache.json"
+    cache_path.write_text("not json", encoding="utf-8")
+    assert DirectoryCache.load(cache_path).directories == {}
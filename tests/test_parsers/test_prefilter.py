@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+import json
+
+from recall.parsers.prefilter import PREFILTER_MIN_BYTES, EntryHead, read_head
+
+PADDING = "x" * PREFILTER_MIN_BYTES
+
+
+def test_read_head_reads_top_level_fields_in_any_order() -> None:
+    line = json.dumps(
+        {
+            "timestamp": "2024-01-16T12:00:00Z",
+            "type": "response_item",
+            "payload": {"type": "reasoning", "encrypted_content": PADDING},
+        }
+    ).encode()
+    assert read_head(line) == EntryHead(
+        type="response_item", timestamp="2024-01-16T12:00:00Z", payload_type="reasoning"
+    )
+
+    line = json.dumps({"payload": {"type": "x"}, "type": "turn_context", "pad": PADDING}).encode()
+    # Keys after the first nested value are out of reach, so type is unknown.
+    assert read_head(line) is None
+
+
+def test_read_head_ignores_nested_keys_and_short_lines() -> None:
+    nested = json.dumps({"id": "a", "meta": {"type": "summary", "timestamp": "t"}, "pad": PADDING})
+    assert read_head(nested.encode()) is None
+    escaped = json.dumps({"note": 'say "type": "summary"', "type": "message", "pad": PADDING})
+    head = read_head(escaped.encode())
+    assert head is not None and head.type == "message" and head.timestamp is None
+    assert read_head(b'{"type": "turn_context", "timestamp": "t"}') is None
+    assert read_head(b'{"type": "turn_context", "pad": "' + PADDING.encode()) is None
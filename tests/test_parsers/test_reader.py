@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import gzip
+import json
+import mmap
+import os
+import time
+
+import pytest
+from recall.parsers import reader as reader_module
+from recall.parsers.reader import MMAP_SETTLE_SECONDS, LineReader
+
+
+@pytest.fixture(params=["settled", "recent"])
+def write_session(request, monkeypatch):
+    """Write session files either settled (memory-mapped) or just modified (streamed)."""
+    settled = request.param == "settled"
+    mapped: list[int] = []
+    map_file_descriptor = mmap.mmap
+
+    def map_file(fileno, length, **kwargs):
+        mapped.append(fileno)
+        return map_file_descriptor(fileno, length, **kwargs)
+
+    monkeypatch.setattr(reader_module.mmap, "mmap", map_file)
+
+    def write(path, data: bytes) -> None:
+        path.write_bytes(data)
+        if settled:
+            old = time.time() - MMAP_SETTLE_SECONDS - 60
+            os.utime(path, (old, old))
+
+    yield write
+    assert bool(mapped) == settled
+
+
+def test_line_reader_splits_file_from_offset_and_tracks_resume_point(
+    tmp_path, write_session
+) -> None:
+    path = tmp_path / "session.jsonl"
+    write_session(path, b'{"a": 1}\n\n  {"b": 2}\r\n{"c": 3}\n{"d":')
+
+    reader = LineReader(path, decoder=json.loads)
+    assert list(reader) == [b'{"a": 1}', b'{"b": 2}', b'{"c": 3}', b'{"d":']
+    # The unterminated last line may still be written to.
+    assert reader.resumable_offset is None
+    assert reader.offset == len(b'{"a": 1}\n\n  {"b": 2}\r\n{"c": 3}\n')
+
+    tail = LineReader(path, start=len(b'{"a": 1}\n\n'), decoder=json.loads)
+    assert [tail.decode(line) for line in list(tail)[:2]] == [{"b": 2}, {"c": 3}]
+
+    write_session(path, b'{"a": 1}\n{"b": 2}\n')
+    assert list(LineReader(path, start=path.stat().st_size, decoder=json.loads)) == []
+    complete = LineReader(path, start=9, decoder=json.loads)
+    assert list(complete) == [b'{"b": 2}']
+    assert (complete.resumable_offset, complete.bytes_read) == (18, 9)
+
+    write_session(path, b"")
+    assert list(LineReader(path, decoder=json.loads)) == []
+
+
+def test_line_reader_streams_compressed_files(tmp_path) -> None:
+    path = tmp_path / "session.jsonl.gz"
+    path.write_bytes(gzip.compress(b'{"a": 1}\n{"b": 2}\n'))
+
+    reader = LineReader(path, decoder=json.loads)
+    assert list(reader) == [b'{"a": 1}', b'{"b": 2}']
+    assert reader.bytes_read == 18
+    assert reader.resumable_offset is None
@@ -1,13 +1,37 @@
 from __future__ import annotations
 
+import gzip
+import os
 import shutil
+from datetime import timedelta
 from pathlib import Path
 
 import duckdb
+import pytest
 import recall.services.indexer as indexer_module
+from recall.core.types import Source
+from recall.parsers.claude_code import ClaudeCodeParser
+from recall.services.analytics import bash_breakdown, bash_suggestions, index_history
 from recall.services.indexer import index_sessions
 
 
+@pytest.fixture(autouse=True)
+def local_time_zone(monkeypatch) -> None:
+    """Open every DuckDB connection in a non-UTC time zone, as on most machines.
+
+    DuckDB writes aware datetimes to TIMESTAMP columns in the connection's time
+    zone, so timestamps must be stored as naive UTC regardless of it.
+    """
+    connect = duckdb.connect
+
+    def connect_in_time_zone(*args, **kwargs):
+        conn = connect(*args, **kwargs)
+        conn.execute("SET TimeZone = 'America/Los_Angeles'")
+        return conn
+
+    monkeypatch.setattr(duckdb, "connect", connect_in_time_zone)
+
+
 def test_indexer_indexes_sessions(tmp_path, monkeypatch) -> None:
     monkeypatch.setenv("HOME", str(tmp_path))
     monkeypatch.setenv("RECALL_DATA_DIR", str(tmp_path / ".local/share/recall"))
@@ -115,7 +139,11 @@ def test_indexer_preserves_existing_rows_when_fallback_insert_fails(tmp_path, mo
     def fail_insert_messages(_conn, _messages) -> None:
         raise RuntimeError("simulated insert_messages failure")
 
+    def fail_insert_column_batch(_conn, _batch) -> None:
+        raise RuntimeError("simulated batch insert failure")
+
     monkeypatch.setattr(indexer_module, "insert_messages", fail_insert_messages)
+    monkeypatch.setattr(indexer_module, "insert_column_batch", fail_insert_column_batch)
 
     second = index_sessions(source=None, full=True, recreate=False, verbose=False)
     assert second.indexed == 0
@@ -132,3 +160,760 @@ def test_indexer_preserves_existing_rows_when_fallback_insert_fails(tmp_path, mo
         assert (after_sessions[0], after_messages[0], after_tool_calls[0]) == expected
     finally:
         conn.close()
+
+
+def test_indexer_parallel_workers_match_serial_results(tmp_path, monkeypatch) -> None:
+    monkeypatch.setenv("HOME", str(tmp_path))
+
+    claude_target = tmp_path / ".claude" / "projects" / "proj1"
+    codex_target = tmp_path / ".codex" / "sessions" / "s1"
+    pi_target = tmp_path / ".pi" / "agent" / "sessions" / "proj1"
+    claude_target.mkdir(parents=True)
+    codex_target.mkdir(parents=True)
+    pi_target.mkdir(parents=True)
+
+    fixtures = Path(__file__).resolve().parents[2] / "fixtures"
+    shutil.copy(fixtures / "claude_code" / "session1.jsonl", claude_target / "session1.jsonl")
+    shutil.copy(fixtures / "codex" / "session1" / "rollout.jsonl", codex_target / "rollout.jsonl")
+    shutil.copy(fixtures / "pi_agent" / "session1.jsonl", pi_target / "session1.jsonl")
+    # Invalid UTF-8 is not a JSON syntax error, so the parser raises.
+    (claude_target / "broken.jsonl").write_bytes(b'{"type": "\xff"}\n')
+
+    def index_rows(workers: int) -> dict[str, list[tuple]]:
+        data_dir = tmp_path / f"data-{workers}"
+        monkeypatch.setenv("RECALL_DATA_DIR", str(data_dir))
+        summary = index_sessions(
+            source=None, full=True, recreate=True, verbose=False, workers=workers
+        )
+        assert (summary.total, summary.indexed, summary.failed) == (4, 3, 1)
+        conn = duckdb.connect(str(data_dir / "recall.duckdb"))
+        try:
+            return {
+                "sessions": conn.execute(
+                    "SELECT * EXCLUDE (indexed_at) FROM sessions ORDER BY id"
+                ).fetchall(),
+                "messages": conn.execute("SELECT * FROM messages ORDER BY id").fetchall(),
+                "tool_calls": conn.execute("SELECT * FROM tool_calls ORDER BY id").fetchall(),
+            }
+        finally:
+            conn.close()
+
+    serial = index_rows(workers=1)
+    parallel = index_rows(workers=2)
+    assert [len(rows) for rows in serial.values()] == [3, 11, 4]
+    assert parallel == serial
+
+
+def test_indexer_appends_new_lines_of_growing_session(tmp_path, monkeypatch) -> None:
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.setenv("RECALL_DATA_DIR", str(tmp_path / ".local/share/recall"))
+
+    claude_target = tmp_path / ".claude" / "projects" / "proj1"
+    claude_target.mkdir(parents=True)
+    claude_fixture = (
+        Path(__file__).resolve().parents[2] / "fixtures" / "claude_code" / "session1.jsonl"
+    )
+    session_path = claude_target / "session1.jsonl"
+    shutil.copy(claude_fixture, session_path)
+
+    first = index_sessions(source=None, full=True, recreate=True, verbose=False)
+    assert first.indexed == 1
+
+    appended_lines = [
+        '{"type":"message","timestamp":"2024-01-15T10:04:00Z","outputTokens":3,'
+        '"message":{"role":"user","content":[{"type":"text","text":"Run tests"}]}}',
+        '{"type":"message","timestamp":"2024-01-15T10:05:00Z","message":{"role":"assistant",'
+        '"content":[{"type":"tool_use","name":"bash","input":{"command":"uv run pytest"}}]}}',
+    ]
+    with session_path.open("a", encoding="utf-8") as handle:
+        handle.write("\n".join(appended_lines) + "\n")
+
+    inserted: list[int] = []
+    original_insert_messages = indexer_module.insert_messages
+
+    def tracking_insert_messages(conn, messages) -> None:
+        messages = list(messages)
+        inserted.append(len(messages))
+        original_insert_messages(conn, messages)
+
+    monkeypatch.setattr(indexer_module, "insert_messages", tracking_insert_messages)
+
+    second = index_sessions(source=None, full=False, recreate=False, verbose=False)
+    assert second.indexed == 1
+    assert inserted == [2]
+
+    expected = ClaudeCodeParser().parse(session_path)
+    assert expected.ended_at is not None
+    db_path = tmp_path / ".local/share/recall" / "recall.duckdb"
+    conn = duckdb.connect(str(db_path))
+    try:
+        session_row = conn.execute(
+            "SELECT message_count, tool_count, output_tokens, ended_at, file_size FROM sessions"
+        ).fetchone()
+        assert session_row is not None
+        assert session_row[:3] == (6, 2, 10)
+        assert session_row[3] == expected.ended_at.replace(tzinfo=None)
+        assert session_row[4] == session_path.stat().st_size
+        message_ids = conn.execute("SELECT id FROM messages ORDER BY idx").fetchall()
+        assert [row[0] for row in message_ids] == [message.id for message in expected.messages]
+        bash_commands = conn.execute(
+            "SELECT bash_command FROM tool_calls ORDER BY bash_command"
+        ).fetchall()
+        assert [row[0] for row in bash_commands] == ["git status", "uv run pytest"]
+    finally:
+        conn.close()
+
+    session_path.write_text(
+        '{"type":"message","timestamp":"2024-02-01T09:00:00Z",'
+        '"message":{"role":"user","content":"Rewritten history"}}\n' * 8,
+        encoding="utf-8",
+    )
+    third = index_sessions(source=None, full=False, recreate=False, verbose=False)
+    assert third.indexed == 1
+
+    conn = duckdb.connect(str(db_path))
+    try:
+        counts = conn.execute(
+            "SELECT (SELECT COUNT(*) FROM messages), (SELECT COUNT(*) FROM tool_calls)"
+        ).fetchone()
+        assert counts == (8, 0)
+    finally:
+        conn.close()
+
+
+def test_indexer_stores_bash_segments_of_compound_commands(tmp_path, monkeypatch) -> None:
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.setenv("RECALL_DATA_DIR", str(tmp_path / ".local/share/recall"))
+
+    claude_target = tmp_path / ".claude" / "projects" / "proj1"
+    claude_target.mkdir(parents=True)
+    session_path = claude_target / "session1.jsonl"
+
+    def bash_line(minute: int, command: str) -> str:
+        return (
+            f'{{"type":"message","timestamp":"2024-01-15T10:0{minute}:00Z","message":'
+            '{"role":"assistant","content":[{"type":"tool_use","name":"bash",'
+            f'"input":{{"command":"{command}"}}}}]}}}}\n'
+        )
+
+    session_path.write_text(
+        bash_line(1, "cd app && npm test | tee log.txt") + bash_line(2, "npm test"),
+        encoding="utf-8",
+    )
+    assert index_sessions(source=None, full=True, recreate=True, verbose=False).indexed == 1
+    with session_path.open("a", encoding="utf-8") as handle:
+        handle.write(bash_line(3, "git status; git diff"))
+    assert index_sessions(source=None, full=False, recreate=False, verbose=False).indexed == 1
+    assert index_sessions(source=None, full=True, recreate=False, verbose=False).indexed == 1
+
+    db_path = tmp_path / ".local/share/recall" / "recall.duckdb"
+    conn = duckdb.connect(str(db_path))
+    try:
+        rows = conn.execute(
+            """
+            SELECT t.bash_command, s.idx, s.base, s.sub, s.argv
+            FROM bash_segments s JOIN tool_calls t ON t.id = s.tool_call_id
+            ORDER BY t.bash_command, s.idx
+            """
+        ).fetchall()
+    finally:
+        conn.close()
+    assert rows == [
+        ("cd app && npm test | tee log.txt", 0, "cd", None, ["cd", "app"]),
+        ("cd app && npm test | tee log.txt", 1, "npm", "test", ["npm", "test"]),
+        ("cd app && npm test | tee log.txt", 2, "tee", None, ["tee", "log.txt"]),
+        ("git status; git diff", 0, "git", "status", ["git", "status"]),
+        ("git status; git diff", 1, "git", "diff", ["git", "diff"]),
+        ("npm test", 0, "npm", "test", ["npm", "test"]),
+    ]
+
+    stats = {(stat.bash_base, stat.bash_sub): stat for stat in bash_breakdown()}
+    assert (stats["npm", "test"].count, stats["npm", "test"].compound_count) == (2, 1)
+    assert (stats["git", "diff"].count, stats["git", "diff"].compound_count) == (1, 1)
+    assert stats["npm", "test"].is_compound
+    assert len(stats) == 5
+
+
+def test_bash_suggestions_review_only_patterns_mostly_run_in_compound_commands(
+    tmp_path, monkeypatch
+) -> None:
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.setenv("RECALL_DATA_DIR", str(tmp_path / ".local/share/recall"))
+
+    claude_target = tmp_path / ".claude" / "projects" / "proj1"
+    claude_target.mkdir(parents=True)
+    commands = [
+        "npm test",
+        "npm test",
+        "cd app && npm test",
+        "cd lib && ls",
+        "git status",
+        "git status",
+        "git status && rm -rf build",
+    ]
+    (claude_target / "session1.jsonl").write_text(
+        "".join(
+            f'{{"type":"message","timestamp":"2024-01-15T10:0{minute}:00Z","message":'
+            '{"role":"assistant","content":[{"type":"tool_use","name":"bash",'
+            f'"input":{{"command":"{command}"}}}}]}}}}\n'
+            for minute, command in enumerate(commands)
+        ),
+        encoding="utf-8",
+    )
+    assert index_sessions(source=None, full=True, recreate=True, verbose=False).indexed == 1
+
+    stats = {(stat.bash_base, stat.bash_sub): stat for stat in bash_breakdown()}
+    assert (stats["npm", "test"].count, stats["npm", "test"].compound_count) == (3, 1)
+    assert (stats["git", "status"].count, stats["git", "status"].compound_count) == (3, 1)
+    assert stats["git", "status"].with_destructive
+    assert not stats["npm", "test"].with_destructive
+
+    suggestions, skipped = bash_suggestions(high_threshold=3, medium_threshold=2)
+    assert {item.pattern: (item.confidence, item.reason) for item in suggestions} == {
+        "npm test": ("high", "No dangerous patterns detected"),
+        "git status": ("review", "Chained with destructive commands"),
+        "cd *": ("review", "Mostly used in compound commands"),
+        "ls *": ("review", "Mostly used in compound commands"),
+    }
+    assert [item.pattern for item in skipped] == ["rm *"]
+
+
+def test_indexer_indexes_sessions_archived_with_gzip(tmp_path, monkeypatch) -> None:
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.setenv("RECALL_DATA_DIR", str(tmp_path / ".local/share/recall"))
+
+    claude_target = tmp_path / ".claude" / "projects" / "proj1"
+    claude_target.mkdir(parents=True)
+    claude_fixture = (
+        Path(__file__).resolve().parents[2] / "fixtures" / "claude_code" / "session1.jsonl"
+    )
+    session_path = claude_target / "session1.jsonl"
+    shutil.copy(claude_fixture, session_path)
+    assert index_sessions(source=None, full=False, recreate=True, verbose=False).indexed == 1
+
+    # gzip -k: the archive is skipped while the uncompressed file exists.
+    archive = claude_target / "session1.jsonl.gz"
+    archive.write_bytes(gzip.compress(claude_fixture.read_bytes()))
+    kept = index_sessions(source=None, full=False, recreate=False, verbose=False)
+    assert (kept.indexed, kept.skipped, kept.failed) == (0, 2, 0)
+
+    # Once the original is removed, the archive takes over its session.
+    session_path.unlink()
+    archived = index_sessions(source=None, full=False, recreate=False, verbose=False)
+    assert (archived.indexed, archived.missing, archived.failed) == (1, 0, 0)
+    assert index_sessions(source=None, full=False, recreate=False, verbose=False).skipped == 1
+
+    # Appending to an archive rewrites it, so the session is reparsed whole.
+    appended = (
+        '{"type":"message","timestamp":"2024-01-15T10:04:00Z",'
+        '"message":{"role":"user","content":"Archived follow-up"}}\n'
+    )
+    archive.write_bytes(gzip.compress(claude_fixture.read_bytes() + appended.encode()))
+    assert index_sessions(source=None, full=False, recreate=False, verbose=False).indexed == 1
+
+    expected_id = ClaudeCodeParser().parse(archive).id
+    db_path = tmp_path / ".local/share/recall" / "recall.duckdb"
+    conn = duckdb.connect(str(db_path))
+    try:
+        rows = conn.execute(
+            "SELECT id, source_path, source_session_id, message_count, file_size, byte_offset "
+            "FROM sessions"
+        ).fetchall()
+        messages = conn.execute("SELECT COUNT(*) FROM messages").fetchone()
+    finally:
+        conn.close()
+    assert rows == [
+        (expected_id, str(archive.resolve()), "session1", 5, archive.stat().st_size, None)
+    ]
+    assert messages == (5,)
+
+
+def test_indexer_skips_touched_files_with_unchanged_content(tmp_path, monkeypatch) -> None:
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.setenv("RECALL_DATA_DIR", str(tmp_path / ".local/share/recall"))
+
+    claude_target = tmp_path / ".claude" / "projects" / "proj1"
+    claude_target.mkdir(parents=True)
+    fixtures = Path(__file__).resolve().parents[2] / "fixtures"
+    session_file = claude_target / "session1.jsonl"
+    shutil.copy(fixtures / "claude_code" / "session1.jsonl", session_file)
+
+    first = index_sessions(source=None, full=False, recreate=True, verbose=False)
+    assert first.indexed == 1
+
+    # A restore or rsync bumps the mtime without changing the content.
+    touched_mtime = session_file.stat().st_mtime + 100
+    os.utime(session_file, (touched_mtime, touched_mtime))
+
+    def fail_parse_job(job):
+        raise AssertionError(f"unexpected reparse of {job.path}")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(indexer_module, "_parse_job", fail_parse_job)
+        second = index_sessions(source=None, full=False, recreate=False, verbose=False)
+    assert (second.indexed, second.skipped, second.failed) == (0, 1, 0)
+
+    db_path = tmp_path / ".local/share/recall" / "recall.duckdb"
+    conn = duckdb.connect(str(db_path))
+    try:
+        row = conn.execute("SELECT file_mtime FROM sessions").fetchone()
+        assert row is not None and row[0] == touched_mtime
+    finally:
+        conn.close()
+
+    # Same size but different content is still reindexed.
+    content = session_file.read_bytes()
+    session_file.write_bytes(content.replace(b"status", b"STATUS"))
+    third = index_sessions(source=None, full=False, recreate=False, verbose=False)
+    assert third.indexed == 1
+
+
+def test_indexer_falls_back_to_per_session_writes_when_bulk_insert_fails(
+    tmp_path, monkeypatch
+) -> None:
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.setenv("RECALL_DATA_DIR", str(tmp_path / ".local/share/recall"))
+
+    claude_target = tmp_path / ".claude" / "projects" / "proj1"
+    codex_target = tmp_path / ".codex" / "sessions" / "s1"
+    claude_target.mkdir(parents=True)
+    codex_target.mkdir(parents=True)
+
+    fixtures = Path(__file__).resolve().parents[2] / "fixtures"
+    shutil.copy(fixtures / "claude_code" / "session1.jsonl", claude_target / "session1.jsonl")
+    shutil.copy(fixtures / "codex" / "session1" / "rollout.jsonl", codex_target / "rollout.jsonl")
+
+    bulk_calls: list[int] = []
+
+    def fail_insert_column_batch(_conn, batch) -> None:
+        bulk_calls.append(len(batch))
+        raise RuntimeError("simulated bulk insert failure")
+
+    monkeypatch.setattr(indexer_module, "insert_column_batch", fail_insert_column_batch)
+
+    summary = index_sessions(source=None, full=True, recreate=True, verbose=False)
+    assert bulk_calls == [2]
+    assert summary.indexed == 2
+    assert summary.failed == 0
+
+    db_path = tmp_path / ".local/share/recall" / "recall.duckdb"
+    conn = duckdb.connect(str(db_path))
+    try:
+        counts = conn.execute(
+            "SELECT (SELECT COUNT(*) FROM sessions), (SELECT COUNT(*) FROM messages), "
+            "(SELECT COUNT(*) FROM tool_calls)"
+        ).fetchone()
+        assert counts == (2, 7, 3)
+    finally:
+        conn.close()
+
+
+def test_indexer_streams_reparses_of_large_files(tmp_path, monkeypatch) -> None:
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.setenv("RECALL_DATA_DIR", str(tmp_path / ".local/share/recall"))
+
+    claude_target = tmp_path / ".claude" / "projects" / "proj1"
+    claude_target.mkdir(parents=True)
+    fixtures = Path(__file__).resolve().parents[2] / "fixtures"
+    session_path = claude_target / "session1.jsonl"
+    shutil.copy(fixtures / "claude_code" / "session1.jsonl", session_path)
+    db_path = tmp_path / ".local/share/recall" / "recall.duckdb"
+    index_sessions(source=None, full=True, recreate=True, verbose=False)
+    expected = _table_rows(db_path)
+
+    def fail_parse(self, path: Path):
+        raise AssertionError(f"unexpected in-memory reparse of {path}")
+
+    def fail_insert_column_batch(_conn, _batch) -> None:
+        # The file was batched as small; it is large by the time it is written again.
+        monkeypatch.setattr(indexer_module, "STREAM_MIN_BYTES", 0)
+        raise RuntimeError("simulated bulk insert failure")
+
+    original_parse = ClaudeCodeParser.parse
+    original_insert_column_batch = indexer_module.insert_column_batch
+    original_stream_min_bytes = indexer_module.STREAM_MIN_BYTES
+    monkeypatch.setattr(ClaudeCodeParser, "parse", fail_parse)
+    monkeypatch.setattr(indexer_module, "insert_column_batch", fail_insert_column_batch)
+    summary = index_sessions(source=None, full=True, recreate=False, verbose=False)
+    assert (summary.indexed, summary.failed) == (1, 0)
+    assert _table_rows(db_path) == expected
+    monkeypatch.setattr(indexer_module, "insert_column_batch", original_insert_column_batch)
+
+    # The appended tail sets the session's cwd, so it cannot be appended and the
+    # whole file is written again, although only the tail is below the threshold.
+    with session_path.open("a", encoding="utf-8") as handle:
+        handle.write(
+            '{"type":"message","timestamp":"2024-01-15T10:04:00Z","cwd":"/work",'
+            '"message":{"role":"user","content":"More"}}\n'
+        )
+    monkeypatch.setattr(indexer_module, "STREAM_MIN_BYTES", session_path.stat().st_size)
+    summary = index_sessions(source=None, full=False, recreate=False, verbose=False)
+    assert (summary.indexed, summary.failed) == (1, 0)
+    streamed = _table_rows(db_path)
+
+    monkeypatch.setattr(ClaudeCodeParser, "parse", original_parse)
+    monkeypatch.setattr(indexer_module, "STREAM_MIN_BYTES", original_stream_min_bytes)
+    index_sessions(source=None, full=True, recreate=True, verbose=False)
+    assert streamed == _table_rows(db_path)
+    conn = duckdb.connect(str(db_path))
+    try:
+        assert conn.execute("SELECT cwd FROM sessions").fetchall() == [("/work",)]
+    finally:
+        conn.close()
+
+
+def test_indexer_reports_missing_session_files(tmp_path, monkeypatch) -> None:
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.setenv("RECALL_DATA_DIR", str(tmp_path / ".local/share/recall"))
+
+    claude_target = tmp_path / ".claude" / "projects" / "proj1"
+    pi_target = tmp_path / ".pi" / "agent" / "sessions" / "proj1"
+    claude_target.mkdir(parents=True)
+    pi_target.mkdir(parents=True)
+
+    fixtures = Path(__file__).resolve().parents[2] / "fixtures"
+    shutil.copy(fixtures / "claude_code" / "session1.jsonl", claude_target / "session1.jsonl")
+    shutil.copy(fixtures / "pi_agent" / "session1.jsonl", pi_target / "session1.jsonl")
+
+    first = index_sessions(source=None, full=False, recreate=True, verbose=False)
+    assert first.indexed == 2
+
+    (pi_target / "session1.jsonl").unlink()
+    second = index_sessions(source=None, full=False, recreate=False, verbose=False)
+    assert (second.total, second.skipped, second.indexed, second.missing) == (1, 1, 0, 1)
+
+    # Missing files only count for the sources being indexed.
+    third = index_sessions(source=Source.CLAUDE_CODE, full=False, recreate=False, verbose=False)
+    assert (third.skipped, third.missing) == (1, 0)
+
+    db_path = tmp_path / ".local/share/recall" / "recall.duckdb"
+    conn = duckdb.connect(str(db_path))
+    try:
+        sessions_row = conn.execute("SELECT COUNT(*) FROM sessions").fetchone()
+        assert sessions_row is not None and sessions_row[0] == 2
+    finally:
+        conn.close()
+
+
+def _table_rows(db_path: Path) -> dict[str, list[tuple[object, ...]]]:
+    conn = duckdb.connect(str(db_path))
+    try:
+        return {
+            "sessions": conn.execute(
+                "SELECT * EXCLUDE (indexed_at) FROM sessions ORDER BY id"
+            ).fetchall(),
+            "messages": conn.execute("SELECT * FROM messages ORDER BY id").fetchall(),
+            "tool_calls": conn.execute("SELECT * FROM tool_calls ORDER BY id").fetchall(),
+        }
+    finally:
+        conn.close()
+
+
+def test_indexer_streams_large_files_in_chunks(tmp_path, monkeypatch) -> None:
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.setenv("RECALL_DATA_DIR", str(tmp_path / ".local/share/recall"))
+
+    claude_target = tmp_path / ".claude" / "projects" / "proj1"
+    codex_target = tmp_path / ".codex" / "sessions" / "s1"
+    claude_target.mkdir(parents=True)
+    codex_target.mkdir(parents=True)
+    fixtures = Path(__file__).resolve().parents[2] / "fixtures"
+    session_path = claude_target / "session1.jsonl"
+    shutil.copy(fixtures / "claude_code" / "session1.jsonl", session_path)
+    shutil.copy(fixtures / "codex" / "session1" / "rollout.jsonl", codex_target / "rollout.jsonl")
+    db_path = tmp_path / ".local/share/recall" / "recall.duckdb"
+
+    index_sessions(source=None, full=True, recreate=True, verbose=False)
+    expected = _table_rows(db_path)
+
+    staged_chunks: list[int] = []
+    original_stage_rows = indexer_module.stage_rows
+
+    def tracking_stage_rows(conn, staged, messages, tool_calls) -> None:
+        staged_chunks.append(len(messages))
+        original_stage_rows(conn, staged, messages, tool_calls)
+
+    monkeypatch.setattr(indexer_module, "STREAM_MIN_BYTES", 0)
+    monkeypatch.setattr(indexer_module, "STREAM_CHUNK_ROWS", 2)
+    monkeypatch.setattr(indexer_module, "stage_rows", tracking_stage_rows)
+
+    # Replacing existing sessions through the streaming path yields identical rows.
+    summary = index_sessions(source=None, full=True, recreate=False, verbose=False)
+    assert (summary.indexed, summary.failed) == (2, 0)
+    assert len(staged_chunks) > 2 and max(staged_chunks) <= 2
+    assert _table_rows(db_path) == expected
+
+    # An appended tail is streamed into the existing session.
+    with session_path.open("a", encoding="utf-8") as handle:
+        handle.write(
+            '{"type":"message","timestamp":"2024-01-15T10:04:00Z",'
+            '"message":{"role":"user","content":"More"}}\n'
+        )
+    staged_chunks.clear()
+    summary = index_sessions(source=None, full=False, recreate=False, verbose=False)
+    assert (summary.indexed, summary.skipped) == (1, 1)
+    assert staged_chunks == [1]
+    conn = duckdb.connect(str(db_path))
+    try:
+        row = conn.execute(
+            "SELECT message_count, (SELECT COUNT(*) FROM messages m WHERE m.session_id = s.id) "
+            "FROM sessions s WHERE source = 'claude_code'"
+        ).fetchone()
+        assert row == (5, 5)
+        leftovers = conn.execute(
+            "SELECT COUNT(*) FROM information_schema.tables WHERE table_name LIKE '_recall_%'"
+        ).fetchone()
+        assert leftovers == (0,)
+    finally:
+        conn.close()
+
+
+def test_indexer_pipeline_reports_stage_throughput(tmp_path, monkeypatch) -> None:
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.setenv("RECALL_DATA_DIR", str(tmp_path / ".local/share/recall"))
+    # Single-slot queues make every stage wait on its neighbours.
+    monkeypatch.setattr(indexer_module, "JOB_QUEUE_SIZE", 1)
+    monkeypatch.setattr(indexer_module, "OUTCOME_QUEUE_SIZE", 1)
+
+    fixtures = Path(__file__).resolve().parents[2] / "fixtures"
+    claude_target = tmp_path / ".claude" / "projects" / "proj1"
+    claude_target.mkdir(parents=True)
+    for index in range(5):
+        shutil.copy(fixtures / "claude_code" / "session1.jsonl", claude_target / f"s{index}.jsonl")
+    (claude_target / "broken.jsonl").write_bytes(b'{"type": "\xff"}\n')
+
+    summary = index_sessions(source=None, full=False, recreate=True, verbose=False)
+    assert (summary.total, summary.indexed, summary.failed) == (6, 5, 1)
+    discover, parse, write = summary.stages
+    assert [stage.name for stage in summary.stages] == ["discover", "parse", "write"]
+    assert discover.items == parse.items == 6
+    assert write.items == 5
+    size = (fixtures / "claude_code" / "session1.jsonl").stat().st_size
+    assert write.bytes == 5 * size
+    assert parse.busy_seconds > 0
+
+    # A failing stage stops the pipeline and surfaces its error.
+    def broken_is_unchanged(state, item) -> bool:
+        raise RuntimeError("discover failed")
+
+    monkeypatch.setattr(indexer_module, "_is_unchanged", broken_is_unchanged)
+    with pytest.raises(RuntimeError, match="discover failed"):
+        index_sessions(source=None, full=False, recreate=False, verbose=False)
+
+
+def test_indexer_records_run_history_across_recreate(tmp_path, monkeypatch) -> None:
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.setenv("RECALL_DATA_DIR", str(tmp_path / ".local/share/recall"))
+
+    fixtures = Path(__file__).resolve().parents[2] / "fixtures"
+    claude_target = tmp_path / ".claude" / "projects" / "proj1"
+    claude_target.mkdir(parents=True)
+    shutil.copy(fixtures / "claude_code" / "session1.jsonl", claude_target / "session1.jsonl")
+
+    index_sessions(source=None, full=False, recreate=True, verbose=False)
+    index_sessions(source=None, full=False, recreate=False, verbose=False)
+    index_sessions(source=Source.CLAUDE_CODE, full=True, recreate=False, verbose=False)
+    # A rebuild starts from an empty database but keeps the run history.
+    index_sessions(source=None, full=False, recreate=True, verbose=False)
+
+    history = index_history()
+    assert [(run.mode, run.indexed, run.skipped) for run in history.runs] == [
+        ("recreate", 1, 0),
+        ("full", 1, 0),
+        ("incremental", 0, 1),
+        ("recreate", 1, 0),
+    ]
+    assert history.runs[1].source == "claude_code"
+    latest = history.runs[0]
+    assert latest.bytes_read == (claude_target / "session1.jsonl").stat().st_size
+    assert latest.parse_mb_per_second is not None and latest.parse_mb_per_second > 0
+    assert history.runs[2].parse_mb_per_second is None
+    assert {(trend.mode, trend.metric, trend.runs) for trend in history.trends} == {
+        ("recreate", "parse_mb_per_second", 2),
+        ("recreate", "write_rows_per_second", 2),
+    }
+
+
+def test_indexer_quarantines_failed_files_until_changed(tmp_path, monkeypatch) -> None:
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.setenv("RECALL_DATA_DIR", str(tmp_path / ".local/share/recall"))
+
+    claude_target = tmp_path / ".claude" / "projects" / "proj1"
+    claude_target.mkdir(parents=True)
+    fixture = Path(__file__).resolve().parents[2] / "fixtures" / "claude_code" / "session1.jsonl"
+    broken = claude_target / "broken.jsonl"
+    broken.write_bytes(b'{"type": "\xff"}\n')
+    db_path = tmp_path / ".local/share/recall" / "recall.duckdb"
+
+    def failure_row() -> tuple[object, ...] | None:
+        conn = duckdb.connect(str(db_path))
+        try:
+            return conn.execute("SELECT source, attempts FROM failed_files").fetchone()
+        finally:
+            conn.close()
+
+    first = index_sessions(source=None, full=False, recreate=True, verbose=False)
+    assert (first.failed, first.quarantined) == (1, 0)
+    assert failure_row() == ("claude_code", 1)
+
+    # Unchanged and still backing off: skipped, even on a full reindex.
+    second = index_sessions(source=None, full=True, recreate=False, verbose=False)
+    assert (second.failed, second.quarantined) == (0, 1)
+
+    # The retry records a backoff that has already expired by the next run.
+    monkeypatch.setattr(indexer_module, "FAILURE_BACKOFF", timedelta(0))
+    forced = index_sessions(
+        source=None, full=False, recreate=False, verbose=False, retry_failed=True
+    )
+    assert (forced.failed, forced.quarantined) == (1, 0)
+    assert failure_row() == ("claude_code", 2)
+
+    expired = index_sessions(source=None, full=False, recreate=False, verbose=False)
+    assert (expired.failed, expired.quarantined) == (1, 0)
+    assert failure_row() == ("claude_code", 3)
+
+    # Once fixed, the file changes, indexes and leaves the quarantine.
+    shutil.copy(fixture, broken)
+    fixed = index_sessions(source=None, full=False, recreate=False, verbose=False)
+    assert (fixed.indexed, fixed.failed, fixed.quarantined) == (1, 0, 0)
+    assert failure_row() is None
+
+    # A failed file that is deleted is forgotten, but only by a scan of its source.
+    deleted = claude_target / "deleted.jsonl"
+    deleted.write_bytes(b'{"type": "\xff"}\n')
+    assert index_sessions(source=None, full=False, recreate=False, verbose=False).failed == 1
+    deleted.unlink()
+    index_sessions(source=Source.CODEX, full=False, recreate=False, verbose=False)
+    assert failure_row() == ("claude_code", 1)
+    gone = index_sessions(source=None, full=False, recreate=False, verbose=False)
+    assert (gone.failed, gone.quarantined) == (0, 0)
+    assert failure_row() is None
+
+
+def test_indexer_indexes_newest_first_within_budget(tmp_path, monkeypatch) -> None:
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.setenv("RECALL_DATA_DIR", str(tmp_path / ".local/share/recall"))
+
+    fixture = Path(__file__).resolve().parents[2] / "fixtures" / "claude_code" / "session1.jsonl"
+    claude_target = tmp_path / ".claude" / "projects" / "proj1"
+    claude_target.mkdir(parents=True)
+    # s0 is the oldest file, s4 the newest; lexical order would start at s0.
+    for index in range(5):
+        target = claude_target / f"s{index}.jsonl"
+        shutil.copy(fixture, target)
+        os.utime(target, (1_700_000_000 + index, 1_700_000_000 + index))
+
+    # The budget runs out after two sessions have been taken by the writer.
+    checks = iter([False, False])
+    monkeypatch.setattr(indexer_module, "_is_past", lambda deadline: next(checks, True))
+
+    first = index_sessions(
+        source=None, full=False, recreate=True, verbose=False, budget=timedelta(minutes=1)
+    )
+    assert (first.indexed, first.failed, first.missing) == (2, 0, 0)
+    assert first.budget_exhausted
+
+    db_path = tmp_path / ".local/share/recall" / "recall.duckdb"
+
+    def indexed_names() -> list[str]:
+        conn = duckdb.connect(str(db_path))
+        try:
+            rows = conn.execute("SELECT source_path FROM sessions").fetchall()
+        finally:
+            conn.close()
+        return sorted(Path(row[0]).name for row in rows)
+
+    assert indexed_names() == ["s3.jsonl", "s4.jsonl"]
+
+    # The next run continues with the older backlog.
+    monkeypatch.undo()
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.setenv("RECALL_DATA_DIR", str(tmp_path / ".local/share/recall"))
+    second = index_sessions(source=None, full=False, recreate=False, verbose=False)
+    assert (second.indexed, second.skipped, second.budget_exhausted) == (3, 2, False)
+    assert indexed_names() == [f"s{index}.jsonl" for index in range(5)]
+
+
+def test_indexer_streams_discovery_unless_a_budget_needs_newest_first(
+    tmp_path, monkeypatch
+) -> None:
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.setenv("RECALL_DATA_DIR", str(tmp_path / ".local/share/recall"))
+
+    fixture = Path(__file__).resolve().parents[2] / "fixtures" / "claude_code" / "session1.jsonl"
+    claude_target = tmp_path / ".claude" / "projects" / "proj1"
+    claude_target.mkdir(parents=True)
+    shutil.copy(fixture, claude_target / "session1.jsonl")
+
+    sorted_scans: list[bool] = []
+    index_files = indexer_module.index_files
+
+    def record_files(conn, config, files, *args, **kwargs):
+        sorted_scans.append(isinstance(files, list))
+        return index_files(conn, config, files, *args, **kwargs)
+
+    monkeypatch.setattr(indexer_module, "index_files", record_files)
+    assert index_sessions(source=None, full=True, recreate=True, verbose=False).indexed == 1
+    budgeted = index_sessions(
+        source=None, full=True, recreate=False, verbose=False, budget=timedelta(minutes=1)
+    )
+    assert budgeted.indexed == 1
+    assert sorted_scans == [False, True]
+
+
+def test_indexer_resumes_interrupted_recreate_from_checkpoint(tmp_path, monkeypatch) -> None:
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.setenv("RECALL_DATA_DIR", str(tmp_path / ".local/share/recall"))
+    # Checkpoint after every commit; one session per batch.
+    monkeypatch.setattr(indexer_module, "CHECKPOINT_SECONDS", 0.0)
+    monkeypatch.setattr(indexer_module, "BATCH_MAX_SESSIONS", 1)
+
+    fixture = Path(__file__).resolve().parents[2] / "fixtures" / "claude_code" / "session1.jsonl"
+    claude_target = tmp_path / ".claude" / "projects" / "proj1"
+    claude_target.mkdir(parents=True)
+    for index in range(3):
+        shutil.copy(fixture, claude_target / f"s{index}.jsonl")
+    data_dir = tmp_path / ".local/share/recall"
+    db_path = data_dir / "recall.duckdb"
+
+    index_sessions(source=None, full=False, recreate=False, verbose=False)
+    backups_before = sorted(data_dir.glob("recall.bak-*"))
+
+    # The rebuild is interrupted after every session was written but before
+    # the search index was built.
+    def interrupted(_conn, _fts, _ids) -> None:
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(indexer_module, "update_fts_index", interrupted)
+    with pytest.raises(KeyboardInterrupt):
+        index_sessions(source=None, full=False, recreate=True, verbose=False)
+    monkeypatch.undo()
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.setenv("RECALL_DATA_DIR", str(tmp_path / ".local/share/recall"))
+
+    conn = duckdb.connect(str(db_path))
+    try:
+        assert conn.execute("SELECT mode, sessions_done FROM index_checkpoints").fetchall() == [
+            ("recreate", 3)
+        ]
+        postings = conn.execute("SELECT COUNT(*) FROM fts_postings").fetchone()
+        assert postings == (0,)
+    finally:
+        conn.close()
+    backups = sorted(data_dir.glob("recall.bak-*"))
+    assert len(backups) == len(backups_before) + 1
+
+    # Another --recreate resumes instead of backing up the partial database.
+    resumed = index_sessions(source=None, full=False, recreate=True, verbose=False)
+    assert (resumed.resumed, resumed.indexed, resumed.skipped) == (3, 0, 3)
+    assert sorted(data_dir.glob("recall.bak-*")) == backups
+
+    conn = duckdb.connect(str(db_path))
+    try:
+        assert conn.execute("SELECT COUNT(*) FROM index_checkpoints").fetchone() == (0,)
+        postings = conn.execute("SELECT COUNT(*) FROM fts_postings").fetchone()
+        assert postings is not None and postings[0] > 0
+        modes = conn.execute("SELECT mode FROM index_runs ORDER BY started_at").fetchall()
+        assert modes[-1] == ("recreate",)
+    finally:
+        conn.close()
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import shutil
+from pathlib import Path
+
+import duckdb
+import recall.services.indexer as indexer_module
+from recall.services.indexer import index_sessions
+from recall.services.search import search
+
+NEW_LINE = (
+    '{"type":"message","timestamp":"2024-01-15T10:04:00Z","message":{"role":"user",'
+    '"content":[{"type":"text","text":"Benchmark the parsers"}]}}\n'
+)
+
+
+def test_search_index_tracks_changed_sessions_only(tmp_path, monkeypatch) -> None:
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.setenv("RECALL_DATA_DIR", str(tmp_path / ".local/share/recall"))
+
+    claude_target = tmp_path / ".claude" / "projects" / "proj1"
+    pi_target = tmp_path / ".pi" / "agent" / "sessions" / "proj1"
+    claude_target.mkdir(parents=True)
+    pi_target.mkdir(parents=True)
+
+    fixtures = Path(__file__).resolve().parents[2] / "fixtures"
+    claude_file = claude_target / "session1.jsonl"
+    shutil.copy(fixtures / "claude_code" / "session1.jsonl", claude_file)
+    shutil.copy(fixtures / "pi_agent" / "session1.jsonl", pi_target / "session1.jsonl")
+
+    index_sessions(source=None, full=False, recreate=True, verbose=False)
+
+    results = search(query="repository", source=None, tool=None)
+    assert results and {result.source for result in results} == {"pi_agent"}
+    assert [result.bash_command for result in search(query="git", source=None, tool="bash")] == [
+        "git status"
+    ]
+    assert search(query="benchmarks", source=None, tool=None) == []
+
+    calls: list[list[str]] = []
+    update_fts_index = indexer_module.update_fts_index
+
+    def tracking_update_fts_index(conn, fts, session_ids) -> None:
+        calls.append(list(session_ids))
+        update_fts_index(conn, fts, session_ids)
+
+    monkeypatch.setattr(indexer_module, "update_fts_index", tracking_update_fts_index)
+
+    with claude_file.open("a", encoding="utf-8") as handle:
+        handle.write(NEW_LINE)
+    index_sessions(source=None, full=False, recreate=False, verbose=False)
+
+    results = search(query="benchmarks", source=None, tool=None)
+    assert [result.content for result in results] == ["Benchmark the parsers"]
+    assert search(query="repository", source=None, tool=None)
+
+    # Only the changed session is re-tokenized.
+    db_path = tmp_path / ".local/share/recall" / "recall.duckdb"
+    conn = duckdb.connect(str(db_path))
+    try:
+        claude_ids = conn.execute("SELECT id FROM sessions WHERE source = 'claude_code'").fetchall()
+    finally:
+        conn.close()
+    assert calls == [[row[0] for row in claude_ids]]
+
+    # Corpus totals kept in fts_fields match the index after the update.
+    conn = duckdb.connect(str(db_path))
+    try:
+        totals = conn.execute("SELECT field, documents, length FROM fts_fields ORDER BY field")
+        assert (
+            totals.fetchall()
+            == conn.execute(
+                "SELECT field, CASE field WHEN 'bash' THEN (SELECT COUNT(*) FROM tool_calls) "
+                "ELSE (SELECT COUNT(*) FROM messages) END, "
+                "(SELECT COALESCE(SUM(length), 0) FROM fts_documents d WHERE d.field = f.field) "
+                "FROM fts_fields f ORDER BY field"
+            ).fetchall()
+        )
+    finally:
+        conn.close()
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import errno
+import os
+import shutil
+import threading
+from pathlib import Path
+
+import pytest
+from recall.parsers.claude_code import ClaudeCodeParser
+from recall.services.indexer import IndexSummary
+from recall.services.search import search
+from recall.services.watcher import InotifyWatcher, watch_sessions
+
+
+@pytest.mark.parametrize("polling", [False, True])
+def test_watch_indexes_new_and_growing_sessions(tmp_path, monkeypatch, polling) -> None:
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.setenv("RECALL_DATA_DIR", str(tmp_path / ".local/share/recall"))
+
+    fixtures = Path(__file__).resolve().parents[2] / "fixtures"
+    claude_target = tmp_path / ".claude" / "projects" / "proj1"
+    claude_target.mkdir(parents=True)
+    shutil.copy(fixtures / "claude_code" / "session1.jsonl", claude_target / "session1.jsonl")
+
+    summaries: list[IndexSummary] = []
+    indexed = threading.Event()
+    stop = threading.Event()
+
+    def on_index(summary: IndexSummary) -> None:
+        summaries.append(summary)
+        if summary.indexed:
+            indexed.set()
+
+    thread = threading.Thread(
+        target=watch_sessions,
+        kwargs={
+            "source": None,
+            "verbose": False,
+            "debounce": 0.05,
+            "poll_interval": 0.1,
+            "polling": polling,
+            "on_index": on_index,
+            "should_stop": stop.is_set,
+        },
+    )
+    thread.start()
+    try:
+        # Catch-up pass over files that existed before the watch started.
+        assert indexed.wait(10)
+        assert summaries[0].indexed == 1
+        indexed.clear()
+
+        # A session directory created while watching is picked up too.
+        pi_target = tmp_path / ".pi" / "agent" / "sessions" / "proj2"
+        pi_target.mkdir(parents=True)
+        shutil.copy(fixtures / "pi_agent" / "session1.jsonl", pi_target / "session1.jsonl")
+        assert indexed.wait(10)
+    finally:
+        stop.set()
+        thread.join(10)
+    assert not thread.is_alive()
+
+    assert sum(summary.indexed for summary in summaries) == 2
+    assert search(query="repository", source=None, tool=None)
+
+
+@pytest.mark.parametrize("error", [errno.ENOENT, errno.ENOSPC])
+def test_inotify_watcher_survives_directories_it_cannot_watch(tmp_path, monkeypatch, error) -> None:
+    monkeypatch.setenv("HOME", str(tmp_path))
+    parser = ClaudeCodeParser()
+    root = parser.root().resolve()
+    root.mkdir(parents=True)
+    try:
+        watcher = InotifyWatcher([parser], [root], poll_interval=0.0)
+    except OSError as err:
+        pytest.skip(f"inotify unavailable: {err}")
+    try:
+
+        def fail_add_watch(directory: Path) -> None:
+            raise OSError(error, f"cannot watch {directory}: {os.strerror(error)}")
+
+        monkeypatch.setattr(watcher, "_add_watch", fail_add_watch)
+        project = root / "proj1"
+        project.mkdir()
+        (project / "session1.jsonl").write_text("{}\n")
+        assert watcher.wait(1.0) == {project / "session1.jsonl"}
+
+        # A vanished directory is skipped; exhausted watches fall back to polling.
+        (project / "session2.jsonl").write_text("{}\n")
+        expected = {project / "session2.jsonl"} if error == errno.ENOSPC else set()
+        assert watcher.wait(0.1) == expected
+    finally:
+        watcher.close()